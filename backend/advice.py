@@ -0,0 +1,244 @@
+"""
+Server-side advice chat proxy for the Plan view
+
+The browser used to send every advice prompt to Gemini itself, with the API
+key embedded in the page. AdviceService builds the same prompts on the
+server from a *profile bucket* (inputs rounded to the steps below), so
+users with nearly identical profiles produce identical prompts:
+
+- Answers are kept in a bounded LRU/TTL cache keyed by (kind, bucket,
+  normalized question); the prompt is built from the key alone, so a cached
+  answer never depends on which request filled it.
+- Concurrent identical prompts share one upstream call (and its error).
+- The LLM client is injectable: GeminiClient for production, StubLLM for
+  tests and local development.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future
+
+from cache import PredictionCache, quantize
+from metrics import Histogram
+
+# Quantization steps of the profile bucket (same idea as the /api/predict cache)
+BUCKET_STEPS = {'income': 250, 'equity': 5000, 'savings': 50, 'target': 10000, 'currPower': 10000,
+                'rate': 0.5}
+MAX_QUESTION_LENGTH = 500
+
+# Seconds; LLM calls take from ~100 ms to tens of seconds
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+GEMINI_URL = 'https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={key}'
+
+_PROFILE = """Act as an Interhyp financial advisor.
+User Profile:
+- Income: €{income:g}
+- Savings: €{equity:g} (Current), €{savings:g}/mo
+- Family: {marital}, {kids} children.
+- Risk Profile: {riskName} ({rate:g}% APY).
+- Goal: €{target:g} home in {years} years.
+- Current Buying Power: €{currPower:g}.
+"""
+
+PROMPTS = {
+    'steps': _PROFILE + """
+Instruction: Answer in English. Begin the response with 'Here are some steps you can take to increase your
+purchasing power: '. Only display 3 concise financial steps the user can take to increase his buying power and his equity as
+fast as possible based on his current situation, taking into account the provided values. Provide these 3
+steps in a list format with each step beginning with 1. or 2. or 3. . Do not include any prelude or
+introduction or conclusion. I only need the steps themselves. Keep each step as concise as possible, don't use any filler words or phrases.
+""",
+    'question': _PROFILE + """
+User Question: "{question}"
+
+Instructions: Answer in English. Answer concisely (max 2-3 sentences). Be realistic about family costs and risk.
+"""
+}
+
+
+class LLMError(Exception):
+    """Raised when the upstream LLM fails or returns no usable answer"""
+
+
+def profile_bucket(profile):
+    """
+    Hashable, rounded profile used as cache key and prompt input
+
+    Parameters:
+    - profile: dict with the Plan view fields (income, equity, savings, target,
+      years, rate, marital, kids, riskName, currPower); missing numbers count as 0
+    """
+    numbers = {name: quantize(float(profile.get(name) or 0), step) for name, step in BUCKET_STEPS.items()}
+    return tuple(sorted({
+        **numbers,
+        'years': int(float(profile.get('years') or 0)),
+        'kids': int(float(profile.get('kids') or 0)),
+        'marital': str(profile.get('marital') or 'single').strip().lower(),
+        'riskName': str(profile.get('riskName') or 'Balanced').strip()
+    }.items()))
+
+
+def normalize_question(question):
+    """Case- and whitespace-insensitive form of a chat question"""
+    return re.sub(r'\s+', ' ', str(question or '')).strip().lower()
+
+
+def build_prompt(kind, bucket, question=''):
+    """Prompt text for `kind` ('steps' or 'question') from a profile bucket"""
+    return PROMPTS[kind].format(question=question, **dict(bucket))
+
+
+class GeminiClient:
+    """
+    Minimal Gemini generateContent client
+
+    Parameters:
+    - api_key: Google AI Studio key (kept on the server)
+    - model: Gemini model name
+    - timeout: Request timeout in seconds
+    """
+
+    def __init__(self, api_key, model='gemini-2.5-flash-preview-09-2025', timeout=30.0):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+
+    def generate(self, prompt):
+        request = urllib.request.Request(
+            GEMINI_URL.format(model=self.model, key=self.api_key),
+            data=json.dumps({'contents': [{'parts': [{'text': prompt}]}]}).encode(),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read())
+            return data['candidates'][0]['content']['parts'][0]['text']
+        except (OSError, ValueError) as e:
+            raise LLMError(f'advice LLM request failed: {e}')
+        except (KeyError, IndexError, TypeError):
+            raise LLMError('advice LLM returned no answer')
+
+
+class StubLLM:
+    """
+    Offline stand-in for GeminiClient: a deterministic canned answer per prompt
+
+    Parameters:
+    - delay: Seconds each call sleeps (to exercise caching and coalescing)
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        return (f'1. Increase your monthly savings rate. 2. Review your risk profile. '
+                f'3. Keep an emergency reserve. [stub {digest}]')
+
+
+class AdviceService:
+    """
+    Cached, coalescing advice front for an LLM client
+
+    Parameters:
+    - llm: Object with generate(prompt) -> str (None: advice unavailable)
+    - cache_size / cache_ttl: Limits of the answer cache
+    """
+
+    def __init__(self, llm, cache_size=2048, cache_ttl=3600.0):
+        self.llm = llm
+        self.cache = PredictionCache(max_size=cache_size, ttl=cache_ttl)
+        self.upstream_latency = Histogram('rge_advice_upstream_seconds',
+                                          'Advice LLM call latency per outcome', ('outcome',),
+                                          buckets=UPSTREAM_BUCKETS)
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+        self.upstream_seconds = 0.0
+        self.coalesced = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _call_upstream(self, prompt):
+        started = time.perf_counter()
+        with self._lock:
+            self.upstream_calls += 1
+        outcome = 'error'
+        try:
+            answer = self.llm.generate(prompt)
+            outcome = 'ok'
+            return answer
+        finally:
+            elapsed = time.perf_counter() - started
+            self.upstream_latency.observe(elapsed, outcome)
+            with self._lock:
+                self.upstream_seconds += elapsed
+                self.upstream_errors += outcome == 'error'
+
+    def advise(self, kind, profile, question=''):
+        """
+        Answer for `kind` ('steps' or 'question') and a profile
+
+        Returns a dict with the answer, whether it came from the cache or
+        from another request's upstream call, and the bucketed profile.
+        Raises ValueError for an unknown kind or invalid question, LLMError
+        if no LLM is configured or the upstream call fails.
+        """
+        if kind not in PROMPTS:
+            raise ValueError(f'kind must be one of {sorted(PROMPTS)}')
+        if self.llm is None:
+            raise LLMError('advice is not configured (set GEMINI_API_KEY)')
+        question = normalize_question(question) if kind == 'question' else ''
+        if kind == 'question' and not 0 < len(question) <= MAX_QUESTION_LENGTH:
+            raise ValueError(f'question must have 1 to {MAX_QUESTION_LENGTH} characters')
+        bucket = profile_bucket(profile)
+        key = (kind, bucket, question)
+
+        hit, answer = self.cache.get(key)
+        if hit:
+            return {'advice': answer, 'cached': True, 'coalesced': False, 'bucket': dict(bucket)}
+
+        # Collapse concurrent identical prompts into one upstream call
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return {'advice': future.result(), 'cached': False, 'coalesced': True, 'bucket': dict(bucket)}
+
+        try:
+            answer = self._call_upstream(build_prompt(kind, bucket, question))
+            self.cache.put(key, answer)
+            future.set_result(answer)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return {'advice': answer, 'cached': False, 'coalesced': False, 'bucket': dict(bucket)}
+
+    def stats(self):
+        """Cache, coalescing and upstream counters as a JSON-serialisable dict"""
+        with self._lock:
+            return {
+                'configured': self.llm is not None,
+                'cache': self.cache.stats(),
+                'coalesced': self.coalesced,
+                'upstream_calls': self.upstream_calls,
+                'upstream_errors': self.upstream_errors,
+                'mean_upstream_ms': (self.upstream_seconds / self.upstream_calls * 1000
+                                     if self.upstream_calls else 0.0)
+            }
@@ -0,0 +1,122 @@
+"""
+On-disk model artifacts for MLPredictor
+
+An artifact is an uncompressed .npz holding the fitted coefficient arrays
+plus a JSON manifest next to it (same name, .json) with:
+- version: first 12 hex chars of the .npz SHA-256, so every replica that
+  loads the same file reports the same version
+- sha256: checksum verified on every load
+- fingerprint: hash of the training configuration and the source of the
+  modules that generate the training data; a mismatch marks the artifact stale
+- metadata: PolynomialFeatures config, training bounds, R^2 scores, etc.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+ARTIFACT_FORMAT = 1
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_TRAINING_SOURCES = ('growth.py', 'training_data.py')
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact is missing, corrupt or stale"""
+
+
+def manifest_path(path):
+    """Path of the JSON manifest that accompanies the .npz at `path`"""
+    return os.path.splitext(path)[0] + '.json'
+
+
+def training_fingerprint(config):
+    """
+    Hash of everything that determines the trained coefficients
+
+    Parameters:
+    - config: JSON-serialisable training configuration (sample count, seed,
+      polynomial degree, bounds, ...)
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'format': ARTIFACT_FORMAT, 'config': config}, sort_keys=True).encode())
+    for name in _TRAINING_SOURCES:
+        with open(os.path.join(_BACKEND_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    """Write via a temp file in the same directory, then rename over `path`"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_artifact(path, arrays, fingerprint, metadata):
+    """
+    Persist `arrays` (name -> ndarray) and return the manifest written
+
+    The .npz is replaced atomically before its manifest, so a reader never
+    sees a manifest whose checksum refers to a half-written file.
+    """
+    _atomic_write(path, lambda f: np.savez(f, **arrays))
+    sha256 = _sha256_file(path)
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': sha256[:12],
+        'sha256': sha256,
+        'fingerprint': fingerprint,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'metadata': metadata
+    }
+    _atomic_write(manifest_path(path), lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+    return manifest
+
+
+def read_artifact(path, fingerprint):
+    """
+    Load and verify an artifact
+
+    Returns (arrays, manifest). Raises ArtifactError if the files are missing,
+    the checksum does not match, or the fingerprint shows the artifact was
+    produced by a different training configuration.
+    """
+    if not os.path.exists(path) or not os.path.exists(manifest_path(path)):
+        raise ArtifactError(f'no artifact at {path}')
+
+    try:
+        with open(manifest_path(path)) as f:
+            manifest = json.load(f)
+    except ValueError as e:
+        raise ArtifactError(f'unreadable manifest: {e}')
+
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ArtifactError(f"unsupported artifact format {manifest.get('format')}")
+    if manifest.get('fingerprint') != fingerprint:
+        raise ArtifactError('artifact is stale (training configuration changed)')
+    if _sha256_file(path) != manifest.get('sha256'):
+        raise ArtifactError('artifact checksum mismatch')
+
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    return arrays, manifest
@@ -0,0 +1,76 @@
+"""
+Latency/throughput report for /api/predict scoring with the coalescer on and off
+
+Usage: python bench_coalescer.py [concurrency] [seconds]
+Each client thread scores distinct profiles back to back, either through the
+single-row predict methods or through a RequestCoalescer.
+"""
+import sys
+import threading
+import time
+
+import server
+from coalescer import RequestCoalescer
+from server import predictor
+
+
+def _profile(i):
+    return (3000 + (i * 37) % 9000, 10000 + (i * 911) % 150000, 200 + (i * 13) % 1500,
+            200000 + (i * 1237) % 500000, 1 + i % 15, (2.5, 5.0, 7.5)[i % 3],
+            ('single', 'married')[i % 2], i % 4)
+
+
+def _single(profile):
+    income, equity, savings, target, years, rate, marital, kids = profile
+    readiness, curr_power = predictor.predict_readiness(income, equity, savings, target, marital, kids)
+    likelihood, future_equity = predictor.predict_likelihood(
+        income, equity, savings, target, years, rate, marital, kids
+    )
+    return readiness, likelihood, curr_power, future_equity
+
+
+def measure(score, concurrency, duration):
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        local, i = [], offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            score(_profile(i))
+            local.append(time.perf_counter() - started)
+            i += concurrency
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    n = len(latencies)
+    return n / duration, latencies[n // 2] * 1000, latencies[int(n * 0.99)] * 1000
+
+
+def run(concurrency=32, duration=5.0):
+    modes = [('coalescer off', _single)]
+    for window_ms in (0.5, 2.0):
+        coalescer = RequestCoalescer(server._score_profile_batch, max_batch_size=64,
+                                     max_wait_ms=window_ms)
+        modes.append((f'coalescer {window_ms}ms/64', coalescer.submit))
+
+    print("\n" + "=" * 62)
+    print(f"{'Mode':<22} {'Req/s':>10} {'p50 ms':>10} {'p99 ms':>10}   ({concurrency} clients)")
+    print("-" * 62)
+    for name, score in modes:
+        throughput, p50, p99 = measure(score, concurrency, duration)
+        print(f"{name:<22} {throughput:>10.0f} {p50:>10.2f} {p99:>10.2f}")
+    print("=" * 62)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    run(int(args[0]) if args else 32, float(args[1]) if len(args) > 1 else 5.0)
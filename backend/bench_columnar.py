@@ -0,0 +1,85 @@
+"""
+Bytes on the wire and parse time: JSON vs columnar batch payloads
+
+Usage: python bench_columnar.py
+For batches of 10k profiles, compares request/response sizes, the time to
+turn the request body into scoring columns (json.loads plus the per-field
+extraction of /api/predict/batch vs columnar decoding), and the full
+/api/predict/batch round trip through Flask's test client.
+"""
+import json
+import time
+
+import numpy as np
+
+from columnar import MEDIA_TYPE, encode
+from server import _columnar_profiles, app
+
+ROWS = 10000
+
+
+def _profiles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'income': rng.uniform(2000, 15000, n).round(2),
+        'equity': rng.uniform(0, 200000, n).round(2),
+        'savings': rng.uniform(200, 3000, n).round(2),
+        'target': rng.uniform(100000, 800000, n).round(2),
+        'years': rng.integers(1, 16, n).astype(np.int32),
+        'rate': rng.choice([2.5, 5.0, 7.5], n),
+        'marital': rng.integers(0, 2, n).astype(np.uint8),
+        'kids': rng.integers(0, 4, n).astype(np.uint8)
+    }
+
+
+def _parse_json(body):
+    profiles = json.loads(body)['profiles']
+    return ([float(p.get('income', 0)) for p in profiles], [float(p.get('equity', 0)) for p in profiles],
+            [float(p.get('savings', 0)) for p in profiles], [float(p.get('target', 1)) for p in profiles],
+            [int(p.get('years', 1)) for p in profiles], [float(p.get('rate', 5.0)) for p in profiles],
+            [p.get('marital', 'single') for p in profiles], [int(p.get('kids', 0)) for p in profiles])
+
+
+def _best(fn, repeat=20):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def run():
+    columns = _profiles(ROWS)
+    records = [{name: values[i].item() for name, values in columns.items()} for i in range(ROWS)]
+    for record in records:
+        record['marital'] = 'married' if record['marital'] else 'single'
+    json_body = json.dumps({'profiles': records}).encode()
+    columnar_body = encode(columns)
+
+    client = app.test_client()
+    json_response = client.post('/api/predict/batch', data=json_body, content_type='application/json')
+    columnar_response = client.post('/api/predict/batch', data=columnar_body, content_type=MEDIA_TYPE,
+                                    headers={'Accept': MEDIA_TYPE})
+    assert columnar_response.mimetype == MEDIA_TYPE
+
+    json_parse = _best(lambda: _parse_json(json_body))
+    columnar_parse = _best(lambda: _columnar_profiles(columnar_body))
+    json_e2e = _best(lambda: client.post('/api/predict/batch', data=json_body, content_type='application/json'),
+                     repeat=5)
+    columnar_e2e = _best(lambda: client.post('/api/predict/batch', data=columnar_body, content_type=MEDIA_TYPE,
+                                             headers={'Accept': MEDIA_TYPE}), repeat=5)
+
+    print("\n" + "=" * 70)
+    print(f"/api/predict/batch, {ROWS:,} profiles")
+    print(f"{'Format':<10} {'request B':>11} {'response B':>11} {'parse ms':>10} {'round trip ms':>14}")
+    print("-" * 70)
+    print(f"{'json':<10} {len(json_body):>11,} {len(json_response.get_data()):>11,} {json_parse:>10.2f} "
+          f"{json_e2e:>14.2f}")
+    print(f"{'columnar':<10} {len(columnar_body):>11,} {len(columnar_response.get_data()):>11,} "
+          f"{columnar_parse:>10.3f} {columnar_e2e:>14.2f}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,57 @@
+"""
+Per-call latency report: sklearn predict vs the compiled NumPy scorers
+
+Usage: python bench_inference.py
+"""
+import timeit
+
+import numpy as np
+
+from server import predictor
+
+
+def _per_call_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def run():
+    rng = np.random.default_rng(0)
+    readiness_row = np.array([[5000, 50000, 800, 350000, 1, 2, 4000, 410000, 1.17]])
+    likelihood_row = rng.uniform(1, 10, (1, 11))
+    property_row = np.array([[120, 4, 2, 1, 1, 15]])
+    readiness_batch = np.repeat(readiness_row, 1000, axis=0)
+
+    cases = [
+        ('readiness (1 row)',
+         lambda: predictor.readiness_model.predict(predictor.poly_features.transform(readiness_row)),
+         lambda: predictor.compiled_readiness.predict(readiness_row), 2000),
+        ('readiness (1000 rows)',
+         lambda: predictor.readiness_model.predict(predictor.poly_features.transform(readiness_batch)),
+         lambda: predictor.compiled_readiness.predict(readiness_batch), 200),
+        ('likelihood (1 row)',
+         lambda: predictor.likelihood_model.predict(likelihood_row),
+         lambda: predictor.compiled_likelihood.predict(likelihood_row), 2000),
+        ('property price (1 row)',
+         lambda: predictor.property_price_model.predict(property_row),
+         lambda: predictor.compiled_property_price.predict(property_row), 2000),
+        ('predict_readiness end-to-end', None,
+         lambda: predictor.predict_readiness(5000, 50000, 800, 350000, 'married', 2), 2000),
+        ('predict_likelihood end-to-end', None,
+         lambda: predictor.predict_likelihood(5000, 50000, 800, 350000, 5, 5.0, 'married', 2), 2000),
+    ]
+
+    print("\n" + "=" * 68)
+    print(f"{'Case':<32} {'sklearn (us)':>12} {'compiled (us)':>14} {'speedup':>8}")
+    print("-" * 68)
+    for name, sklearn_fn, compiled_fn, number in cases:
+        compiled_us = _per_call_us(compiled_fn, number)
+        if sklearn_fn is None:
+            print(f"{name:<32} {'-':>12} {compiled_us:>14.1f} {'-':>8}")
+            continue
+        sklearn_us = _per_call_us(sklearn_fn, number)
+        print(f"{name:<32} {sklearn_us:>12.1f} {compiled_us:>14.1f} {sklearn_us / compiled_us:>7.1f}x")
+    print("=" * 68)
+
+
+if __name__ == '__main__':
+    run()
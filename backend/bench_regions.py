@@ -0,0 +1,57 @@
+"""
+Region model registry report: cold-load latency, warm lookups and residency
+
+Usage: python bench_regions.py [n_regions]
+Builds n_regions synthetic region models (default 500) in a temp folder,
+then requests random regions through a registry holding at most 64 models.
+"""
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from regions import RegionModelRegistry, build_synthetic_regions
+from server import predictor
+
+
+def _rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * 4096 / 2 ** 20
+
+
+def run(n_regions):
+    directory = tempfile.mkdtemp()
+    started = time.perf_counter()
+    names = [f'region-{i:04d}' for i in range(n_regions)]
+    build_synthetic_regions(directory, {name: 1.0 + i / n_regions for i, name in enumerate(names)},
+                            n_samples=200)
+    build_seconds = time.perf_counter() - started
+
+    registry = RegionModelRegistry(directory, max_resident=64, load_timeout_ms=50)
+    rss_before = _rss_mb()
+    rng = np.random.default_rng(0)
+    latencies = {'cold': [], 'warm': []}
+    for name in rng.choice(names, 20000):
+        t0 = time.perf_counter()
+        model, status = registry.get(name)
+        predictor.predict_property_price(120, 4, 2, 'city', 'good', 1995, model=model)
+        latencies['cold' if status in ('loaded', 'loading') else 'warm'].append(time.perf_counter() - t0)
+    stats = registry.stats()
+
+    print("\n" + "=" * 60)
+    print(f"Regions on disk: {n_regions} (built in {build_seconds:.1f}s), max resident: 64")
+    print("-" * 60)
+    for kind, values in latencies.items():
+        values = np.array(values) * 1000
+        print(f"{kind:>5} requests: {len(values):>6}  p50 {np.percentile(values, 50):7.3f} ms  "
+              f"p99 {np.percentile(values, 99):7.3f} ms  max {values.max():7.3f} ms")
+    print(f"Resident models: {stats['resident']}  evictions: {stats['evictions']}  "
+          f"fallbacks: {stats['fallbacks']}")
+    print(f"Mean / max load: {stats['mean_load_ms']:.2f} / {stats['max_load_ms']:.2f} ms")
+    print(f"RSS growth over 20k requests: {_rss_mb() - rss_before:+.1f} MB")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,275 @@
+"""
+Offline benchmark and regression suite for the prediction backend
+
+Times the hot paths with direct MLPredictor calls and Flask's test client
+(no live server needed), saves the results as JSON and, given a baseline
+from an earlier run, fails when a case slowed down beyond its threshold.
+
+Usage:
+    python bench_regression.py --output baseline.json            # on the reference commit
+    python bench_regression.py --baseline baseline.json          # on the change; exit 1 on regression
+    python bench_regression.py --quick                           # fewer repeats, smoke run
+
+startup_first_response launches a lazily starting server process (see
+bench_startup.py) and is not normalized.
+
+Every case is also stored relative to a fixed reference workload timed
+alongside it ('normalized'); comparisons use that ratio, which cancels most
+of the speed drift of shared or throttled hosts. Baselines are still best
+compared on the same host.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from bench_startup import measure as measure_startup
+from server import app, predictor, prediction_caches
+
+# Allowed slowdown relative to the baseline before a case counts as a regression
+DEFAULT_THRESHOLD = 0.30
+# Request-level cases include Werkzeug/Flask overhead and are noisier
+E2E_THRESHOLD = 0.40
+
+
+def _profiles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'incomes': rng.uniform(2000, 15000, n),
+        'equities': rng.uniform(0, 200000, n),
+        'savings': rng.uniform(200, 3000, n),
+        'targets': rng.uniform(100000, 800000, n),
+        'years': rng.integers(1, 16, n),
+        'rates': rng.uniform(2, 8, n),
+        'marital': rng.choice(['single', 'married'], n),
+        'kids': rng.integers(0, 4, n)
+    }
+
+
+def _properties(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(30, 250, n), rng.integers(1, 7, n).astype(float),
+            rng.integers(1, 4, n).astype(float), rng.choice(['rural', 'city', 'premium'], n).tolist(),
+            rng.choice(['renovation', 'good', 'new'], n).tolist(), rng.integers(1900, 2025, n))
+
+
+_REFERENCE_ARRAY = np.random.default_rng(0).random((64, 9))
+
+
+def _reference_work():
+    """Fixed mix of interpreter and small-NumPy work, like the predict paths"""
+    total = 0
+    for i in range(200):
+        total += i * i
+    return total + float((_REFERENCE_ARRAY @ _REFERENCE_ARRAY.T).sum())
+
+
+def _time_per_call(fn, number, repeat):
+    """
+    (best, median, reference) seconds per call over `repeat` runs of `number` calls
+
+    Each run is preceded by a run of _reference_work, so `reference` reflects
+    how fast the machine was while this case was measured; dividing by it
+    cancels most of the drift between runs on shared or throttled hosts.
+    """
+    runs, reference_runs = [], []
+    for _ in range(repeat):
+        reference_runs.append(timeit.timeit(_reference_work, number=100) / 100)
+        runs.append(timeit.timeit(fn, number=number) / number)
+    return min(runs), statistics.median(runs), min(reference_runs)
+
+
+def _latency(fn, number, repeat, threshold=DEFAULT_THRESHOLD, unit='us'):
+    best, median, reference = _time_per_call(fn, number, repeat)
+    factor = {'us': 1e6, 'ms': 1e3}[unit]
+    return {'value': best * factor, 'median': median * factor, 'unit': unit,
+            'normalized': best / reference, 'better': 'lower', 'threshold': threshold}
+
+
+def _throughput(fn, rows, number, repeat, threshold=DEFAULT_THRESHOLD):
+    best, median, reference = _time_per_call(fn, number, repeat)
+    return {'value': rows / best, 'median': rows / median, 'unit': 'rows/s',
+            'normalized': best / reference, 'better': 'higher', 'threshold': threshold}
+
+
+def run_suite(quick=False):
+    """Run every case and return {name: result dict}"""
+    repeat = 3 if quick else 7
+    scale = 10 if quick else 1
+    cases = {}
+
+    # Training: full build of all three models (R^2 prints suppressed)
+    def train():
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor.build_models(n_samples=1000)
+    cases['train_1000_samples'] = _latency(train, 1, repeat, unit='ms')
+
+    # Single-row predict paths
+    cases['predict_single'] = _latency(lambda: (
+        predictor.predict_readiness(5000, 50000, 800, 350000, 'married', 2),
+        predictor.predict_likelihood(5000, 50000, 800, 350000, 10, 5.0, 'married', 2)
+    ), 2000 // scale, repeat)
+    cases['predict_single_fallback'] = _latency(lambda: (
+        predictor.predict_readiness(40000, 50000, 800, 350000, 'married', 2),
+        predictor.predict_likelihood(40000, 50000, 800, 350000, 10, 5.0, 'married', 2)
+    ), 2000 // scale, repeat)
+
+    # Batch predict paths
+    p = _profiles(1000)
+    cases['predict_batch_1000'] = _throughput(lambda: (
+        predictor.predict_readiness_batch(p['incomes'], p['equities'], p['savings'], p['targets'],
+                                          p['marital'], p['kids']),
+        predictor.predict_likelihood_batch(p['incomes'], p['equities'], p['savings'], p['targets'],
+                                           p['years'], p['rates'], p['marital'], p['kids'])
+    ), 1000, 50 // scale, repeat)
+    cases['projection_30_years'] = _latency(lambda: predictor.predict_projection(
+        5000, 50000, 800, 350000, 5.0, 'married', 2, 30), 1000 // scale, repeat)
+
+    # Monte Carlo likelihood (10k paths x 180 months, no budget cut-off)
+    cases['simulate_10000x180'] = _latency(lambda: predictor.simulate_likelihood(
+        5000, 50000, 800, 350000, 15, 5.0, 'married', 2, paths=10000, seed=1), 20 // scale, repeat)
+
+    # Goal seeking (widest lattice: 49,901 target values, three branches)
+    cases['solve_max_target'] = _latency(lambda: predictor.solve_goal(
+        5000, 50000, 800, 350000, 10, 5.0, 'married', 2, 'target', 'likelihood', 80), 200 // scale, repeat)
+
+    # Property price
+    cases['property_single'] = _latency(lambda: predictor.predict_property_price(
+        120, 4, 2, 'city', 'good', 1995), 2000 // scale, repeat)
+    properties = _properties(10000)
+    cases['property_batch_10000'] = _throughput(
+        lambda: predictor.predict_property_price_batch(*properties), 10000, 20 // scale, repeat)
+
+    # End to end through Flask (JSON parse, routing, handler, serialization)
+    client = app.test_client()
+    profile = {'income': 5000, 'equity': 50000, 'savings': 800, 'target': 350000,
+               'years': 10, 'rate': 5.0, 'marital': 'married', 'kids': 2}
+    batch_payload = {'profiles': [
+        {'income': float(p['incomes'][i]), 'equity': float(p['equities'][i]),
+         'savings': float(p['savings'][i]), 'target': float(p['targets'][i]),
+         'years': int(p['years'][i]), 'rate': float(p['rates'][i]),
+         'marital': str(p['marital'][i]), 'kids': int(p['kids'][i])}
+        for i in range(100)
+    ]}
+    property_payload = {'sqm': 120, 'rooms': 4, 'bathrooms': 2, 'location': 'city',
+                        'condition': 'good', 'yearBuilt': 1995}
+
+    def predict_uncached():
+        prediction_caches['predict'].clear()
+        client.post('/api/predict', json=profile)
+
+    cases['e2e_predict_cached'] = _latency(
+        lambda: client.post('/api/predict', json=profile), 500 // scale, repeat, E2E_THRESHOLD)
+    cases['e2e_predict_uncached'] = _latency(predict_uncached, 500 // scale, repeat, E2E_THRESHOLD)
+    cases['e2e_predict_batch_100'] = _latency(
+        lambda: client.post('/api/predict/batch', json=batch_payload), 100 // scale, repeat, E2E_THRESHOLD)
+    cases['e2e_projection'] = _latency(
+        lambda: client.post('/api/projection', json=dict(profile, maxYears=30)), 500 // scale, repeat,
+        E2E_THRESHOLD)
+    cases['e2e_property_price'] = _latency(
+        lambda: client.post('/api/predict-property-price', json=property_payload), 500 // scale, repeat,
+        E2E_THRESHOLD)
+
+    # Lazy start (LAZY_MODELS=1): fresh process until /api/health/live first answers
+    starts = sorted(measure_startup(lazy=True, wait_ready=False)['first_response_s'] * 1000
+                    for _ in range(1 if quick else 3))
+    cases['startup_first_response'] = {'value': starts[0], 'median': statistics.median(starts), 'unit': 'ms',
+                                       'better': 'lower', 'threshold': E2E_THRESHOLD}
+
+    return cases
+
+
+def _change(result, previous):
+    """Relative slowdown of `result` vs `previous` (positive = worse)"""
+    # Prefer machine-speed-normalized timings; both sides store time per call there
+    if 'normalized' in result and 'normalized' in previous:
+        return result['normalized'] / previous['normalized'] - 1
+    if result['better'] == 'lower':
+        return result['value'] / previous['value'] - 1
+    return previous['value'] / result['value'] - 1
+
+
+def compare(cases, baseline, threshold=None):
+    """
+    Regressions of `cases` against a baseline results dict
+
+    Returns a list of (name, baseline value, current value, relative change)
+    for every case that got worse by more than its threshold (or `threshold`
+    if given). Cases missing from either side, or measured in a different
+    unit, are skipped.
+    """
+    regressions = []
+    for name, result in cases.items():
+        previous = baseline.get('cases', {}).get(name)
+        if previous is None or previous.get('unit') != result['unit']:
+            continue
+        change = _change(result, previous)
+        if change > (threshold if threshold is not None else result['threshold']):
+            regressions.append((name, previous['value'], result['value'], change))
+    return regressions
+
+
+def results_document(cases):
+    """Cases plus the environment they were measured in"""
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'cases': cases
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', default='bench_results.json', help='Where to write this run')
+    parser.add_argument('--baseline', help='Results JSON of a previous run to compare against')
+    parser.add_argument('--threshold', type=float,
+                        help='Override every per-case threshold (e.g. 0.1 = 10%% slower fails)')
+    parser.add_argument('--quick', action='store_true', help='Fewer iterations (smoke run)')
+    args = parser.parse_args(argv)
+
+    cases = run_suite(quick=args.quick)
+    with open(args.output, 'w') as f:
+        json.dump(results_document(cases), f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(cases, baseline, args.threshold) if baseline else []
+    regressed = {name for name, *_ in regressions}
+
+    print("\n" + "=" * 78)
+    print(f"{'Case':<28} {'Best':>12} {'Median':>12} {'Unit':>7} {'Slowdown':>14}")
+    print("-" * 78)
+    for name, result in cases.items():
+        previous = baseline.get('cases', {}).get(name) if baseline else None
+        comparable = previous is not None and previous.get('unit') == result['unit']
+        delta = f"{_change(result, previous):+.1%}" if comparable else '-'
+        flag = ' !' if name in regressed else ''
+        print(f"{name:<28} {result['value']:>12,.2f} {result['median']:>12,.2f} "
+              f"{result['unit']:>7} {delta:>14}{flag}")
+    print("=" * 78)
+    print(f"Results written to {args.output}")
+
+    if regressions:
+        for name, previous, current, change in regressions:
+            print(f"[FAIL] {name}: {previous:,.2f} -> {current:,.2f} ({change:.0%} worse)")
+        return 1
+    if baseline:
+        print("[OK] No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Per-interaction payload and latency: stateless requests vs a what-if session
+
+Usage: python bench_sessions.py
+Replays slider drags (years, then savings) two ways: the current page flow
+(POST /api/predict and POST /api/projection with the full profile per
+move) and a session (PATCH with the changed field, result read from the
+event stream). Bytes count JSON bodies and event text, not HTTP headers.
+"""
+import json
+import statistics
+import time
+
+from server import app
+
+PROFILE = {'income': 5000, 'equity': 60000, 'savings': 900, 'target': 400000, 'years': 6, 'rate': 5.0,
+           'marital': 'married', 'kids': 1}
+
+DRAGS = [{'years': years} for years in range(1, 31)] + \
+    [{'savings': savings} for savings in range(500, 2000, 25)]
+
+
+def _next_update(body):
+    """Data of the next 'update' event on an SSE body iterator"""
+    for chunk in body:
+        for message in chunk.decode().split('\n\n'):
+            if message.startswith('id: '):
+                return json.loads(message.split('data: ', 1)[1])
+
+
+def _stateless(client):
+    profile, sent, received, latencies = dict(PROFILE), 0, 0, []
+    for change in DRAGS:
+        profile.update(change)
+        started = time.perf_counter()
+        for route, body in (('/api/predict', profile), ('/api/projection', dict(profile, maxYears=30))):
+            payload = json.dumps(body)
+            response = client.post(route, data=payload, content_type='application/json')
+            sent += len(payload)
+            received += len(response.get_data())
+        latencies.append(time.perf_counter() - started)
+    return sent, received, latencies
+
+
+def _session(client):
+    session_id = client.post('/api/session', json=PROFILE).get_json()['session']
+    body = client.get(f'/api/session/{session_id}/stream').response
+    _next_update(body)
+    sent, received, latencies = 0, 0, []
+    for seq, change in enumerate(DRAGS):
+        payload = json.dumps(dict(change, seq=seq))
+        started = time.perf_counter()
+        client.patch(f'/api/session/{session_id}', data=payload, content_type='application/json')
+        event = _next_update(body)
+        latencies.append(time.perf_counter() - started)
+        sent += len(payload)
+        received += len(json.dumps(event, separators=(',', ':')))
+    client.delete(f'/api/session/{session_id}')
+    return sent, received, latencies
+
+
+def run():
+    client = app.test_client()
+    print("\n" + "=" * 70)
+    print(f"{len(DRAGS)} slider moves")
+    print(f"{'Mode':<12} {'sent B/move':>12} {'received B/move':>16} {'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 70)
+    for name, fn in (('stateless', _stateless), ('session', _session)):
+        sent, received, latencies = fn(client)
+        latencies.sort()
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(f"{name:<12} {sent / len(DRAGS):>12,.0f} {received / len(DRAGS):>16,.0f} "
+              f"{statistics.median(latencies) * 1000:>8.2f} {p95 * 1000:>8.2f}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    run()
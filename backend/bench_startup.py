@@ -0,0 +1,93 @@
+"""
+Time to first response: eager vs lazy (LAZY_MODELS=1) server start
+
+Usage: python bench_startup.py [--samples 1000]
+Starts the server in a fresh process, without a model artifact so the
+models are trained, and reports the seconds until GET /api/health/live
+first answers and until GET /api/health/ready reports the models ready.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def launch(port, lazy=True, env=None):
+    """Server process on 127.0.0.1:port (Werkzeug, threaded), training into a fresh artifact path"""
+    environment = dict(os.environ, LAZY_MODELS='1' if lazy else '0',
+                       MODEL_ARTIFACT=os.path.join(tempfile.mkdtemp(), 'predictor.npz'), **(env or {}))
+    code = f"from server import app; app.run(host='127.0.0.1', port={port}, threaded=True)"
+    return subprocess.Popen([sys.executable, '-c', code], cwd=BACKEND_DIR, env=environment,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def request(port, path, payload=None, timeout=5.0):
+    """(status, JSON body) of a request, or (None, None) while nothing listens"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(f'http://127.0.0.1:{port}{path}', data=data,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+    except OSError:
+        return None, None
+
+
+def wait_for(port, path, status=200, timeout=60.0, interval=0.01):
+    """Seconds (from now) until `path` answers with `status`; raises TimeoutError"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if request(port, path)[0] == status:
+            return time.perf_counter() - started
+        time.sleep(interval)
+    raise TimeoutError(f'{path} did not answer {status} within {timeout}s')
+
+
+def measure(lazy=True, samples=1000, wait_ready=True):
+    """{'first_response_s', 'ready_s'} for one server start ('ready_s' only with wait_ready)"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = launch(port, lazy=lazy, env={'TRAINING_SAMPLES': str(samples)})
+    try:
+        wait_for(port, '/api/health/live')
+        result = {'first_response_s': time.perf_counter() - started}
+        if wait_ready:
+            wait_for(port, '/api/health/ready')
+            result['ready_s'] = time.perf_counter() - started
+        return result
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(samples=1000):
+    print("\n" + "=" * 60)
+    print(f"Server start, training {samples:,} samples")
+    print(f"{'Mode':<8} {'first response s':>18} {'models ready s':>16}")
+    print("-" * 60)
+    for lazy in (False, True):
+        result = measure(lazy=lazy, samples=samples)
+        print(f"{'lazy' if lazy else 'eager':<8} {result['first_response_s']:>18.2f} {result['ready_s']:>16.2f}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time to first response, eager vs lazy start')
+    parser.add_argument('--samples', type=int, default=1000)
+    run(parser.parse_args().samples)
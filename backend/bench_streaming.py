@@ -0,0 +1,63 @@
+"""
+Out-of-core vs in-memory training report: peak RSS and rows/s
+
+Usage: python bench_streaming.py [n_samples ...]
+Defaults to 10^5 .. 4 * 10^6 rows. Each mode runs in its own process so the
+peak RSS figures do not include the other mode's allocations.
+"""
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from streaming import synthetic_chunks
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(mode, n_samples):
+    from server import MLPredictor, predictor
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    if mode == 'streamed':
+        models = predictor.build_models_streamed(synthetic_chunks(n_samples))
+    else:
+        models = MLPredictor.build_models(predictor, n_samples)
+    seconds = time.perf_counter() - started
+    print(json.dumps({'seconds': seconds, 'peak_mb': _peak_rss_mb(), 'baseline_mb': baseline,
+                      'readiness_r2': models.scores['readiness']}))
+
+
+def _measure(mode, n_samples):
+    output = subprocess.run([sys.executable, __file__, '--child', mode, str(n_samples)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(sample_counts):
+    rows = []
+    for n_samples in sample_counts:
+        for mode in ('in-memory', 'streamed'):
+            rows.append((n_samples, mode, _measure(mode, n_samples)))
+
+    print("\n" + "=" * 78)
+    print(f"{'Rows':>10} {'Mode':>10} {'Time (s)':>10} {'Rows/s':>12} {'Peak RSS (MB)':>14} "
+          f"{'Growth (MB)':>12}")
+    print("-" * 78)
+    for n_samples, mode, result in rows:
+        print(f"{n_samples:>10,} {mode:>10} {result['seconds']:>10.2f} "
+              f"{n_samples / result['seconds']:>12,.0f} {result['peak_mb']:>14.0f} "
+              f"{result['peak_mb'] - result['baseline_mb']:>12.0f}")
+    print("=" * 78)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        _child(sys.argv[2], int(sys.argv[3]))
+    else:
+        counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000, 4000000]
+        run(counts)
@@ -0,0 +1,29 @@
+"""
+Training timing report for MLPredictor.train_models
+
+Usage: python bench_training.py [n_samples ...]
+Defaults to 10^3 .. 10^6 samples per dataset.
+"""
+import sys
+
+from server import MLPredictor
+
+
+def run(sample_counts):
+    predictor = MLPredictor(n_samples=sample_counts[0])
+    rows = []
+    for n_samples in sample_counts:
+        predictor.train_models(n_samples)
+        rows.append((n_samples, predictor.training_time))
+
+    print("\n" + "=" * 60)
+    print(f"{'Samples':>12} {'Train time (s)':>16} {'Rows/s (x3 datasets)':>24}")
+    print("-" * 60)
+    for n_samples, seconds in rows:
+        print(f"{n_samples:>12,} {seconds:>16.3f} {3 * n_samples / seconds:>24,.0f}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000, 1000000]
+    run(counts)
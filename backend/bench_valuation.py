@@ -0,0 +1,67 @@
+"""
+Listings-per-second report for fair-value scoring
+
+Usage: python bench_valuation.py
+Times predict_property_price_batch, a per-listing predict_property_price
+loop, and the full /api/listings/valuation request (JSON in and out) for
+batches of 10 to 10,000 listings.
+"""
+import time
+
+import numpy as np
+
+from server import app, predictor
+
+BATCH_SIZES = (10, 100, 1000, 10000)
+
+
+def _listings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'id': i,
+            'sqm': float(rng.uniform(30, 250)),
+            'rooms': float(rng.integers(1, 7)),
+            'bathrooms': float(rng.integers(1, 4)),
+            'location': str(rng.choice(['rural', 'city', 'premium'])),
+            'condition': str(rng.choice(['renovation', 'good', 'new'])),
+            'yearBuilt': int(rng.integers(1900, 2025)),
+            'askingPrice': float(rng.uniform(150000, 1500000))
+        }
+        for i in range(n)
+    ]
+
+
+def _rate(fn, n, min_seconds=0.5):
+    runs, started = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return runs * n / elapsed
+
+
+def run():
+    client = app.test_client()
+    print("\n" + "=" * 70)
+    print(f"{'Batch':>7} {'batch method/s':>16} {'single loop/s':>15} {'endpoint/s':>14}")
+    print("-" * 70)
+    for n in BATCH_SIZES:
+        listings = _listings(n)
+        columns = [
+            [l['sqm'] for l in listings], [l['rooms'] for l in listings],
+            [l['bathrooms'] for l in listings], [l['location'] for l in listings],
+            [l['condition'] for l in listings], [l['yearBuilt'] for l in listings]
+        ]
+        payload = {'listings': listings, 'purchasingPower': 450000}
+
+        batch_rate = _rate(lambda: predictor.predict_property_price_batch(*columns), n)
+        loop_rate = _rate(lambda: [predictor.predict_property_price(*row) for row in zip(*columns)], n)
+        endpoint_rate = _rate(lambda: client.post('/api/listings/valuation', json=payload), n)
+        print(f"{n:>7} {batch_rate:>16,.0f} {loop_rate:>15,.0f} {endpoint_rate:>14,.0f}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,275 @@
+"""
+Bulk scorer for customer portfolios
+
+Usage:
+  python bulk_score.py customers.csv -o scored.csv [--workers 4] [--chunk-rows 20000]
+  python bulk_score.py customers.jsonl -o scored.jsonl
+  cat customers.jsonl | python bulk_score.py - --format jsonl > scored.jsonl
+
+Every input line is a profile with the /api/predict fields (income, equity,
+savings, target, years, rate, marital, kids; same defaults); CSV fields must
+not contain line breaks. Each output
+row is the input row plus readiness, likelihood, currPower and futureEquity
+as returned by /api/predict/batch, or an error for an invalid row. Output
+order follows the input.
+
+The main process only reads blocks of raw lines and writes results. Worker
+processes parse, score vectorized through MLPredictor's batch methods and
+format each block. At most 2 blocks per worker are in flight, so memory
+stays bounded whatever the input size. Workers import only the predictor
+module (not the Flask app and its services) and use the same models as
+the server, i.e. the MODEL_ARTIFACT artifact (or a fresh training run if
+it is missing or stale), loaded once per process.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# /api/predict defaults for missing or empty fields
+NUMERIC_DEFAULTS = {'income': 0.0, 'equity': 0.0, 'savings': 0.0, 'target': 1.0, 'years': 1.0,
+                    'rate': 5.0, 'kids': 0.0}
+PROFILE_FIELDS = tuple(NUMERIC_DEFAULTS) + ('marital',)
+RESULT_FIELDS = ('readiness', 'likelihood', 'currPower', 'futureEquity', 'error')
+DEFAULT_CHUNK_ROWS = 20000
+
+_predictor = None
+
+
+def _load_predictor():
+    """The server's predictor configuration (loads or trains the models on first use in this process)"""
+    global _predictor
+    if _predictor is None:
+        # Model loading is logged to stdout, which may be our output stream
+        with contextlib.redirect_stdout(sys.stderr):
+            from predictor import configured_predictor
+            _predictor = configured_predictor()
+    return _predictor
+
+
+def _numeric(values, default, n):
+    """
+    Float array of raw values (numbers or strings; None / '' -> default);
+    ValueError for non-finite values such as 'nan' or 'inf'
+    """
+    if values is None:
+        return np.full(n, default)
+    parsed = np.array([default if v is None or v == '' else v for v in values], dtype=float)
+    if not np.isfinite(parsed).all():
+        raise ValueError(f'non-finite value: {values[int(np.argmin(np.isfinite(parsed)))]!r}')
+    return parsed
+
+
+def _score_rowwise(columns, n):
+    """score_columns for a block with unparsable values: find them, score the rest"""
+    errors, valid = {}, []
+    for i in range(n):
+        try:
+            for field, default in NUMERIC_DEFAULTS.items():
+                _numeric([columns[field][i]] if field in columns else None, default, 1)
+            valid.append(i)
+        except (TypeError, ValueError) as e:
+            errors[i] = str(e)
+    results = [None] * n
+    if valid:
+        subset = {field: [values[i] for i in valid] for field, values in columns.items()}
+        scored, sub_errors = score_columns(subset, len(valid))
+        for j, i in enumerate(valid):
+            results[i] = scored[j]
+            if j in sub_errors:
+                errors[i] = sub_errors[j]
+    return results, errors
+
+
+def score_columns(columns, n):
+    """
+    Score n profiles given column-wise, vectorized
+
+    Parameters:
+    - columns: field -> sequence of n raw values (numbers or strings); missing
+      fields and None / '' values take the /api/predict defaults
+
+    Returns (results, errors): results[i] is (readiness, likelihood,
+    currPower, futureEquity) or None for an invalid row, errors maps those
+    rows to a message.
+    """
+    try:
+        parsed = {field: _numeric(columns.get(field), default, n)
+                  for field, default in NUMERIC_DEFAULTS.items()}
+    except (TypeError, ValueError):
+        return _score_rowwise(columns, n)
+    marital = [v or 'single' for v in columns.get('marital') or ['single'] * n]
+
+    # Same integer truncation as int() in /api/predict
+    parsed['years'] = np.trunc(parsed['years'])
+    parsed['kids'] = np.trunc(parsed['kids'])
+    valid = parsed['target'] > 0
+    errors = {int(i): 'Target must be greater than 0' for i in np.nonzero(~valid)[0]}
+    results = [None] * n
+    if not valid.any():
+        return results, errors
+
+    if not valid.all():
+        parsed = {field: values[valid] for field, values in parsed.items()}
+        marital = [m for m, ok in zip(marital, valid) if ok]
+    predictor = _load_predictor()
+    readiness, curr_power = predictor.predict_readiness_batch(
+        parsed['income'], parsed['equity'], parsed['savings'], parsed['target'], marital, parsed['kids'])
+    likelihood, future_equity = predictor.predict_likelihood_batch(
+        parsed['income'], parsed['equity'], parsed['savings'], parsed['target'], parsed['years'],
+        parsed['rate'], marital, parsed['kids'])
+    scored = zip(readiness.tolist(), likelihood.tolist(), curr_power.tolist(), future_equity.tolist())
+    for i, values in zip(np.nonzero(valid)[0].tolist(), scored):
+        results[i] = values
+    return results, errors
+
+
+def _score_csv_block(header, lines):
+    """Scored CSV text for raw data lines (without the header)"""
+    rows = list(csv.reader(lines))
+    width = len(header)
+    ragged = {i for i, row in enumerate(rows) if len(row) != width}
+    for i in ragged:
+        rows[i] = (rows[i] + [''] * width)[:width]
+    results, errors = score_columns(dict(zip(header, zip(*rows))), len(rows))
+
+    # Results are appended to the raw input line, so well-formed fields are never re-quoted
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    for i, (line, values) in enumerate(zip(lines, results)):
+        fields = list(values) + [''] if values is not None else ['', '', '', '', errors[i]]
+        if i in ragged:
+            writer.writerow(rows[i] + fields)
+        elif values is not None:
+            out.write('%s,%r,%r,%r,%r,\n' % (line.rstrip('\r\n'), *values))
+        else:
+            out.write(line.rstrip('\r\n') + ',')
+            writer.writerow(fields)
+    return out.getvalue()
+
+
+def _score_jsonl_block(lines):
+    """Scored JSONL text for raw input lines"""
+    records, parse_errors = [], {}
+    for i, line in enumerate(lines):
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError('row must be a JSON object')
+        except ValueError as e:
+            record, parse_errors[i] = {}, f'invalid JSON: {e}'
+        records.append(record)
+
+    columns = {field: [record.get(field) for record in records] for field in PROFILE_FIELDS}
+    results, errors = score_columns(columns, len(records))
+    errors.update(parse_errors)
+
+    out = []
+    for i, (record, values) in enumerate(zip(records, results)):
+        if i in errors:
+            out.append(json.dumps({**record, 'error': errors[i]}))
+        else:
+            out.append(json.dumps({**record, **dict(zip(RESULT_FIELDS, values))}))
+    return '\n'.join(out) + '\n'
+
+
+def _blocks(stream, chunk_rows):
+    """Lists of up to chunk_rows non-empty lines"""
+    block = []
+    for line in stream:
+        if line.strip():
+            block.append(line)
+            if len(block) == chunk_rows:
+                yield block
+                block = []
+    if block:
+        yield block
+
+
+def score_stream(source, sink, fmt, workers=1, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Score every profile in `source` (text stream) and write results to `sink`
+
+    Parameters:
+    - fmt: 'csv' (with header row) or 'jsonl'
+    - workers: Worker processes; 1 scores in this process
+    - chunk_rows: Rows per block handed to a worker
+
+    Returns the number of rows scored.
+    """
+    if fmt == 'csv':
+        header_line = source.readline()
+        header = next(csv.reader([header_line]), [])
+        if not header:
+            return 0
+        sink.write(','.join([header_line.rstrip('\r\n')] + list(RESULT_FIELDS)) + '\n')
+        task = lambda block: (_score_csv_block, header, block)  # noqa: E731
+    else:
+        task = lambda block: (_score_jsonl_block, block)  # noqa: E731
+
+    rows = 0
+    if workers <= 1:
+        for block in _blocks(source, chunk_rows):
+            fn, *args = task(block)
+            sink.write(fn(*args))
+            rows += len(block)
+        return rows
+
+    # Bounded window of in-flight blocks: results are written in input order
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_predictor) as pool:
+        pending = deque()
+        for block in _blocks(source, chunk_rows):
+            pending.append((len(block), pool.submit(*task(block))))
+            if len(pending) >= 2 * workers:
+                n, future = pending.popleft()
+                sink.write(future.result())
+                rows += n
+        while pending:
+            n, future = pending.popleft()
+            sink.write(future.result())
+            rows += n
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score a customer portfolio (CSV or JSONL)')
+    parser.add_argument('input', help="Input file, or '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="Output file (default: stdout)")
+    parser.add_argument('--format', choices=('csv', 'jsonl'),
+                        help='Input/output format (default: from the input file extension)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--artifact', help='Model artifact (default: MODEL_ARTIFACT or the server default)')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.input.endswith('.csv') else 'jsonl')
+    if args.artifact:
+        os.environ['MODEL_ARTIFACT'] = args.artifact  # inherited by the workers
+    _load_predictor()  # train or validate the artifact once, before forking workers
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    started = time.perf_counter()
+    try:
+        rows = score_stream(source, sink, fmt, workers=args.workers, chunk_rows=args.chunk_rows)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    seconds = time.perf_counter() - started
+    print(f"[OK] Scored {rows:,} rows in {seconds:.2f}s ({rows / seconds:,.0f} rows/s, "
+          f"{args.workers} workers)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Bounded LRU/TTL cache for prediction results
+
+Endpoints normalize their inputs with quantize() and use the normalized
+tuple both as the cache key and as the model input, so nearly identical
+payloads (slider drags, repeated form submits) share one computation and a
+cached result never depends on which request filled it.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def quantize(value, step):
+    """Round `value` to the nearest multiple of `step` (step <= 0 leaves it unchanged)"""
+    if not step or step <= 0:
+        return value
+    return round(round(value / step) * step, 10)
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds
+
+    Parameters:
+    - max_size: Maximum number of entries; 0 disables caching
+    - ttl: Seconds an entry stays valid; 0 or None means no expiry
+    - clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, max_size=1024, ttl=300.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return (True, value) on a hit, (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        """Store `value`, evicting least recently used entries beyond max_size"""
+        if self.max_size <= 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling compute() and storing it on a miss"""
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters and limits as a JSON-serialisable dict"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
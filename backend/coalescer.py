@@ -0,0 +1,99 @@
+"""
+Micro-batching request coalescer
+
+Concurrent callers submit single items; a dispatcher thread gathers them for
+up to `max_wait_ms` (or until `max_batch_size` items are waiting), scores
+the whole group with one vectorized call and hands each caller its own
+result. Useful when many request threads each score one profile.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class RequestCoalescer:
+    """
+    Parameters:
+    - score_batch: Callable taking a list of items and returning a list of
+      results in the same order
+    - max_batch_size: Upper bound on items scored per call
+    - max_wait_ms: How long the first item of a batch may wait for company
+    """
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait_ms=2.0):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item, timeout=None):
+        """Score `item` as part of the next batch and return its result"""
+        self._ensure_dispatcher()
+        future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout=timeout)
+
+    def stats(self):
+        """Batch counters as a JSON-serialisable dict"""
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
+
+    def _ensure_dispatcher(self):
+        # Started lazily (and restarted after fork) because threads do not survive fork
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._dispatch, name='request-coalescer',
+                                                 daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """Block for the first item, then gather more until the window or batch size is hit"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # Anything already queued rides along without further waiting
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.score_batch(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,113 @@
+"""
+Compact columnar binary format for batch prediction I/O
+
+A payload is a small header followed by one little-endian array per field:
+
+    offset 0   magic b'RGEC'
+           4   format version (uint8, 1)
+           5   reserved (uint8, 0)
+           6   column count (uint16)
+           8   row count (uint32)
+          12   data offset: header size in bytes, a multiple of 8 (uint32)
+          16   column directory, per column: name length (uint8), dtype
+               ('<f8', '<i4', '|u1', ... as 3 ASCII bytes), name (UTF-8)
+    data offset: column arrays in directory order, each padded to 8 bytes
+
+Decoding maps every column onto the payload with np.frombuffer, so the
+arrays handed to MLPredictor share memory with the request body (no
+per-field parsing, no copy). Marital status travels as a uint8 code
+(1 = married), see MARITAL_CODES.
+"""
+import struct
+
+import numpy as np
+
+MEDIA_TYPE = 'application/vnd.rge.columnar'
+MAGIC = b'RGEC'
+VERSION = 1
+MARITAL_CODES = {'single': 0, 'married': 1}
+
+_HEADER = struct.Struct('<4sBBHII')
+_COLUMN = struct.Struct('<B3s')
+# Accepted dtypes (little-endian or single byte): floats, signed/unsigned integers, bool
+_DTYPES = {'<f8', '<f4', '<i8', '<i4', '<i2', '|i1', '<u8', '<u4', '<u2', '|u1', '|b1'}
+
+
+class ColumnarError(ValueError):
+    """Raised for a malformed columnar payload"""
+
+
+def _padded(size):
+    return -size % 8
+
+
+def encode(columns):
+    """
+    Columnar payload for a dict of equal-length 1-d arrays (name -> array)
+
+    Arrays are written in little-endian byte order; native little-endian
+    arrays are written without conversion.
+    """
+    arrays = {}
+    for name, values in columns.items():
+        array = np.asarray(values)
+        if array.dtype.kind not in 'fiub':
+            raise ColumnarError(f'column {name} must be numeric, not {array.dtype}')
+        arrays[name] = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    lengths = {len(array) for array in arrays.values()}
+    if len(lengths) > 1:
+        raise ColumnarError('columns must have equal lengths')
+    n_rows = lengths.pop() if lengths else 0
+
+    directory = b''.join(_COLUMN.pack(len(name.encode()), array.dtype.str.encode()) + name.encode()
+                         for name, array in arrays.items())
+    header_size = _HEADER.size + len(directory)
+    header_size += _padded(header_size)
+    parts = [_HEADER.pack(MAGIC, VERSION, 0, len(arrays), n_rows, header_size), directory,
+             bytes(header_size - _HEADER.size - len(directory))]
+    for array in arrays.values():
+        parts.append(array.data)
+        parts.append(bytes(_padded(array.nbytes)))
+    return b''.join(parts)
+
+
+def decode(payload):
+    """
+    (columns, n_rows) of a columnar payload; columns maps name -> read-only
+    array viewing `payload` (bytes, bytearray or memoryview)
+
+    Raises ColumnarError for a payload that is truncated, has an unknown
+    magic/version or dtype, or repeats a column.
+    """
+    buffer = memoryview(payload)
+    if len(buffer) < _HEADER.size:
+        raise ColumnarError('payload shorter than the header')
+    magic, version, _, n_columns, n_rows, data_offset = _HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ColumnarError(f'not a version {VERSION} columnar payload')
+    if data_offset % 8 or data_offset > len(buffer):
+        raise ColumnarError('invalid data offset')
+
+    columns = {}
+    position, offset = _HEADER.size, data_offset
+    for _ in range(n_columns):
+        if position + _COLUMN.size > data_offset:
+            raise ColumnarError('truncated column directory')
+        name_length, dtype = _COLUMN.unpack_from(buffer, position)
+        position += _COLUMN.size
+        name = bytes(buffer[position:position + name_length]).decode('utf-8', 'replace')
+        position += name_length
+        dtype = dtype.decode('ascii', 'replace')
+        if dtype not in _DTYPES:
+            raise ColumnarError(f'column {name}: unsupported dtype {dtype}')
+        if name in columns:
+            raise ColumnarError(f'column {name} appears twice')
+        dtype = np.dtype(dtype)
+        if offset + n_rows * dtype.itemsize > len(buffer):
+            raise ColumnarError(f'column {name} is truncated')
+        columns[name] = np.frombuffer(buffer, dtype=dtype, count=n_rows, offset=offset)
+        offset += n_rows * dtype.itemsize
+        offset += _padded(n_rows * dtype.itemsize)
+    if position > data_offset:
+        raise ColumnarError('truncated column directory')
+    return columns, n_rows
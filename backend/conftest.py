@@ -0,0 +1,9 @@
+"""
+Shared pytest setup: keep model artifacts written during tests out of backend/models and
+answer /api/advice with the offline stub LLM
+"""
+import os
+import tempfile
+
+os.environ.setdefault('MODEL_ARTIFACT', os.path.join(tempfile.mkdtemp(), 'predictor.npz'))
+os.environ.setdefault('ADVICE_LLM', 'stub')
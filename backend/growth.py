@@ -0,0 +1,67 @@
+"""
+Closed-form compound growth for monthly savings plans
+
+Replaces the month-by-month loop
+    for _ in range(months):
+        equity = equity * (1 + monthly_rate) + savings
+with the annuity formula
+    equity * (1 + r)^n + savings * ((1 + r)^n - 1) / r
+evaluated with log1p/expm1 so small rates keep full precision.
+All functions accept scalars or NumPy arrays and broadcast like ufuncs.
+"""
+import numpy as np
+
+
+def monthly_rate(annual_rate_percent):
+    """Convert an annual rate in percent (e.g. 5.0) to a monthly decimal rate"""
+    return (np.asarray(annual_rate_percent, dtype=float) / 100) / 12
+
+
+def horizon_months(years):
+    """Whole months in a horizon of `years`, truncated like int(years * 12)"""
+    return np.trunc(np.asarray(years, dtype=float) * 12)
+
+
+def future_value(principal, contribution, rate, months):
+    """
+    Future value of `principal` after `months` monthly compounding steps at
+    monthly `rate`, with `contribution` added at the end of every month.
+
+    Parameters:
+    - principal: Starting equity
+    - contribution: Monthly savings added after each compounding step
+    - rate: Monthly decimal rate (see monthly_rate)
+    - months: Number of compounding steps; negative values count as 0
+
+    Inputs broadcast against each other, so passing column vectors for the
+    profile fields and a row vector of months yields a (profiles x horizons)
+    matrix in one call.
+    """
+    principal = np.asarray(principal, dtype=float)
+    contribution = np.asarray(contribution, dtype=float)
+    rate = np.asarray(rate, dtype=float)
+    months = np.maximum(np.asarray(months, dtype=float), 0)
+
+    # (1 + r)^n - 1 without cancellation for small r
+    growth_minus_one = np.expm1(months * np.log1p(rate))
+
+    # Annuity factor sum_{k<n} (1 + r)^k, which degenerates to n when r == 0
+    safe_rate = np.where(rate == 0, 1.0, rate)
+    annuity = np.where(rate == 0, months, growth_minus_one / safe_rate)
+
+    return principal * (growth_minus_one + 1) + contribution * annuity
+
+
+def future_value_by_horizon(principal, contribution, rate, months):
+    """
+    Future values for N profiles at H horizons as an (N, H) array
+
+    Parameters:
+    - principal, contribution, rate: Length-N sequences (or scalars)
+    - months: Length-H sequence of horizons in months
+    """
+    principal = np.atleast_1d(np.asarray(principal, dtype=float))[:, None]
+    contribution = np.atleast_1d(np.asarray(contribution, dtype=float))[:, None]
+    rate = np.atleast_1d(np.asarray(rate, dtype=float))[:, None]
+    months = np.atleast_1d(np.asarray(months, dtype=float))[None, :]
+    return future_value(principal, contribution, rate, months)
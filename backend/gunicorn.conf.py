@@ -0,0 +1,67 @@
+"""
+gunicorn configuration for the ML prediction server
+
+Environment overrides:
+- PORT: Listen port (default 5000)
+- WEB_WORKERS: Pre-forked worker processes (default: CPU count)
+- WEB_THREADS: Threads per worker (default 2)
+- WEB_TIMEOUT: Worker timeout in seconds (default 60)
+
+Each worker serves from the model set loaded in the master. A retrain,
+outcome update (/api/outcomes) or rollback only swaps models inside the
+worker that received it and rewrites the shared artifact; the other
+workers load that artifact within ARTIFACT_SYNC_SECONDS (default 5) of
+their next request. Outcome updates are not merged across workers: two
+posted to different workers at once each start from their worker's set,
+and the later save wins. Send them to one worker (or one at a time) when
+every outcome must count. With ARTIFACT_SYNC_SECONDS=0, restart (or HUP)
+the master to roll a new artifact out to every worker.
+
+With LAZY_MODELS=1 the master binds at once and warm-up runs in the
+background; a worker forked before it finished (threads do not survive
+fork) starts its own warm-up in post_fork and serves formula predictions
+until then. Point load balancer readiness checks at /api/health/ready and
+liveness checks at /api/health/live.
+
+What-if sessions (/api/session) live in the worker that created them and
+each open event stream holds one worker thread. post_fork therefore turns
+sessions off (503; the frontend falls back to the stateless endpoints)
+unless WEB_WORKERS=1, and caps the open streams per worker at
+WEB_THREADS - 1 (and SESSION_MAX_STREAMS) so one thread always remains for
+/api/predict and the other routes. To serve sessions, run one worker with
+WEB_THREADS of the expected open streams plus at least one.
+"""
+import gc
+import multiprocessing
+import os
+
+# One BLAS thread per worker; parallelism comes from the worker processes
+for var in ('OPENBLAS_NUM_THREADS', 'OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(var, '1')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WEB_THREADS', 2))
+worker_class = 'gthread'
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+
+# Load server.py (and its models) once in the master before forking
+preload_app = True
+
+
+def post_fork(server, worker):
+    """
+    Finish a lazy start in the worker if the master's warm-up had not published
+    models yet, and fit what-if sessions to the worker setup
+    """
+    from server import LAZY_MODELS, predictor, whatif_sessions
+    if LAZY_MODELS:
+        predictor.start_warm_up()
+    if not whatif_sessions.limit_to_server(worker.cfg.workers, worker.cfg.threads):
+        server.log.info("What-if sessions off: they need a single worker (%s configured)", worker.cfg.workers)
+
+
+def when_ready(server):
+    """Move everything loaded so far out of the GC's reach so workers keep sharing its pages"""
+    gc.freeze()
+    server.log.info("Models preloaded (%s workers x %s threads)", workers, threads)
@@ -0,0 +1,74 @@
+"""
+sklearn-free inference for the fitted MLPredictor models
+
+Pulls coef_/intercept_ out of fitted LinearRegression models and expands
+PolynomialFeatures terms with precomputed column indices, skipping sklearn's
+per-call input validation. The expanded matrix has the same column order and
+values as PolynomialFeatures.transform and is scored with the same
+`X @ coef + intercept` expression, so outputs are bit-identical to sklearn.
+Terms above degree 2 (not served, only timed by selection.py) multiply
+their factors in another order than sklearn and may differ in the last bits.
+"""
+import numpy as np
+
+
+class CompiledLinearModel:
+    """Plain NumPy scorer for a fitted LinearRegression"""
+
+    def __init__(self, model):
+        self.coef = np.ascontiguousarray(model.coef_, dtype=float)
+        self.intercept = float(model.intercept_)
+        self.n_features = self.coef.shape[0]
+
+    def features(self, X):
+        """Model input matrix for raw features X (identity for linear models)"""
+        return X
+
+    def predict(self, X):
+        """
+        Score a 2D array of raw feature rows (a 1D row is treated as one row)
+        Returns a 1D array with one prediction per row.
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X[None, :]
+        return self.features(X) @ self.coef + self.intercept
+
+
+class CompiledPolynomialModel(CompiledLinearModel):
+    """Plain NumPy scorer for PolynomialFeatures followed by a linear model (LinearRegression, Ridge)"""
+
+    def __init__(self, poly_features, model):
+        super().__init__(model)
+        powers = np.asarray(poly_features.powers_)
+        if powers.shape[0] != self.n_features:
+            raise ValueError('polynomial features do not match the model coefficients')
+
+        self.n_inputs = powers.shape[1]
+        degrees = powers.sum(axis=1)
+
+        # Output column -> input column(s) for each term, in PolynomialFeatures order
+        self.bias_columns = np.flatnonzero(degrees == 0)
+        self.linear_columns = np.flatnonzero(degrees == 1)
+        self.linear_inputs = powers[self.linear_columns].argmax(axis=1)
+        self.quadratic_columns = np.flatnonzero(degrees == 2)
+        quadratic_powers = powers[self.quadratic_columns]
+        # x_i * x_j with i <= j; squares (power 2) have i == j
+        self.quadratic_left = quadratic_powers.argmax(axis=1)
+        self.quadratic_right = self.n_inputs - 1 - quadratic_powers[:, ::-1].argmax(axis=1)
+        # Higher degrees: output columns and the input column of each factor, per degree
+        self.higher_terms = [
+            (columns, np.array([np.repeat(np.arange(self.n_inputs), row) for row in powers[columns]]))
+            for columns in (np.flatnonzero(degrees == degree) for degree in range(3, degrees.max() + 1))
+            if len(columns)
+        ]
+
+    def features(self, X):
+        """Polynomial expansion of X, as PolynomialFeatures.transform"""
+        expanded = np.empty((X.shape[0], self.n_features))
+        expanded[:, self.bias_columns] = 1.0
+        expanded[:, self.linear_columns] = X[:, self.linear_inputs]
+        expanded[:, self.quadratic_columns] = X[:, self.quadratic_left] * X[:, self.quadratic_right]
+        for columns, factors in self.higher_terms:
+            expanded[:, columns] = X[:, factors].prod(axis=2)
+        return expanded
@@ -0,0 +1,99 @@
+"""
+Background job runner for long-running maintenance work such as retraining
+
+Jobs run one at a time on a dedicated worker thread so request threads never
+block on them. Each job reports progress through a callback and its status
+is kept (for the most recent `max_history` jobs) for polling endpoints.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundJobs:
+    """
+    Single-worker job queue with pollable status
+
+    Parameters:
+    - max_history: Finished jobs kept for status lookups
+    """
+
+    def __init__(self, max_history=20):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='background-job')
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn):
+        """
+        Queue fn(progress) and return a snapshot of its job record
+
+        If a job of the same kind is still queued or running, that job is
+        returned instead of starting another one.
+        """
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job['kind'] == kind and job['status'] in ('queued', 'running'):
+                    return dict(job)
+
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                'id': job_id,
+                'kind': kind,
+                'status': 'queued',
+                'progress': 0.0,
+                'stage': None,
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+            self._trim()
+            self._futures[job_id] = self._executor.submit(self._run, job_id, fn)
+            return dict(job)
+
+    def get(self, job_id):
+        """Snapshot of a job record, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes (or timeout) and return its snapshot"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.exception(timeout=timeout)
+        return self.get(job_id)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _run(self, job_id, fn):
+        self._update(job_id, status='running', started_at=time.time())
+
+        def progress(fraction, stage):
+            self._update(job_id, progress=round(float(fraction), 3), stage=stage)
+
+        try:
+            result = fn(progress)
+        except Exception as e:
+            self._update(job_id, status='failed', error=str(e), finished_at=time.time())
+        else:
+            self._update(job_id, status='succeeded', progress=1.0, result=result,
+                         finished_at=time.time())
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond max_history (caller holds the lock)"""
+        finished = [job_id for job_id, job in self._jobs.items()
+                    if job['status'] in ('succeeded', 'failed')]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
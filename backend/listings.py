@@ -0,0 +1,359 @@
+"""
+Server-side proxy for the ThinkImmo listings API
+
+Pages are fetched from the upstream API, cached by (location, page) with
+LRU/TTL eviction, and the page after the last one requested is prefetched in
+the background. Filtering and sorting (a port of applyFilters in js/buy.js)
+run on the server, so the browser only receives the rows it renders.
+
+Results are paged by offset: each query (location, filters, sort) keeps its
+matches so far, and a scroll only filters the upstream pages it newly needs
+and merges their matches in; rows already handed out keep their positions.
+"""
+import heapq
+import json
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from cache import PredictionCache
+
+# What the browser's `"APARTMENTBUY" | "HOUSEBUY"` expression evaluated to;
+# kept so the proxy returns the same result set the page used to get
+LISTING_TYPE = 0
+
+PRICE_FIELDS = ('buyingPrice', 'price', 'priceValue')
+ROOM_FIELDS = ('rooms', 'roomCount')
+SQM_FIELDS = ('squareMeter', 'area', 'size')
+PPSQM_FIELDS = ('pricePerSqm', 'pricePerSquareMeter')
+YEAR_FIELDS = ('constructionYear', 'yearBuilt', 'builtYear')
+PUBLISHED_FIELDS = ('publishDate', 'publishedAt', 'datePublished')
+UPDATED_FIELDS = ('updatedAt', 'lastUpdated', 'modified')
+DATE_SORT_KEYS = PUBLISHED_FIELDS + UPDATED_FIELDS
+
+
+class UpstreamError(Exception):
+    """Raised when the upstream listings API fails or returns invalid data"""
+
+
+def first_field(item, keys):
+    """First non-empty value of `keys` in `item` (None if all are missing)"""
+    for key in keys:
+        value = item.get(key)
+        if value is not None and value != '':
+            return value
+    return None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _date(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=None)
+
+
+def price_per_sqm(item):
+    """Listed price per m², derived from price and area when not provided"""
+    ppsqm = _number(first_field(item, PPSQM_FIELDS))
+    if ppsqm is None:
+        price = _number(first_field(item, PRICE_FIELDS))
+        sqm = _number(first_field(item, SQM_FIELDS))
+        if price is not None and sqm:
+            ppsqm = price / sqm
+    return ppsqm
+
+
+def recommendation_score(item, desired):
+    """
+    Similarity (0-100) of a listing to the desired property, as in buy.js
+
+    Parameters:
+    - desired: dict with optional 'sqm', 'rooms', 'yearBuilt', 'target'
+    """
+    score = 0
+    factors = 0
+
+    sqm = _number(item.get('squareMeter'))
+    if desired.get('sqm') and sqm:
+        score += max(0, 25 - abs(sqm - desired['sqm']) / desired['sqm'] * 25)
+        factors += 1
+
+    rooms = _number(item.get('rooms'))
+    if desired.get('rooms') and rooms:
+        score += max(0, 20 - abs(rooms - desired['rooms']) * 5)
+        factors += 1
+
+    year = _number(first_field(item, YEAR_FIELDS))
+    if desired.get('yearBuilt') and year:
+        score += max(0, 15 - abs(year - desired['yearBuilt']) / 10)
+        factors += 1
+
+    price = _number(item.get('buyingPrice'))
+    if desired.get('target') and price:
+        score += max(0, 40 - abs(price - desired['target']) / desired['target'] * 40)
+        factors += 1
+
+    if factors == 0:
+        return 50
+    return round(min(100, score))
+
+
+def _within(value, low, high):
+    """Range check that, like buy.js, ignores missing values"""
+    if value is None:
+        return True
+    if low is not None and value < low:
+        return False
+    if high is not None and value > high:
+        return False
+    return True
+
+
+def filter_listings(items, filters):
+    """
+    Apply the Buy view filters
+
+    Parameters:
+    - filters: dict with optional minPrice/maxPrice, minRooms/maxRooms,
+      minSqm/maxSqm, minPPSqm/maxPPSqm, minYear/maxYear, publishedFrom/To,
+      updatedFrom/To (ISO dates) and priceListedOnly
+    """
+    f = {key: _number(value) for key, value in filters.items()
+         if key.startswith(('min', 'max'))}
+    published_from, published_to = _date(filters.get('publishedFrom')), _date(filters.get('publishedTo'))
+    updated_from, updated_to = _date(filters.get('updatedFrom')), _date(filters.get('updatedTo'))
+    price_listed_only = bool(filters.get('priceListedOnly'))
+
+    out = []
+    for item in items:
+        price = _number(first_field(item, PRICE_FIELDS))
+        if price_listed_only and not price:
+            continue
+        if f.get('minPrice') is not None and price is None:
+            continue
+        if not _within(price, f.get('minPrice'), f.get('maxPrice')):
+            continue
+        if not _within(_number(first_field(item, ROOM_FIELDS)), f.get('minRooms'), f.get('maxRooms')):
+            continue
+        if not _within(_number(first_field(item, SQM_FIELDS)), f.get('minSqm'), f.get('maxSqm')):
+            continue
+        if not _within(price_per_sqm(item), f.get('minPPSqm'), f.get('maxPPSqm')):
+            continue
+        if not _within(_number(first_field(item, YEAR_FIELDS)), f.get('minYear'), f.get('maxYear')):
+            continue
+        if not _within(_date(first_field(item, PUBLISHED_FIELDS)), published_from, published_to):
+            continue
+        if not _within(_date(first_field(item, UPDATED_FIELDS)), updated_from, updated_to):
+            continue
+        out.append(item)
+    return out
+
+
+def listing_sort_key(sort_key='buyingPrice', desired=None):
+    """
+    Key function ordering listings like buy.js; missing values compare above
+    all others, so they go last ascending and first descending
+    """
+    if sort_key == 'recommendation':
+        return lambda item: recommendation_score(item, desired or {})
+
+    def key(item):
+        if sort_key in DATE_SORT_KEYS:
+            parsed = _date(item.get(sort_key))
+            return False, parsed.timestamp() if parsed else 0
+        value = price_per_sqm(item) if sort_key == 'pricePerSqm' else _number(item.get(sort_key))
+        return value is None, value or 0
+
+    return key
+
+
+def sort_listings(items, sort_key='buyingPrice', sort_order='asc', desired=None):
+    """
+    Sort listings like buy.js: missing values go last (asc) or first (desc),
+    'recommendation' sorts by recommendation_score against `desired`
+    """
+    descending = str(sort_order).lower() == 'desc'
+    return sorted(items, key=listing_sort_key(sort_key, desired), reverse=descending)
+
+
+class _QueryResults:
+    """Matches of one search over the upstream pages loaded for it so far"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = 0
+        self.loaded = 0
+        self.has_more = True
+        self.matches = []
+        self.served = 0  # rows handed out; their order is fixed from then on
+
+
+class ListingsProxy:
+    """
+    Cached, prefetching client for the upstream listings API
+
+    Parameters:
+    - upstream_url: ThinkImmo-compatible search endpoint
+    - page_size: Listings per upstream page
+    - cache_size / cache_ttl: Limits of the (location, page) cache and of the per-query results
+    - timeout: Upstream request timeout in seconds
+    - max_pages: Upstream pages one query may load
+    """
+
+    def __init__(self, upstream_url, page_size=200, cache_size=256, cache_ttl=600.0, timeout=15.0,
+                 max_pages=50):
+        self.upstream_url = upstream_url
+        self.page_size = page_size
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.cache = PredictionCache(max_size=cache_size, ttl=cache_ttl)
+        self.queries = PredictionCache(max_size=cache_size, ttl=cache_ttl)
+        self.upstream_requests = 0
+        self._inflight = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._prefetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='listings-prefetch')
+
+    def _fetch_upstream(self, location, page):
+        payload = {
+            'active': True,
+            'type': LISTING_TYPE,
+            'sortBy': 'asc',
+            'sortKey': 'buyingPrice',
+            'from': page * self.page_size + 1,
+            'size': self.page_size,
+            'geoSearches': {'geoSearchQuery': location, 'geoSearchType': 'city'}
+        }
+        request = urllib.request.Request(
+            self.upstream_url, data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with self._lock:
+            self.upstream_requests += 1
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read())
+        except (OSError, ValueError) as e:
+            raise UpstreamError(f'listings API request failed: {e}')
+        results = data.get('results') if isinstance(data, dict) else None
+        if not isinstance(results, list):
+            raise UpstreamError('listings API returned no results list')
+        return results
+
+    def get_page(self, location, page):
+        """One upstream page, from cache or a single shared upstream call"""
+        key = (location.strip().lower(), page)
+        hit, listings = self.cache.get(key)
+        if hit:
+            return listings
+
+        # Collapse concurrent fetches of the same page (e.g. prefetch + request)
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+        if not leader:
+            event.wait(self.timeout)
+            hit, listings = self.cache.get(key)
+            if hit:
+                return listings
+
+        try:
+            listings = self._fetch_upstream(location, page)
+            self.cache.put(key, listings)
+            return listings
+        finally:
+            if leader:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+    def prefetch(self, location, page):
+        """Warm the cache for `page` in the background (errors are ignored)"""
+        def run():
+            try:
+                self.get_page(location, page)
+            except UpstreamError:
+                pass
+        future = self._prefetcher.submit(run)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def drain(self, timeout=None):
+        """Wait for background prefetches in flight to finish"""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.exception(timeout=timeout)
+
+    def search(self, location, offset=0, limit=None, filters=None, sort_key='buyingPrice', sort_order='asc',
+               desired=None):
+        """
+        Matching rows offset..offset+limit (limit defaults to the page size)
+        of the filtered, sorted listings for `location`
+
+        Only upstream pages not yet loaded for this query are fetched and
+        filtered; their matches are merged into the rows not yet handed out.
+        With the default sort (the upstream order) the result is exactly
+        sorted; otherwise rows already returned stay where they were.
+        Returns a dict with the rows, nextOffset, the matches found so far,
+        the upstream rows loaded, and whether more rows may follow. The page
+        after the last one loaded is prefetched so the next scroll is a hit.
+        """
+        limit = limit or self.page_size
+        descending = str(sort_order).lower() == 'desc'
+        filters, desired = filters or {}, desired or {}
+        query = (location.strip().lower(), json.dumps(filters, sort_keys=True, default=str), sort_key,
+                 descending, json.dumps(desired, sort_keys=True))
+        with self._lock:
+            hit, results = self.queries.get(query)
+            if not hit:
+                results = _QueryResults()
+                self.queries.put(query, results)
+
+        key = listing_sort_key(sort_key, desired)
+        with results.lock:
+            while len(results.matches) < offset + limit and results.has_more:
+                rows = self.get_page(location, results.pages)
+                results.pages += 1
+                results.loaded += len(rows)
+                if len(rows) < self.page_size or results.pages >= self.max_pages:
+                    results.has_more = False
+                rows = [item for item in rows if (_number(item.get('buyingPrice')) or 0) >= 0]
+                new = sorted(filter_listings(rows, filters), key=key, reverse=descending)
+                fixed = results.served
+                results.matches[fixed:] = heapq.merge(results.matches[fixed:], new, key=key, reverse=descending)
+            if results.has_more:
+                self.prefetch(location, results.pages)
+
+            page = results.matches[offset:offset + limit]
+            results.served = max(results.served, offset + len(page))
+            return {
+                'results': page,
+                'nextOffset': offset + len(page),
+                'total': len(results.matches),
+                'loaded': results.loaded,
+                'hasMore': results.has_more or offset + len(page) < len(results.matches)
+            }
+
+    def stats(self):
+        """Cache counters plus the number of upstream calls made"""
+        return dict(self.cache.stats(), upstream_requests=self.upstream_requests)
@@ -0,0 +1,143 @@
+"""
+Load test for the prediction server
+
+Usage:
+  python load_test.py [--url http://localhost:5000] [--concurrency 16] [--duration 10]
+  python load_test.py --spawn 1 2 4     # start gunicorn with 1, 2 and 4 workers in turn
+
+Sends distinct /api/predict payloads (so the result cache does not hide the
+model cost) from concurrent keep-alive connections and reports throughput
+and latency percentiles.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _payload(i):
+    return json.dumps({
+        "income": 3000 + (i * 37) % 9000,
+        "equity": 10000 + (i * 911) % 150000,
+        "savings": 200 + (i * 13) % 1500,
+        "target": 200000 + (i * 1237) % 500000,
+        "years": 1 + i % 15,
+        "rate": (2.5, 5.0, 7.5)[i % 3],
+        "marital": ("single", "married")[i % 2],
+        "kids": i % 4
+    })
+
+
+def run_load(url, concurrency, duration):
+    """Hammer /api/predict and return a result dict"""
+    target = urlparse(url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(offset):
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        local, i = [], offset
+        while time.perf_counter() < deadline:
+            body = _payload(i)
+            i += concurrency
+            started = time.perf_counter()
+            try:
+                conn.request('POST', '/api/predict', body, {'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - started)
+            else:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors[0],
+        'throughput': count / duration,
+        'p50_ms': latencies[count // 2] * 1000 if count else None,
+        'p99_ms': latencies[min(count - 1, int(count * 0.99))] * 1000 if count else None
+    }
+
+
+def _wait_healthy(url, timeout=60):
+    target = urlparse(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=2)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def spawn_and_run(worker_counts, concurrency, duration, port=5055):
+    """Start gunicorn for each worker count, load it, and collect results"""
+    url = f'http://127.0.0.1:{port}'
+    results = []
+    for workers in worker_counts:
+        env = dict(os.environ, WEB_WORKERS=str(workers), PORT=str(port))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            if not _wait_healthy(url):
+                raise RuntimeError(f'gunicorn with {workers} workers did not become healthy')
+            results.append((workers, run_load(url, concurrency, duration)))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return results
+
+
+def _print_table(rows):
+    print("\n" + "=" * 64)
+    print(f"{'Workers':>8} {'Requests':>10} {'Errors':>7} {'Req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    print("-" * 64)
+    for workers, r in rows:
+        print(f"{workers:>8} {r['requests']:>10} {r['errors']:>7} {r['throughput']:>10.0f} "
+              f"{r['p50_ms'] or 0:>9.2f} {r['p99_ms'] or 0:>9.2f}")
+    print("=" * 64)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--spawn', type=int, nargs='+', metavar='WORKERS',
+                        help='start gunicorn with each worker count instead of using --url')
+    args = parser.parse_args()
+
+    if args.spawn:
+        _print_table(spawn_and_run(args.spawn, args.concurrency, args.duration))
+    else:
+        _print_table([('-', run_load(args.url, args.concurrency, args.duration))])
@@ -0,0 +1,208 @@
+"""
+Low-overhead request instrumentation with Prometheus text exposition
+
+- Counter / Histogram: labelled metrics guarded by one lock each; an
+  observation is a bisect plus two increments.
+- Stage timing: a per-thread StageTimer is started for each request;
+  mark(stage) attributes the time since the previous mark to `stage` and
+  finish_request() turns the marks into histogram observations.
+  Code running outside a request (e.g. the coalescer thread) pays one
+  attribute lookup and records nothing.
+- Registry.render() produces the text format scraped from /api/metrics.
+"""
+import bisect
+import threading
+import time
+
+# Seconds; spans the ~10us compiled predict path up to multi-second batches
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                   0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with fixed label names"""
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with fixed label names"""
+
+    def __init__(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, labels, ("le", le))} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.label_names, labels)} {repr(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.label_names, labels)} {count}')
+        return lines
+
+
+class Registry:
+    """Collection of metrics plus callbacks that emit extra lines at scrape time"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """collect() returns a list of exposition lines (HELP/TYPE included)"""
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+
+class StageTimer:
+    """Splits one request's wall time into named stages"""
+    __slots__ = ('route', 'started', 'last', 'stages')
+
+    def __init__(self, route):
+        self.route = route
+        self.started = self.last = time.perf_counter()
+        self.stages = []
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+
+_local = threading.local()
+
+
+def start_request(route):
+    """Begin stage timing for the request handled by the current thread"""
+    _local.timer = StageTimer(route)
+
+
+def mark(stage):
+    """Attribute time since the previous mark to `stage` (no-op outside a request)"""
+    timer = getattr(_local, 'timer', None)
+    if timer is not None:
+        timer.mark(stage)
+
+
+def finish_request(status):
+    """
+    Close the current thread's request and record its metrics
+
+    Time after the last mark (building and encoding the response) is
+    recorded as 'serialize'; a handler that never marked records 'handler'.
+    Stages marked more than once (e.g. readiness then likelihood predict)
+    are summed into one observation per request.
+    """
+    timer = getattr(_local, 'timer', None)
+    if timer is None:
+        return
+    _local.timer = None
+    timer.mark('serialize' if timer.stages else 'handler')
+
+    totals = {}
+    for stage, seconds in timer.stages:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    for stage, seconds in totals.items():
+        stage_duration.observe(seconds, timer.route, stage)
+    request_duration.observe(timer.last - timer.started, timer.route)
+    requests_total.inc(timer.route, str(status))
+
+
+def exposition(name, documentation, metric_type, samples):
+    """
+    Exposition lines for values owned elsewhere (cache stats, model info)
+
+    Parameters:
+    - samples: list of (labels dict, value) pairs
+    """
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {metric_type}']
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}')
+    return lines
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    'rge_request_duration_seconds', 'End-to-end handler latency per route', ('route',)))
+requests_total = registry.register(Counter(
+    'rge_requests_total', 'Requests served per route and status code', ('route', 'status')))
+stage_duration = registry.register(Histogram(
+    'rge_stage_duration_seconds',
+    'Time per request stage (parse, region, features, fallback, predict, simulate, solve, search, '
+    'update, advice, serialize, handler)',
+    ('route', 'stage')))
+prediction_branch = registry.register(Counter(
+    'rge_prediction_rows_total',
+    'Rows scored per model and branch (ml = trained model, region = regional price model, '
+    'formula = out-of-bounds fallback)',
+    ('model', 'branch')))
@@ -0,0 +1,913 @@
+"""
+The ML predictor: trained model sets and the prediction, simulation and
+goal-seeking methods the server and the batch tools score through
+
+Importing this module loads no web framework (and sklearn only once models
+are trained), so process pool workers such as bulk_score.py can score
+without the Flask app, its routes and background services.
+"""
+import copy
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from artifacts import ArtifactError, read_artifact, training_fingerprint, write_artifact
+from growth import future_value, horizon_months, monthly_rate
+from inference import CompiledLinearModel, CompiledPolynomialModel
+from metrics import mark, prediction_branch
+from solver import solve_max, solve_min
+from streaming import MODEL_COLUMNS, StreamingLeastSquares, file_chunks, file_signature, fit_stream, model_chunks
+from simulation import default_volatility, percentile_bands, simulate_equity
+from training_data import (TRAINING_BOUNDS, likelihood_dataset, property_dataset,
+                           readiness_dataset, sample_profiles)
+
+# Warm-start artifact unless MODEL_ARTIFACT points elsewhere
+DEFAULT_ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'predictor.npz')
+
+# Property price model encodings
+LOCATION_MAP = {'rural': 0, 'city': 1, 'premium': 2}
+CONDITION_MAP = {'renovation': 0, 'good': 1, 'new': 2}
+CURRENT_YEAR = 2025
+
+# Goal seeking: (low, high, resolution) searched for each solvable input
+SOLVE_RANGES = {
+    'savings': (0, 20000, 1),       # minimum monthly savings, whole euros
+    'years': (1, 50, 1),            # minimum horizon, whole years
+    'target': (10000, 5000000, 100)  # maximum affordable target price
+}
+# Inputs the ML models only answer for within their TRAINING_BOUNDS (both ends
+# included); outside them the fallback formulas do
+READINESS_BOUNDED = ('income', 'equity', 'target')
+LIKELIHOOD_BOUNDED = READINESS_BOUNDED + ('years', 'rate')
+
+def _within_bounds(names, *values):
+    """Whether each value (scalar or array) of the inputs `names` lies within its training bounds"""
+    within = True
+    for name, value in zip(names, values):
+        low, high = TRAINING_BOUNDS[name]
+        within = within & (low <= value) & (value <= high)
+    return within
+
+def _solve_breaks(name):
+    """
+    First value of each new ML/formula branch along the solved input `name`:
+    its lower training bound and the first SOLVE_RANGES lattice value above
+    the upper one (none if the input is not bounded)
+    """
+    if name not in LIKELIHOOD_BOUNDED:
+        return ()
+    bound_low, bound_high = TRAINING_BOUNDS[name]
+    low, _, step = SOLVE_RANGES[name]
+    return (bound_low, low + (int((bound_high - low) // step) + 1) * step)
+
+SOLVE_BREAKS = {name: _solve_breaks(name) for name in SOLVE_RANGES}
+
+def _married(marital):
+    """
+    1.0 where marital is 'married', else 0.0 (as `marital == 'married'` in the
+    single-row paths, so any other value, numbers included, counts as single)
+    """
+    marital = np.asarray(marital)
+    if marital.dtype.kind in 'biuf':
+        return np.zeros(marital.shape)
+    return (marital == 'married').astype(float)
+
+def _restore_linear_model(coef, intercept):
+    """Rebuild a fitted LinearRegression from stored coefficients"""
+    from sklearn.linear_model import LinearRegression
+
+    model = LinearRegression()
+    model.coef_ = np.asarray(coef, dtype=float)
+    model.intercept_ = float(intercept)
+    model.n_features_in_ = model.coef_.shape[0]
+    return model
+
+def _fit_from_stats(stats):
+    """Fitted LinearRegression and training R^2 per model from its training statistics"""
+    models = {name: acc.to_linear_regression() for name, acc in stats.items()}
+    scores = {name: acc.score(models[name].coef_) for name, acc in stats.items()}
+    return models, scores
+
+class ModelSet:
+    """
+    One complete, consistent set of fitted models plus their compiled scorers
+
+    A ModelSet is never modified after it is published on MLPredictor.models;
+    retraining builds a new one and swaps the reference, so a request that
+    grabbed the old set keeps using matching models and polynomial features.
+
+    `stats` holds each model's training statistics (StreamingLeastSquares),
+    which observed outcomes are folded into by MLPredictor.update_models;
+    `observed` counts those outcome rows and `parent` is the generation an
+    updated set was derived from. `data_source` identifies the training file
+    (streaming.file_signature) of a set trained from one, None for synthetic data.
+    """
+    _generations = itertools.count(1)
+
+    def __init__(self, poly_features, readiness_model, likelihood_model, property_price_model,
+                 n_samples, scores, training_time, source, artifact_version=None, stats=None,
+                 observed=0, parent=None, data_source=None):
+        self.poly_features = poly_features
+        self.readiness_model = readiness_model
+        self.likelihood_model = likelihood_model
+        self.property_price_model = property_price_model
+        self.n_samples = n_samples
+        self.scores = scores
+        self.training_time = training_time
+        self.source = source
+        self.artifact_version = artifact_version
+        self.stats = stats
+        self.observed = observed
+        self.parent = parent
+        self.data_source = data_source
+        self.generation = next(ModelSet._generations)
+        self.created_at = time.time()
+
+        # sklearn-free scorers used by the predict paths
+        self.compiled_readiness = CompiledPolynomialModel(poly_features, readiness_model)
+        self.compiled_likelihood = CompiledLinearModel(likelihood_model)
+        self.compiled_property_price = CompiledLinearModel(property_price_model)
+
+    def with_artifact_version(self, artifact_version):
+        """
+        The same models (and generation) recorded under another artifact
+        version, as a new unpublished set; this one is left untouched
+        """
+        models = copy.copy(self)
+        models.artifact_version = artifact_version
+        return models
+
+class MLPredictor:
+    """
+    Machine Learning predictor using polynomial regression for readiness
+    and linear regression for success likelihood
+    """
+    def __init__(self, n_samples=1000, seed=42, artifact_path=None, max_history=10, lazy=False,
+                 training_file=None):
+        self.models = None
+        self.n_samples = n_samples
+        self.seed = seed
+        self.training_file = training_file  # CSV/Parquet to train from instead of synthetic data
+        self.artifact_path = artifact_path
+        self.max_history = max_history
+        self.history = OrderedDict()  # generation -> ModelSet, most recently published last
+        self.ready = threading.Event()  # set once a model set is published
+        self.warm_up_error = None
+        self._publish_lock = threading.Lock()
+        self._warm_up_thread = None
+        self._warm_up_pid = None
+
+        # lazy: nothing is loaded until warm_up / start_warm_up; predictions use the formulas meanwhile
+        if not lazy:
+            self.warm_up()
+
+    def warm_up(self):
+        """Load the models from the artifact, or train (and save) them if it is missing or stale"""
+        # Warm start from a persisted artifact; retrain only if it is missing or stale
+        if self.artifact_path and self.load_artifact(self.artifact_path):
+            return
+        models = self.build_configured_models()
+        if self.artifact_path:
+            models = models.with_artifact_version(self.save_artifact(self.artifact_path, models)['version'])
+        self.n_samples = models.n_samples
+        self.publish(models)
+
+    def _warm_up_task(self):
+        started = time.perf_counter()
+        try:
+            self.warm_up()
+            print(f"[OK] Models ready after {time.perf_counter() - started:.2f}s warm-up")
+        except Exception as e:
+            self.warm_up_error = str(e)
+            print(f"[..] Model warm-up failed: {e}")
+
+    def start_warm_up(self):
+        """
+        Run warm_up on a background thread, unless models are already
+        published or a warm-up is running in this process (threads do not
+        survive a fork, so a forked worker starts its own)
+        """
+        with self._publish_lock:
+            running = (self._warm_up_pid == os.getpid() and self._warm_up_thread is not None
+                       and self._warm_up_thread.is_alive())
+            if self.ready.is_set() or running:
+                return
+            self.warm_up_error = None
+            self._warm_up_pid = os.getpid()
+            self._warm_up_thread = threading.Thread(target=self._warm_up_task, name='model-warm-up',
+                                                    daemon=True)
+            self._warm_up_thread.start()
+
+    @property
+    def state(self):
+        """'ready', 'warming', 'failed' or 'cold' (lazy, warm-up not started)"""
+        if self.ready.is_set():
+            return 'ready'
+        if self.warm_up_error is not None:
+            return 'failed'
+        return 'warming' if self._warm_up_thread is not None else 'cold'
+
+    @property
+    def generation(self):
+        """Generation of the published models (0 while none are loaded)"""
+        models = self.models
+        return models.generation if models is not None else 0
+
+    # Read-only views of the currently published model set
+    readiness_model = property(lambda self: self.models.readiness_model)
+    likelihood_model = property(lambda self: self.models.likelihood_model)
+    property_price_model = property(lambda self: self.models.property_price_model)
+    poly_features = property(lambda self: self.models.poly_features)
+    compiled_readiness = property(lambda self: self.models.compiled_readiness)
+    compiled_likelihood = property(lambda self: self.models.compiled_likelihood)
+    compiled_property_price = property(lambda self: self.models.compiled_property_price)
+    scores = property(lambda self: self.models.scores)
+    training_time = property(lambda self: self.models.training_time)
+    model_source = property(lambda self: self.models.source if self.models is not None else None)
+    artifact_version = property(lambda self: self.models.artifact_version if self.models is not None else None)
+
+    def build_models(self, n_samples=None, progress=None):
+        """
+        Train a new ModelSet on synthetic data based on domain knowledge,
+        without touching the published models
+
+        Parameters:
+        - n_samples: Rows per synthetic dataset (defaults to the constructor value)
+        - progress: Optional callback(fraction, stage) reported after each step
+        """
+        # Imported on first use: a lazy start (LAZY_MODELS) binds the port before sklearn is loaded
+        from sklearn.preprocessing import PolynomialFeatures
+
+        n_samples = n_samples or self.n_samples
+        report = progress or (lambda fraction, stage: None)
+        started = time.perf_counter()
+
+        # Local generator keeps training reproducible without touching np.random state
+        rng = np.random.default_rng(self.seed)
+
+        # Generate training data for READINESS model
+        report(0.0, 'readiness')
+        profiles = sample_profiles(rng, n_samples)
+        X_readiness, y_readiness = readiness_dataset(rng, profiles)
+
+        # Train polynomial regression for readiness (captures non-linear relationships)
+        # Each model is fitted once, through the sufficient statistics that later
+        # incremental updates (see update_models) build on
+        poly_features = PolynomialFeatures(degree=2)
+        X_readiness_poly = poly_features.fit_transform(X_readiness)
+        stats = {'readiness': StreamingLeastSquares().partial_fit(X_readiness_poly, y_readiness)}
+        del X_readiness_poly
+
+        # Generate training data for LIKELIHOOD model and train linear regression
+        report(0.6, 'likelihood')
+        X_likelihood, y_likelihood = likelihood_dataset(rng, profiles)
+        stats['likelihood'] = StreamingLeastSquares().partial_fit(X_likelihood, y_likelihood)
+
+        # Generate training data for PROPERTY PRICE model and train linear regression
+        report(0.8, 'property_price')
+        X_property, y_property = property_dataset(rng, n_samples)
+        stats['property_price'] = StreamingLeastSquares().partial_fit(X_property, y_property)
+
+        models, scores = _fit_from_stats(stats)
+        readiness_model, likelihood_model, property_price_model = (
+            models['readiness'], models['likelihood'], models['property_price'])
+        training_time = time.perf_counter() - started
+        report(1.0, 'done')
+
+        print(f"[OK] ML Models trained successfully! ({n_samples} samples in {training_time:.2f}s)")
+        print(f"  Readiness Model R^2 Score: {scores['readiness']:.4f}")
+        print(f"  Likelihood Model R^2 Score: {scores['likelihood']:.4f}")
+        print(f"  Property Price Model R^2 Score: {scores['property_price']:.4f}")
+
+        return ModelSet(poly_features, readiness_model, likelihood_model, property_price_model,
+                        n_samples, scores, training_time, source='trained', stats=stats)
+
+    def build_models_streamed(self, chunks, progress=None, data_source=None):
+        """
+        Train a new ModelSet out of core from a stream of column chunks
+        (see streaming.py), without touching the published models
+
+        Memory stays bounded by one chunk plus per-model statistics, and the
+        coefficients equal those of an in-memory fit on the same rows.
+
+        Parameters:
+        - chunks: Iterable of column dicts covering all three models
+        - progress: Optional callback(rows_seen) reported after each chunk
+        - data_source: Identity of the data (streaming.file_signature), part of the artifact fingerprint
+        """
+        started = time.perf_counter()
+        poly_features, stats = fit_stream(chunks, progress=progress)
+        missing = [name for name in MODEL_COLUMNS if name not in stats]
+        if missing:
+            raise ValueError(f"no training rows for: {', '.join(missing)}")
+        models, scores = _fit_from_stats(stats)
+
+        training_time = time.perf_counter() - started
+        n_samples = max(acc.n_samples for acc in stats.values())
+        print(f"[OK] ML Models trained from stream ({n_samples} rows in {training_time:.2f}s)")
+        return ModelSet(poly_features, models['readiness'], models['likelihood'],
+                        models['property_price'], n_samples, scores, training_time, source='streamed',
+                        stats=stats, data_source=data_source)
+
+    def update_models(self, chunks, weight=1.0):
+        """
+        Fold observed outcomes into the published models without retraining,
+        returning a new ModelSet (not published)
+
+        Only the affected models are refitted, each from its stored training
+        statistics plus the new rows, so the cost does not grow with the
+        amount of data seen so far.
+
+        Parameters:
+        - chunks: Iterable of column dicts of observed rows (see streaming.MODEL_COLUMNS);
+          every model whose columns are present is updated
+        - weight: How many training rows one observed row counts as
+        """
+        base = self.models
+        if base.stats is None:
+            raise ValueError('published models carry no training statistics; retrain first')
+
+        stats = dict(base.stats)
+        added = 0
+        for columns in chunks:
+            for name, (X, y) in model_chunks(columns).items():
+                if name == 'readiness':
+                    X = base.poly_features.transform(X)
+                if stats[name] is base.stats[name]:
+                    stats[name] = stats[name].copy()  # the published statistics stay untouched
+                stats[name].partial_fit(X, y, sample_weight=weight)
+                added += len(y)
+        if not added:
+            raise ValueError('no complete outcome rows')
+
+        fitted = {'readiness': base.readiness_model, 'likelihood': base.likelihood_model,
+                  'property_price': base.property_price_model}
+        scores = dict(base.scores)
+        changed = {name: acc for name, acc in stats.items() if acc is not base.stats[name]}
+        refitted, refitted_scores = _fit_from_stats(changed)
+        fitted.update(refitted)
+        scores.update(refitted_scores)
+        return ModelSet(base.poly_features, fitted['readiness'], fitted['likelihood'],
+                        fitted['property_price'], base.n_samples, scores, base.training_time,
+                        source='updated', stats=stats, observed=base.observed + added,
+                        parent=base.generation, data_source=base.data_source)
+
+    def publish(self, models):
+        """Make `models` the served set (single reference swap) and record it in the history"""
+        with self._publish_lock:
+            self.history[models.generation] = models
+            self.history.move_to_end(models.generation)
+            while len(self.history) > self.max_history:
+                self.history.popitem(last=False)
+            self.models = models
+            self.ready.set()
+
+    def versions(self):
+        """Summary of the kept model sets, most recently published last"""
+        with self._publish_lock:
+            kept = list(self.history.values())
+        return [{
+            'generation': models.generation,
+            'source': models.source,
+            'artifact_version': models.artifact_version,
+            'parent': models.parent,
+            'observed': models.observed,
+            'scores': models.scores,
+            'created_at': models.created_at,
+            'current': models is self.models
+        } for models in kept]
+
+    def build_configured_models(self, progress=None):
+        """
+        Train a new ModelSet from the configured data: streamed from the
+        training file if one is set, else synthetic (build_models)
+
+        Parameters:
+        - progress: Optional callback(fraction, stage), as for build_models
+        """
+        if not self.training_file:
+            return self.build_models(progress=progress)
+        report = progress or (lambda fraction, stage: None)
+        report(0.0, 'streaming')
+        models = self.build_models_streamed(file_chunks(self.training_file),
+                                            data_source=file_signature(self.training_file))
+        report(1.0, 'done')
+        return models
+
+    def train_models(self, n_samples=None):
+        """
+        Train ML models and publish them with a single reference swap
+
+        Parameters:
+        - n_samples: Rows per synthetic dataset (defaults to the constructor value;
+          without it a configured training file is used)
+        """
+        models = self.build_models(n_samples) if n_samples else self.build_configured_models()
+        self.n_samples = models.n_samples
+        self.publish(models)
+
+    def _training_config(self, n_samples, poly_degree, data_source=None):
+        """Everything that determines the trained coefficients (used for staleness checks)"""
+        if data_source is not None:
+            # File-trained: the data itself, not the synthetic generator settings
+            return {
+                'data_source': data_source,
+                'poly_degree': poly_degree,
+                'bounds': TRAINING_BOUNDS
+            }
+        return {
+            'n_samples': n_samples,
+            'seed': self.seed,
+            'poly_degree': poly_degree,
+            'bounds': TRAINING_BOUNDS
+        }
+
+    def save_artifact(self, path, models=None):
+        """
+        Persist coefficients, training statistics, PolynomialFeatures config,
+        training bounds and R^2 scores of `models` (default: the published set)
+        to a checksummed artifact; returns its manifest
+
+        `models` is not modified (a published set is shared by requests in
+        flight); use models.with_artifact_version(manifest['version']) to
+        publish it under the new version.
+        """
+        models = models or self.models
+        poly_features = models.poly_features
+        arrays = {
+            'readiness_coef': models.readiness_model.coef_,
+            'readiness_intercept': np.asarray(models.readiness_model.intercept_),
+            'likelihood_coef': models.likelihood_model.coef_,
+            'likelihood_intercept': np.asarray(models.likelihood_model.intercept_),
+            'property_price_coef': models.property_price_model.coef_,
+            'property_price_intercept': np.asarray(models.property_price_model.intercept_)
+        }
+        for name, acc in (models.stats or {}).items():
+            arrays.update({f'{name}_stats_{key}': value for key, value in acc.state().items()})
+        metadata = {
+            'n_samples': models.n_samples,
+            'seed': self.seed,
+            'poly_features': {
+                'degree': poly_features.degree,
+                'include_bias': poly_features.include_bias,
+                'interaction_only': poly_features.interaction_only,
+                'n_features_in': int(poly_features.n_features_in_)
+            },
+            'bounds': TRAINING_BOUNDS,
+            'scores': models.scores,
+            'training_time': models.training_time,
+            'observed': models.observed,
+            'data_source': models.data_source
+        }
+        config = self._training_config(models.n_samples, poly_features.degree, models.data_source)
+        manifest = write_artifact(path, arrays, training_fingerprint(config), metadata)
+        print(f"[OK] Model artifact saved: {path} (version {manifest['version']})")
+        return manifest
+
+    def load_artifact(self, path):
+        """
+        Restore all models from an artifact written by save_artifact
+
+        Returns False (leaving the current models untouched) if the artifact is
+        missing, fails its checksum, was trained with a different configuration
+        or lacks the training statistics needed for incremental updates.
+        """
+        data_source = file_signature(self.training_file) if self.training_file else None
+        config = self._training_config(self.n_samples, poly_degree=2, data_source=data_source)
+        try:
+            arrays, manifest = read_artifact(path, training_fingerprint(config))
+        except ArtifactError as e:
+            print(f"[..] Model artifact not used: {e}")
+            return False
+
+        from sklearn.preprocessing import PolynomialFeatures
+
+        metadata = manifest['metadata']
+        poly_config = metadata['poly_features']
+        poly_features = PolynomialFeatures(degree=poly_config['degree'],
+                                           include_bias=poly_config['include_bias'],
+                                           interaction_only=poly_config['interaction_only'])
+        # Fitting only records the input width; no training data is needed
+        poly_features.fit(np.zeros((1, poly_config['n_features_in'])))
+
+        # Artifacts without training statistics predate incremental updates: retrain once
+        if not all(f'{name}_stats_r' in arrays for name in MODEL_COLUMNS):
+            print("[..] Model artifact not used: no training statistics")
+            return False
+        stats = {name: StreamingLeastSquares.from_state({
+            key: arrays[f'{name}_stats_{key}'] for key in ('r', 'mean', 'count')
+        }) for name in MODEL_COLUMNS}
+
+        self.publish(ModelSet(
+            poly_features,
+            _restore_linear_model(arrays['readiness_coef'], arrays['readiness_intercept']),
+            _restore_linear_model(arrays['likelihood_coef'], arrays['likelihood_intercept']),
+            _restore_linear_model(arrays['property_price_coef'], arrays['property_price_intercept']),
+            metadata['n_samples'], metadata['scores'], metadata['training_time'],
+            source='artifact', artifact_version=manifest['version'], stats=stats,
+            observed=metadata.get('observed', 0), data_source=metadata.get('data_source')
+        ))
+
+        print(f"[OK] ML Models loaded from artifact {path} (version {self.artifact_version})")
+        return True
+
+    def predict_readiness(self, income, equity, savings, target, marital, kids):
+        """
+        Predict current readiness using polynomial regression
+
+        Edge case handling: For inputs outside training bounds, uses direct formula
+        to avoid polynomial extrapolation errors.
+        """
+        # Calculate derived features
+        cost_deduction = 400 if marital == 'married' else 0
+        cost_deduction += kids * 300
+        adjusted_income = max(1000, income - cost_deduction)
+        curr_power = (adjusted_income * 90) + equity
+        ratio = curr_power / target if target > 0 else 0
+
+        # Check if inputs are within training bounds
+        within_bounds = _within_bounds(READINESS_BOUNDED, income, equity, target)
+        models = self.models
+        mark('features')
+
+        # For edge cases outside training data, use direct formula
+        # Polynomial regression extrapolates poorly beyond training range
+        # (also the answer while a lazy start is still loading the models)
+        if not within_bounds or models is None:
+            # Use quadratic readiness formula directly (same as training logic)
+            if ratio >= 1.0:
+                readiness = 100
+            else:
+                readiness = 100 * (ratio ** 2)
+            readiness = max(0, min(100, readiness))
+            mark('fallback')
+            prediction_branch.inc('readiness', 'formula')
+        else:
+            # Use ML model for predictions within training bounds
+            marital_num = 1 if marital == 'married' else 0
+            X = np.array([[income, equity, savings, target, marital_num, kids,
+                          adjusted_income, curr_power, ratio]])
+
+            # Expand polynomial features and predict with the compiled scorer
+            readiness = models.compiled_readiness.predict(X)[0]
+            readiness = np.clip(readiness, 0, 100)
+            mark('predict')
+            prediction_branch.inc('readiness', 'ml')
+
+        return int(readiness), int(curr_power)
+
+    def predict_likelihood(self, income, equity, savings, target, years, rate, marital, kids):
+        """
+        Predict success likelihood using linear regression
+
+        Edge case handling: For inputs outside training bounds, uses direct logistic formula.
+        """
+        # Calculate derived features
+        cost_deduction = 400 if marital == 'married' else 0
+        cost_deduction += kids * 300
+        adjusted_income = max(1000, income - cost_deduction)
+
+        # Calculate future equity with compound interest
+        future_equity = float(future_value(equity, savings, monthly_rate(rate), horizon_months(years)))
+
+        future_power = (adjusted_income * 90) + future_equity
+        coverage = future_power / target if target > 0 else 0
+
+        # Check if inputs are within training bounds
+        within_bounds = _within_bounds(LIKELIHOOD_BOUNDED, income, equity, target, years, rate)
+        models = self.models
+        mark('features')
+
+        # For edge cases outside training data (or before the models are loaded), use direct formula
+        if not within_bounds or models is None:
+            # Use logistic formula directly (same as training logic)
+            likelihood = 100 / (1 + np.exp(-10 * (coverage - 0.85)))
+            likelihood = max(10, likelihood)
+            if future_power >= target:
+                likelihood = 98
+
+            # Apply risk adjustment: Higher risk = lower reliability
+            # Conservative (2.5%): +5% confidence boost
+            # Balanced (5%): neutral
+            # Aggressive (7.5%): -5% confidence penalty
+            risk_adjustment = 0
+            if rate < 3.5:  # Conservative
+                risk_adjustment = 5
+            elif rate > 6.5:  # Aggressive
+                risk_adjustment = -5
+
+            likelihood += risk_adjustment
+            likelihood = max(10, min(98, likelihood))
+            mark('fallback')
+            prediction_branch.inc('likelihood', 'formula')
+        else:
+            # Use ML model for predictions within training bounds
+            marital_num = 1 if marital == 'married' else 0
+            X = np.array([[income, equity, savings, target, years, rate,
+                          marital_num, kids, adjusted_income, future_equity, coverage]])
+
+            # Predict
+            likelihood = models.compiled_likelihood.predict(X)[0]
+            likelihood = np.clip(likelihood, 10, 98)
+            mark('predict')
+            prediction_branch.inc('likelihood', 'ml')
+
+        return int(likelihood), int(future_equity)
+
+    def predict_readiness_batch(self, incomes, equities, savings, targets, marital, kids):
+        """
+        Vectorized counterpart of predict_readiness for N profiles
+
+        Parameters are equal-length sequences; marital holds 'married'/'single'
+        strings or 1/0 codes. Returns (readiness, curr_power) as int64 arrays whose values
+        match calling predict_readiness once per profile.
+        """
+        incomes = np.asarray(incomes, dtype=float)
+        equities = np.asarray(equities, dtype=float)
+        savings = np.asarray(savings, dtype=float)
+        targets = np.asarray(targets, dtype=float)
+        kids = np.asarray(kids, dtype=float)
+        marital_num = _married(marital)
+
+        # Calculate derived features
+        cost_deduction = marital_num * 400 + kids * 300
+        adjusted_income = np.maximum(1000, incomes - cost_deduction)
+        curr_power = (adjusted_income * 90) + equities
+        safe_targets = np.where(targets > 0, targets, 1)
+        ratio = np.where(targets > 0, curr_power / safe_targets, 0)
+
+        # Same training bounds as predict_readiness
+        within_bounds = _within_bounds(READINESS_BOUNDED, incomes, equities, targets)
+        models = self.models
+        if models is None:
+            within_bounds[:] = False  # formula only until the models are loaded
+        mark('features')
+
+        # Direct quadratic formula for every row, then overwrite in-bounds rows
+        readiness = np.where(ratio >= 1.0, 100.0, 100 * (ratio ** 2))
+        readiness = np.clip(readiness, 0, 100)
+        mark('fallback')
+
+        n_ml = int(within_bounds.sum())
+        if n_ml:
+            X = np.column_stack([incomes, equities, savings, targets, marital_num, kids,
+                                 adjusted_income, curr_power, ratio])[within_bounds]
+            readiness[within_bounds] = np.clip(models.compiled_readiness.predict(X), 0, 100)
+            mark('predict')
+        prediction_branch.inc('readiness', 'ml', amount=n_ml)
+        prediction_branch.inc('readiness', 'formula', amount=len(within_bounds) - n_ml)
+
+        return readiness.astype(np.int64), curr_power.astype(np.int64)
+
+    def predict_likelihood_batch(self, incomes, equities, savings, targets, years, rates, marital, kids):
+        """
+        Vectorized counterpart of predict_likelihood for N profiles
+
+        Returns (likelihood, future_equity) as int64 arrays whose values match
+        calling predict_likelihood once per profile.
+        """
+        incomes = np.asarray(incomes, dtype=float)
+        equities = np.asarray(equities, dtype=float)
+        savings = np.asarray(savings, dtype=float)
+        targets = np.asarray(targets, dtype=float)
+        years = np.asarray(years, dtype=float)
+        rates = np.asarray(rates, dtype=float)
+        kids = np.asarray(kids, dtype=float)
+        marital_num = _married(marital)
+
+        # Calculate derived features
+        cost_deduction = marital_num * 400 + kids * 300
+        adjusted_income = np.maximum(1000, incomes - cost_deduction)
+
+        # Calculate future equity with compound interest
+        future_equity = future_value(equities, savings, monthly_rate(rates), horizon_months(years))
+
+        future_power = (adjusted_income * 90) + future_equity
+        safe_targets = np.where(targets > 0, targets, 1)
+        coverage = np.where(targets > 0, future_power / safe_targets, 0)
+
+        # Same training bounds as predict_likelihood
+        within_bounds = _within_bounds(LIKELIHOOD_BOUNDED, incomes, equities, targets, years, rates)
+        models = self.models
+        if models is None:
+            within_bounds[:] = False  # formula only until the models are loaded
+        mark('features')
+
+        # Logistic formula with risk adjustment for every row
+        with np.errstate(over='ignore'):
+            likelihood = 100 / (1 + np.exp(-10 * (coverage - 0.85)))
+        likelihood = np.maximum(10, likelihood)
+        likelihood = np.where(future_power >= targets, 98.0, likelihood)
+        risk_adjustment = np.where(rates < 3.5, 5, np.where(rates > 6.5, -5, 0))
+        likelihood = np.clip(likelihood + risk_adjustment, 10, 98)
+        mark('fallback')
+
+        n_ml = int(within_bounds.sum())
+        if n_ml:
+            X = np.column_stack([incomes, equities, savings, targets, years, rates,
+                                 marital_num, kids, adjusted_income, future_equity,
+                                 coverage])[within_bounds]
+            likelihood[within_bounds] = np.clip(models.compiled_likelihood.predict(X), 10, 98)
+            mark('predict')
+        prediction_branch.inc('likelihood', 'ml', amount=n_ml)
+        prediction_branch.inc('likelihood', 'formula', amount=len(within_bounds) - n_ml)
+
+        return likelihood.astype(np.int64), future_equity.astype(np.int64)
+
+    def predict_projection(self, income, equity, savings, target, rate, marital, kids, max_years):
+        """
+        Project equity, purchasing power and success likelihood for every
+        horizon 1..max_years in a single vectorized pass
+
+        Returns a dict of equal-length int64 arrays keyed by 'years', 'equity',
+        'purchasingPower' and 'likelihood'. Each year's likelihood and equity
+        match predict_likelihood called with that horizon.
+        """
+        years = np.arange(1, max_years + 1)
+        n = len(years)
+
+        likelihood, future_equity = self.predict_likelihood_batch(
+            np.full(n, income), np.full(n, equity), np.full(n, savings), np.full(n, target),
+            years, np.full(n, rate), np.full(n, marital), np.full(n, kids)
+        )
+
+        # Purchasing power at each horizon (same definition as currPower, with future equity)
+        cost_deduction = 400 if marital == 'married' else 0
+        cost_deduction += kids * 300
+        adjusted_income = max(1000, income - cost_deduction)
+        future_power = (adjusted_income * 90) + future_value(
+            equity, savings, monthly_rate(rate), horizon_months(years)
+        )
+
+        return {
+            'years': years,
+            'equity': future_equity,
+            'purchasingPower': future_power.astype(np.int64),
+            'likelihood': likelihood
+        }
+
+    def simulate_likelihood(self, income, equity, savings, target, years, rate, marital, kids,
+                            paths=10000, volatility=None, seed=None, budget_ms=None, path_months_per_ms=None):
+        """
+        Monte Carlo counterpart of predict_likelihood: instead of a fixed rate
+        plus a risk adjustment, simulate `paths` monthly return paths around
+        `rate` and count how many reach `target`
+
+        Parameters:
+        - volatility: Annual return volatility in percent (default: implied by rate)
+        - seed: Fixes the random streams so results are reproducible
+        - budget_ms, path_months_per_ms: Latency budget and the throughput seeded runs are
+          sized by, passed to simulate_equity
+
+        Returns a dict with 'probability' (share of paths whose purchasing power
+        reaches target), 'likelihood' (the same in percent, 0-100), per-year
+        equity percentile bands, horizon percentiles, the deterministic
+        future equity for comparison, and the paths actually simulated.
+        """
+        volatility = default_volatility(rate) if volatility is None else volatility
+        months = int(horizon_months(years))
+        checkpoints = sorted(set(range(12, months + 1, 12)) | {months})
+
+        run = simulate_equity(equity, savings, rate, volatility, months, n_paths=paths, seed=seed,
+                              checkpoints=checkpoints, budget_ms=budget_ms,
+                              path_months_per_ms=path_months_per_ms)
+        mark('simulate')
+
+        # Same purchasing power definition as predict_likelihood
+        cost_deduction = 400 if marital == 'married' else 0
+        cost_deduction += kids * 300
+        adjusted_income = max(1000, income - cost_deduction)
+        final_equity = run['equity'][-1]
+        probability = float(np.mean(adjusted_income * 90 + final_equity >= target))
+
+        bands = percentile_bands(run['equity'])
+        return {
+            'probability': probability,
+            'likelihood': int(round(probability * 100)),
+            'months': checkpoints,
+            'equityBands': {name: band.astype(np.int64) for name, band in bands.items()},
+            'futureEquity': {name: int(band[-1]) for name, band in bands.items()},
+            'expectedEquity': int(final_equity.mean()),
+            'deterministicEquity': int(future_value(equity, savings, monthly_rate(rate), months)),
+            'volatility': volatility,
+            'paths': run['paths'],
+            'truncated': run['truncated'],
+            'elapsed_ms': run['elapsed_ms']
+        }
+
+    def solve_goal(self, income, equity, savings, target, years, rate, marital, kids,
+                   solve_for, metric, goal):
+        """
+        Find the minimum savings, minimum years or maximum target for which
+        `metric` ('readiness' or 'likelihood') reaches `goal`
+
+        The other inputs stay fixed; candidates are scored in batches with
+        predict_readiness_batch / predict_likelihood_batch (see solver.py).
+        Returns a dict with 'value' (None if unreachable within SOLVE_RANGES),
+        the predictions at that value, and the number of candidates scored.
+        """
+        profile = {'savings': savings, 'years': years, 'target': target}
+
+        def evaluate(values):
+            n = len(values)
+            columns = {name: np.full(n, value, dtype=float) for name, value in profile.items()}
+            columns[solve_for] = values
+            common = (np.full(n, income), np.full(n, equity), columns['savings'], columns['target'])
+            if metric == 'readiness':
+                return self.predict_readiness_batch(*common, np.full(n, marital), np.full(n, kids))[0]
+            return self.predict_likelihood_batch(*common, columns['years'], np.full(n, rate),
+                                                 np.full(n, marital), np.full(n, kids))[0]
+
+        low, high, step = SOLVE_RANGES[solve_for]
+        search = solve_max if solve_for == 'target' else solve_min
+        value, evaluations = search(evaluate, low, high, step, goal, SOLVE_BREAKS[solve_for])
+        mark('solve')
+
+        result = {'value': None, 'evaluations': evaluations}
+        if value is not None:
+            value = int(value)
+            profile[solve_for] = value
+            readiness, curr_power = self.predict_readiness(
+                income, equity, profile['savings'], profile['target'], marital, kids
+            )
+            likelihood, future_equity = self.predict_likelihood(
+                income, equity, profile['savings'], profile['target'], profile['years'], rate, marital, kids
+            )
+            result.update(value=value, readiness=readiness, likelihood=likelihood,
+                          currPower=curr_power, futureEquity=future_equity)
+        return result
+
+    def predict_property_price(self, sqm, rooms, bathrooms, location_type, condition, year_built,
+                               model=None):
+        """
+        Predict property price using linear regression
+
+        Parameters:
+        - sqm: Living area in square meters
+        - rooms: Number of rooms
+        - bathrooms: Number of bathrooms
+        - location_type: 'rural' (0), 'city' (1), or 'premium' (2)
+        - condition: 'renovation' (0), 'good' (1), or 'new' (2)
+        - year_built: Year the property was built
+        - model: Compiled regional model to use instead of the global one
+        """
+        # Convert location type and condition to numeric
+        location_premium = LOCATION_MAP.get(location_type, 1)
+        condition_value = CONDITION_MAP.get(condition, 1)
+
+        # Calculate age of property
+        year_age = max(0, CURRENT_YEAR - year_built)
+
+        # Prepare features for prediction
+        X = np.array([[sqm, rooms, bathrooms, location_premium, condition_value, year_age]])
+        mark('features')
+
+        # Predict
+        price = (model or self.models.compiled_property_price).predict(X)[0]
+        price = max(50000, price)  # Minimum price
+        mark('predict')
+        prediction_branch.inc('property_price', 'region' if model is not None else 'ml')
+
+        return int(price)
+
+    def predict_property_price_batch(self, sqm, rooms, bathrooms, location_types, conditions, years_built,
+                                     model=None):
+        """
+        Vectorized counterpart of predict_property_price for N properties
+
+        location_types and conditions hold the same strings as the single-row
+        method (unknown values map to 'city' / 'good'). Returns an int64 array
+        matching predict_property_price called once per property (with the
+        same optional regional `model`).
+        """
+        location_premium = np.array([LOCATION_MAP.get(value, 1) for value in location_types], dtype=float)
+        condition_value = np.array([CONDITION_MAP.get(value, 1) for value in conditions], dtype=float)
+        year_age = np.maximum(0, CURRENT_YEAR - np.asarray(years_built, dtype=float))
+
+        X = np.column_stack([np.asarray(sqm, dtype=float), np.asarray(rooms, dtype=float),
+                             np.asarray(bathrooms, dtype=float), location_premium,
+                             condition_value, year_age])
+        mark('features')
+
+        compiled = model or self.models.compiled_property_price
+        price = np.maximum(50000, compiled.predict(X))  # Minimum price
+        mark('predict')
+        prediction_branch.inc('property_price', 'region' if model is not None else 'ml', amount=len(price))
+        return price.astype(np.int64)
+
+def configured_predictor(lazy=False):
+    """
+    MLPredictor configured from the environment: TRAINING_SAMPLES overrides
+    the synthetic dataset size, TRAINING_FILE trains from a CSV/Parquet file
+    instead (streamed, see streaming.py), MODEL_ARTIFACT is the warm-start
+    artifact location and MODEL_HISTORY the number of sets kept for rollback
+    """
+    return MLPredictor(n_samples=int(os.environ.get('TRAINING_SAMPLES', 1000)),
+                       artifact_path=os.environ.get('MODEL_ARTIFACT', DEFAULT_ARTIFACT_PATH),
+                       max_history=int(os.environ.get('MODEL_HISTORY', 10)),
+                       lazy=lazy,
+                       training_file=os.environ.get('TRAINING_FILE') or None)
@@ -0,0 +1,226 @@
+"""
+Region-sharded property price models
+
+Each region (a city as entered in the app) can have its own linear price
+model, stored as a small artifact <directory>/<region key>.npz (+ .json
+manifest, see artifacts.py) with the same six features as the global
+model. RegionModelRegistry indexes the directory at startup but loads a
+model only when its region is first requested. Resident models are kept in
+a bounded LRU, so memory stays flat however many regions exist on disk.
+
+Cold loads run on a small loader pool; a request waits at most
+`load_timeout_ms` for one and is otherwise served by the global model
+while the load finishes in the background. Unknown regions go straight to
+the global model without touching the disk.
+"""
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+
+import numpy as np
+
+from artifacts import ArtifactError, read_artifact, write_artifact
+from inference import CompiledLinearModel
+from training_data import property_dataset
+
+# Feature layout shared with MLPredictor.predict_property_price; part of the
+# fingerprint so a model trained on another layout is never loaded
+PROPERTY_FEATURES = ('sqm', 'rooms', 'bathrooms', 'location_premium', 'condition', 'year_age')
+REGION_FINGERPRINT = 'region-property-price:' + ','.join(PROPERTY_FEATURES)
+
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+
+def region_key(name):
+    """Normalized file-safe key for a region name ('München' -> 'muenchen')"""
+    name = str(name or '').strip().lower().translate(_UMLAUTS)
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', name).strip('-')
+
+
+def save_region_model(directory, region, model, metadata=None):
+    """
+    Persist a fitted LinearRegression as the model for `region`
+
+    Returns the artifact manifest.
+    """
+    if model.coef_.shape[0] != len(PROPERTY_FEATURES):
+        raise ValueError(f'region models take {len(PROPERTY_FEATURES)} features')
+    arrays = {'coef': model.coef_, 'intercept': np.asarray(model.intercept_)}
+    metadata = dict(metadata or {}, region=region, key=region_key(region))
+    return write_artifact(os.path.join(directory, region_key(region) + '.npz'), arrays,
+                          REGION_FINGERPRINT, metadata)
+
+
+def build_synthetic_regions(directory, price_factors, n_samples=1000, seed=42):
+    """
+    Train and save one model per region on the synthetic property data,
+    with prices scaled by the region's factor (demo data and benchmarks)
+
+    Parameters:
+    - price_factors: dict region name -> price level relative to the global model
+    """
+    from sklearn.linear_model import LinearRegression
+
+    rng = np.random.default_rng(seed)
+    for region, factor in price_factors.items():
+        X, y = property_dataset(rng, n_samples)
+        model = LinearRegression().fit(X, y * factor)
+        metadata = {'n_samples': n_samples, 'price_factor': factor, 'score': model.score(X, y * factor)}
+        save_region_model(directory, region, model, metadata)
+
+
+class RegionModelRegistry:
+    """
+    Lazily loaded, LRU-bounded per-region models
+
+    Parameters:
+    - directory: Folder of region artifacts (may be missing: every lookup falls back)
+    - max_resident: Models kept in memory
+    - load_timeout_ms: Longest a request waits for a cold load
+    - loader_threads: Concurrent cold loads
+    """
+
+    def __init__(self, directory, max_resident=64, load_timeout_ms=50.0, loader_threads=2):
+        self.directory = directory
+        self.max_resident = max_resident
+        self.load_timeout = load_timeout_ms / 1000
+        self._resident = OrderedDict()
+        self._loading = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._loader = ThreadPoolExecutor(max_workers=loader_threads, thread_name_prefix='region-loader')
+        self.hits = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.evictions = 0
+        self.fallbacks = 0
+        self.load_seconds = 0.0
+        self.max_load_seconds = 0.0
+        self.available = {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-index the directory (new or retrained regions) and drop resident models"""
+        available = {}
+        if self.directory and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    available[name[:-4]] = os.path.join(self.directory, name)
+        with self._lock:
+            self.available = available
+            self._resident.clear()
+            self._failed.clear()
+
+    def _load(self, key, path):
+        started = time.perf_counter()
+        model = None
+        try:
+            arrays, manifest = read_artifact(path, REGION_FINGERPRINT)
+            fitted = SimpleNamespace(coef_=arrays['coef'], intercept_=arrays['intercept'])
+            model = CompiledLinearModel(fitted)
+            if model.n_features != len(PROPERTY_FEATURES):
+                raise ValueError(f'expected {len(PROPERTY_FEATURES)} coefficients, got {model.n_features}')
+            model.version = manifest['version']
+        except Exception as e:
+            # Anything from a truncated or unreadable .npz (OSError, BadZipFile, ...) included
+            model = None
+            print(f"[..] Region model {key} not used: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._loading.pop(key, None)
+                if model is None:
+                    self._failed.add(key)
+                    self.load_failures += 1
+                else:
+                    self._resident[key] = model
+                    self._resident.move_to_end(key)
+                    while len(self._resident) > self.max_resident:
+                        self._resident.popitem(last=False)
+                        self.evictions += 1
+                    self.loads += 1
+                    self.load_seconds += elapsed
+                    self.max_load_seconds = max(self.max_load_seconds, elapsed)
+        return model
+
+    def get(self, region):
+        """
+        Model for `region` as (model, status)
+
+        status is 'resident' or 'loaded' when a regional model is returned;
+        otherwise model is None and status says why the global model should
+        be used: 'unknown', 'loading' (cold load exceeded the timeout) or
+        'failed' (artifact missing, corrupt or of another layout).
+        """
+        key = region_key(region)
+        with self._lock:
+            model = self._resident.get(key)
+            if model is not None:
+                self._resident.move_to_end(key)
+                self.hits += 1
+                return model, 'resident'
+            path = self.available.get(key)
+            if path is None or key in self._failed:
+                self.fallbacks += 1
+                return None, 'unknown' if path is None else 'failed'
+            # Single flight: concurrent requests for a cold region share one load
+            future = self._loading.get(key)
+            if future is None:
+                future = self._loading[key] = self._loader.submit(self._load, key, path)
+
+        try:
+            model = future.result(timeout=self.load_timeout)
+        except FutureTimeoutError:
+            model, status = None, 'loading'
+        except Exception as e:
+            print(f"[..] Region model {key} not used: {e}")
+            with self._lock:
+                if self._loading.get(key) is future:
+                    del self._loading[key]
+                self._failed.add(key)
+            model, status = None, 'failed'
+        else:
+            status = 'loaded' if model is not None else 'failed'
+        if model is None:
+            with self._lock:
+                self.fallbacks += 1
+        return model, status
+
+    def stats(self):
+        """Residency and load counters as a JSON-serialisable dict"""
+        with self._lock:
+            return {
+                'available': len(self.available),
+                'resident': len(self._resident),
+                'max_resident': self.max_resident,
+                'hits': self.hits,
+                'loads': self.loads,
+                'load_failures': self.load_failures,
+                'evictions': self.evictions,
+                'fallbacks': self.fallbacks,
+                'mean_load_ms': self.load_seconds / self.loads * 1000 if self.loads else 0.0,
+                'max_load_ms': self.max_load_seconds * 1000,
+                'load_timeout_ms': self.load_timeout * 1000
+            }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build synthetic region models (demo data)')
+    parser.add_argument('directory')
+    parser.add_argument('--count', type=int, default=20, help='Number of synthetic regions')
+    parser.add_argument('--samples', type=int, default=1000)
+    args = parser.parse_args()
+
+    factors = np.random.default_rng(0).uniform(0.6, 1.8, args.count)
+    build_synthetic_regions(args.directory, {f'region-{i:04d}': float(f) for i, f in enumerate(factors)},
+                            n_samples=args.samples)
+    print(f"[OK] {args.count} region models written to {args.directory}")
@@ -0,0 +1,230 @@
+"""
+Model selection report for the readiness, likelihood and property price models
+
+Usage: python selection.py [--samples 1000] [--folds 5] [--workers 4] [--latency-budget 3]
+                           [--degrees 1 2 3] [--alphas 0 0.01 1 100] [--report selection_report.json]
+
+Every model is trained on the same synthetic datasets as
+MLPredictor.build_models. For each model, every candidate, i.e.
+polynomial degree x regularization strength (alpha 0 = LinearRegression,
+otherwise Ridge), is cross-validated with k folds in a process pool.
+Every candidate is then timed single-row through the same sklearn-free
+scorer the server uses (inference.py), in this process so the pool does
+not skew the timings.
+
+A model's recommendation is the candidate with the lowest held-out RMSE
+whose latency stays within `latency_budget` times the latency of the
+current production configuration (readiness degree 2, the others degree
+1, no regularization). A slightly better but much slower candidate is
+rejected. The report lists held-out and training accuracy, fit time and
+latency per candidate.
+
+The report does not change what is served: MLPredictor.build_models always
+trains the PRODUCTION configuration (its artifacts, incremental updates
+and compiled scorers assume that layout). Adopting a recommendation means
+changing build_models and PRODUCTION together.
+"""
+import argparse
+import json
+import os
+import time
+import timeit
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from inference import CompiledLinearModel, CompiledPolynomialModel
+from training_data import likelihood_dataset, property_dataset, readiness_dataset, sample_profiles
+
+DEGREES = (1, 2, 3)
+ALPHAS = (0.0, 0.01, 1.0, 100.0)
+# Configuration served today: (degree, alpha) per model
+PRODUCTION = {'readiness': (2, 0.0), 'likelihood': (1, 0.0), 'property_price': (1, 0.0)}
+DEFAULT_LATENCY_BUDGET = 3.0
+
+_datasets = None
+
+
+def build_datasets(n_samples=1000, seed=42):
+    """{model name: (X, y)} drawn exactly as MLPredictor.build_models draws its training data"""
+    rng = np.random.default_rng(seed)
+    profiles = sample_profiles(rng, n_samples)
+    readiness = readiness_dataset(rng, profiles)
+    likelihood = likelihood_dataset(rng, profiles)
+    return {'readiness': readiness, 'likelihood': likelihood,
+            'property_price': property_dataset(rng, n_samples)}
+
+
+def _init_worker(datasets):
+    global _datasets
+    _datasets = datasets
+
+
+def _estimator(degree, alpha):
+    from sklearn.linear_model import LinearRegression, Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import PolynomialFeatures
+
+    model = LinearRegression() if alpha == 0 else Ridge(alpha=alpha)
+    return model if degree == 1 else make_pipeline(PolynomialFeatures(degree=degree), model)
+
+
+def evaluate_candidate(name, degree, alpha, folds, seed):
+    """
+    Cross-validated accuracy of one candidate plus the candidate refitted on
+    all rows (for latency timing); runs in a pool worker
+    """
+    from scipy.linalg import LinAlgWarning
+    from sklearn.model_selection import KFold, cross_validate
+
+    # Degree 3 on raw dollar amounts is ill-conditioned by design; the CV error shows it
+    warnings.simplefilter('ignore', LinAlgWarning)
+    X, y = _datasets[name]
+    started = time.perf_counter()
+    scores = cross_validate(_estimator(degree, alpha), X, y, cv=KFold(folds, shuffle=True, random_state=seed),
+                            scoring=('neg_root_mean_squared_error', 'r2'), return_train_score=True)
+    cv_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fitted = _estimator(degree, alpha).fit(X, y)
+    fit_seconds = time.perf_counter() - started
+    rmse = -scores['test_neg_root_mean_squared_error']
+    return {
+        'model': name,
+        'degree': degree,
+        'alpha': alpha,
+        'cv_rmse': float(rmse.mean()),
+        'cv_rmse_std': float(rmse.std()),
+        'cv_r2': float(scores['test_r2'].mean()),
+        'train_r2': float(scores['train_r2'].mean()),
+        'cv_seconds': cv_seconds,
+        'fit_seconds': fit_seconds
+    }, fitted
+
+
+def _compiled(fitted):
+    """The server's scorer for a fitted candidate (the same scorer class for every degree)"""
+    if not hasattr(fitted, 'steps'):
+        return CompiledLinearModel(fitted)
+    return CompiledPolynomialModel(fitted.steps[0][1], fitted.steps[-1][1])
+
+
+def _n_features(fitted):
+    return fitted.steps[0][1].n_output_features_ if hasattr(fitted, 'steps') else fitted.n_features_in_
+
+
+def _latency_us(fitted, X, number=500, repeat=5):
+    """Best single-row prediction time in microseconds"""
+    scorer, row = _compiled(fitted), X[:1]
+    return min(timeit.repeat(lambda: scorer.predict(row), number=number, repeat=repeat)) / number * 1e6
+
+
+def select_models(n_samples=1000, seed=42, folds=5, workers=1, latency_budget=DEFAULT_LATENCY_BUDGET,
+                  degrees=DEGREES, alphas=ALPHAS):
+    """
+    Cross-validate every candidate of every model and recommend one per model
+
+    Parameters:
+    - folds: Cross-validation folds (held-out error)
+    - workers: Pool processes for the cross-validation; 1 runs in this process
+    - latency_budget: Allowed single-row latency as a multiple of the production configuration's
+
+    Returns the report dict (see module docstring).
+    """
+    started = time.perf_counter()
+    datasets = build_datasets(n_samples, seed)
+    tasks = [(name, degree, alpha) for name in datasets for degree in degrees for alpha in alphas]
+    for name, (degree, alpha) in PRODUCTION.items():
+        if (name, degree, alpha) not in tasks:
+            tasks.append((name, degree, alpha))
+
+    if workers <= 1:
+        _init_worker(datasets)
+        results = [evaluate_candidate(*task, folds, seed) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(datasets,)) as pool:
+            futures = [pool.submit(evaluate_candidate, *task, folds, seed) for task in tasks]
+            results = [future.result() for future in futures]
+    cv_elapsed = time.perf_counter() - started
+
+    by_model = {name: [] for name in datasets}
+    for candidate, fitted in results:
+        by_model[candidate.pop('model')].append((candidate, fitted))
+
+    models = {}
+    for name, (X, _) in datasets.items():
+        candidates = []
+        for candidate, fitted in by_model[name]:
+            candidate['n_features'] = _n_features(fitted)
+            candidate['latency_us'] = _latency_us(fitted, X)
+            candidate['production'] = (candidate['degree'], candidate['alpha']) == PRODUCTION[name]
+            candidates.append(candidate)
+        baseline = next(c for c in candidates if c['production'])
+        budget_us = baseline['latency_us'] * latency_budget
+        for candidate in candidates:
+            candidate['within_budget'] = candidate['latency_us'] <= budget_us
+        recommended = min((c for c in candidates if c['within_budget']), key=lambda c: c['cv_rmse'])
+        for candidate in candidates:
+            candidate['recommended'] = candidate is recommended
+        models[name] = {
+            'recommended': {'degree': recommended['degree'], 'alpha': recommended['alpha']},
+            'production': {'degree': baseline['degree'], 'alpha': baseline['alpha']},
+            'rmse_change': recommended['cv_rmse'] / baseline['cv_rmse'] - 1,
+            'latency_budget_us': budget_us,
+            'candidates': candidates
+        }
+
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'n_samples': n_samples,
+        'seed': seed,
+        'folds': folds,
+        'workers': workers,
+        'latency_budget': latency_budget,
+        'cv_seconds': cv_elapsed,
+        'total_seconds': time.perf_counter() - started,
+        'models': models
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cross-validated model selection under a latency budget')
+    parser.add_argument('--samples', type=int, default=1000, help='Rows per synthetic dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--latency-budget', type=float, default=DEFAULT_LATENCY_BUDGET,
+                        help='Allowed latency as a multiple of the production configuration')
+    parser.add_argument('--degrees', type=int, nargs='+', default=list(DEGREES))
+    parser.add_argument('--alphas', type=float, nargs='+', default=list(ALPHAS),
+                        help='Regularization strengths; 0 fits LinearRegression')
+    parser.add_argument('--report', default='selection_report.json', help='Where to write the report')
+    args = parser.parse_args(argv)
+
+    report = select_models(args.samples, args.seed, args.folds, args.workers, args.latency_budget,
+                           args.degrees, args.alphas)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 92)
+    print(f"{args.samples:,} samples, {args.folds}-fold CV on {args.workers} workers "
+          f"in {report['cv_seconds']:.1f}s; latency budget {args.latency_budget:g}x production")
+    for name, result in report['models'].items():
+        print("-" * 92)
+        print(f"{name:<16} {'degree':>6} {'alpha':>7} {'features':>8} {'cv RMSE':>12} {'cv R^2':>8} "
+              f"{'train R^2':>9} {'fit s':>7} {'latency us':>11}")
+        for c in result['candidates']:
+            flag = ' <' if c['recommended'] else (' *' if c['production'] else '')
+            over = '' if c['within_budget'] else ' (over budget)'
+            print(f"{'':<16} {c['degree']:>6} {c['alpha']:>7g} {c['n_features']:>8} {c['cv_rmse']:>12,.2f} "
+                  f"{c['cv_r2']:>8.4g} {c['train_r2']:>9.4f} {c['fit_seconds']:>7.3f} "
+                  f"{c['latency_us']:>11.1f}{flag}{over}")
+    print("=" * 92)
+    print("< recommended, * production configuration (served; see module docstring)")
+    print(f"Report written to {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
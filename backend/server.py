@@ -1,320 +1,88 @@
-from flask import Flask, request, jsonify
+import json
+import os
+import threading
+import time
+
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
+
+from advice import AdviceService, GeminiClient, LLMError, StubLLM
+from artifacts import manifest_path
+from cache import PredictionCache, quantize
+from coalescer import RequestCoalescer
+from columnar import MEDIA_TYPE as COLUMNAR_TYPE, ColumnarError, decode as decode_columnar, \
+    encode as encode_columnar
+from jobs import BackgroundJobs
+from listings import ListingsProxy, UpstreamError
+from predictor import (CONDITION_MAP, CURRENT_YEAR, LOCATION_MAP, SOLVE_RANGES, MLPredictor,  # noqa: F401
+                       configured_predictor)
+from regions import RegionModelRegistry
+from sessions import SessionClosed, SessionStore, parse_fields
+from streaming import MODEL_COLUMNS
+from validation import number_field
+from metrics import exposition, finish_request, mark, prediction_branch, registry, start_request
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
-
-class MLPredictor:
-    """
-    Machine Learning predictor using polynomial regression for readiness
-    and linear regression for success likelihood
-    """
-    def __init__(self):
-        self.readiness_model = None
-        self.likelihood_model = None
-        self.property_price_model = None
-        self.poly_features = PolynomialFeatures(degree=2)
-        self.train_models()
-
-    def train_models(self):
-        """
-        Train ML models using synthetic data based on domain knowledge
-        """
-        # Generate training data for READINESS model
-        # Features: [income, equity, savings, target, marital_status, kids]
-        np.random.seed(42)
-        n_samples = 1000
-
-        # Generate diverse training samples
-        incomes = np.random.uniform(2000, 15000, n_samples)
-        equities = np.random.uniform(0, 200000, n_samples)
-        savings = np.random.uniform(0, 2000, n_samples)
-        targets = np.random.uniform(100000, 800000, n_samples)
-        marital = np.random.randint(0, 2, n_samples)  # 0=single, 1=married
-        kids = np.random.randint(0, 5, n_samples)
-
-        # Calculate ground truth using domain logic
-        X_readiness = []
-        y_readiness = []
-
-        for i in range(n_samples):
-            cost_deduction = 400 if marital[i] == 1 else 0
-            cost_deduction += kids[i] * 300
-            adjusted_income = max(1000, incomes[i] - cost_deduction)
-            curr_power = (adjusted_income * 90) + equities[i]
-            ratio = curr_power / targets[i]
-
-            # Quadratic readiness with some noise for ML learning
-            readiness = 100 if ratio >= 1.0 else max(0, 100 * (ratio ** 2))
-            readiness += np.random.normal(0, 2)  # Add small noise
-            readiness = np.clip(readiness, 0, 100)
-
-            X_readiness.append([incomes[i], equities[i], savings[i], targets[i],
-                              marital[i], kids[i], adjusted_income, curr_power, ratio])
-            y_readiness.append(readiness)
-
-        X_readiness = np.array(X_readiness)
-        y_readiness = np.array(y_readiness)
-
-        # Train polynomial regression for readiness (captures non-linear relationships)
-        X_readiness_poly = self.poly_features.fit_transform(X_readiness)
-        self.readiness_model = LinearRegression()
-        self.readiness_model.fit(X_readiness_poly, y_readiness)
-
-        # Generate training data for LIKELIHOOD model
-        # Features: [income, equity, savings, target, years, rate, marital_status, kids]
-        years = np.random.uniform(1, 15, n_samples)
-        rates = np.random.uniform(2.0, 8.0, n_samples)
-
-        X_likelihood = []
-        y_likelihood = []
-
-        for i in range(n_samples):
-            cost_deduction = 400 if marital[i] == 1 else 0
-            cost_deduction += kids[i] * 300
-            adjusted_income = max(1000, incomes[i] - cost_deduction)
-
-            # Calculate future equity with compound interest
-            monthly_rate = (rates[i] / 100) / 12
-            months = int(years[i] * 12)
-            future_equity = equities[i]
-
-            for _ in range(months):
-                future_equity = (future_equity * (1 + monthly_rate)) + savings[i]
-
-            future_power = (adjusted_income * 90) + future_equity
-            coverage = future_power / targets[i]
-
-            # Risk adjustment factor: Higher risk = more uncertainty = lower confidence
-            # Conservative (2.5%): +5% confidence boost (more predictable)
-            # Balanced (5%): neutral (baseline)
-            # Aggressive (7.5%): -5% confidence penalty (more volatile)
-            risk_adjustment = 0
-            if rates[i] < 3.5:  # Conservative
-                risk_adjustment = 5  # More reliable, boost likelihood
-            elif rates[i] > 6.5:  # Aggressive
-                risk_adjustment = -5  # Less reliable, reduce likelihood
-
-            # Logistic-based likelihood with noise and risk adjustment
-            likelihood = 100 / (1 + np.exp(-10 * (coverage - 0.85)))
-            likelihood = max(10, likelihood)
-            if future_power >= targets[i]:
-                likelihood = 98
-
-            # Apply risk adjustment
-            likelihood += risk_adjustment
-
-            # Add small noise
-            likelihood += np.random.normal(0, 2)
-            likelihood = np.clip(likelihood, 10, 98)
-
-            X_likelihood.append([incomes[i], equities[i], savings[i], targets[i],
-                               years[i], rates[i], marital[i], kids[i],
-                               adjusted_income, future_equity, coverage])
-            y_likelihood.append(likelihood)
-
-        X_likelihood = np.array(X_likelihood)
-        y_likelihood = np.array(y_likelihood)
-
-        # Train linear regression for likelihood
-        self.likelihood_model = LinearRegression()
-        self.likelihood_model.fit(X_likelihood, y_likelihood)
-
-        # Generate training data for PROPERTY PRICE model
-        # Features: [sqm, rooms, bathrooms, location_premium, condition, year_built_age]
-        sqm_values = np.random.uniform(50, 250, n_samples)
-        rooms_values = np.random.uniform(1, 6, n_samples)
-        bathrooms_values = np.random.uniform(1, 4, n_samples)
-        location_premium = np.random.uniform(0, 2, n_samples)  # 0=rural, 1=city, 2=premium
-        condition = np.random.uniform(0, 2, n_samples)  # 0=renovation, 1=good, 2=new
-        year_age = np.random.uniform(0, 100, n_samples)  # age of property in years
-
-        X_property = []
-        y_property = []
-
-        for i in range(n_samples):
-            # Base price calculation with realistic German market data
-            # Average: 4000-8000 EUR per sqm depending on location
-            base_price_per_sqm = 3500 + (location_premium[i] * 2000)
-
-            # Adjustments
-            room_bonus = rooms_values[i] * 5000  # Extra value per room
-            bathroom_bonus = bathrooms_values[i] * 8000  # Bathrooms add value
-            condition_factor = 1.0 + (condition[i] * 0.15)  # Up to 30% more for new
-            age_penalty = max(0, 1 - (year_age[i] / 200))  # Older = less valuable
-
-            # Calculate price
-            price = (sqm_values[i] * base_price_per_sqm * condition_factor * age_penalty +
-                    room_bonus + bathroom_bonus)
-
-            # Add realistic noise
-            price += np.random.normal(0, price * 0.05)  # 5% noise
-            price = max(50000, price)  # Minimum price
-
-            X_property.append([sqm_values[i], rooms_values[i], bathrooms_values[i],
-                             location_premium[i], condition[i], year_age[i]])
-            y_property.append(price)
-
-        X_property = np.array(X_property)
-        y_property = np.array(y_property)
-
-        # Train linear regression for property price
-        self.property_price_model = LinearRegression()
-        self.property_price_model.fit(X_property, y_property)
-
-        print("[OK] ML Models trained successfully!")
-        print(f"  Readiness Model R^2 Score: {self.readiness_model.score(X_readiness_poly, y_readiness):.4f}")
-        print(f"  Likelihood Model R^2 Score: {self.likelihood_model.score(X_likelihood, y_likelihood):.4f}")
-        print(f"  Property Price Model R^2 Score: {self.property_price_model.score(X_property, y_property):.4f}")
-
-    def predict_readiness(self, income, equity, savings, target, marital, kids):
-        """
-        Predict current readiness using polynomial regression
-
-        Edge case handling: For inputs outside training bounds, uses direct formula
-        to avoid polynomial extrapolation errors.
-        """
-        # Calculate derived features
-        cost_deduction = 400 if marital == 'married' else 0
-        cost_deduction += kids * 300
-        adjusted_income = max(1000, income - cost_deduction)
-        curr_power = (adjusted_income * 90) + equity
-        ratio = curr_power / target if target > 0 else 0
-
-        # Check if inputs are within training bounds
-        # Training ranges: income(2k-15k), equity(0-200k), target(100k-800k)
-        within_bounds = (
-            2000 <= income <= 15000 and
-            0 <= equity <= 200000 and
-            100000 <= target <= 800000
-        )
-
-        # For edge cases outside training data, use direct formula
-        # Polynomial regression extrapolates poorly beyond training range
-        if not within_bounds:
-            # Use quadratic readiness formula directly (same as training logic)
-            if ratio >= 1.0:
-                readiness = 100
-            else:
-                readiness = 100 * (ratio ** 2)
-            readiness = max(0, min(100, readiness))
-        else:
-            # Use ML model for predictions within training bounds
-            marital_num = 1 if marital == 'married' else 0
-            X = np.array([[income, equity, savings, target, marital_num, kids,
-                          adjusted_income, curr_power, ratio]])
-
-            # Transform to polynomial features
-            X_poly = self.poly_features.transform(X)
-
-            # Predict
-            readiness = self.readiness_model.predict(X_poly)[0]
-            readiness = np.clip(readiness, 0, 100)
-
-        return int(readiness), int(curr_power)
-
-    def predict_likelihood(self, income, equity, savings, target, years, rate, marital, kids):
-        """
-        Predict success likelihood using linear regression
-
-        Edge case handling: For inputs outside training bounds, uses direct logistic formula.
-        """
-        # Calculate derived features
-        cost_deduction = 400 if marital == 'married' else 0
-        cost_deduction += kids * 300
-        adjusted_income = max(1000, income - cost_deduction)
-
-        # Calculate future equity with compound interest
-        monthly_rate = (rate / 100) / 12
-        months = int(years * 12)
-        future_equity = equity
-
-        for _ in range(months):
-            future_equity = (future_equity * (1 + monthly_rate)) + savings
-
-        future_power = (adjusted_income * 90) + future_equity
-        coverage = future_power / target if target > 0 else 0
-
-        # Check if inputs are within training bounds
-        # Training ranges: income(2k-15k), equity(0-200k), target(100k-800k), years(1-15)
-        within_bounds = (
-            2000 <= income <= 15000 and
-            0 <= equity <= 200000 and
-            100000 <= target <= 800000 and
-            1 <= years <= 15 and
-            2.0 <= rate <= 8.0
-        )
-
-        # For edge cases outside training data, use direct formula
-        if not within_bounds:
-            # Use logistic formula directly (same as training logic)
-            likelihood = 100 / (1 + np.exp(-10 * (coverage - 0.85)))
-            likelihood = max(10, likelihood)
-            if future_power >= target:
-                likelihood = 98
-
-            # Apply risk adjustment: Higher risk = lower reliability
-            # Conservative (2.5%): +5% confidence boost
-            # Balanced (5%): neutral
-            # Aggressive (7.5%): -5% confidence penalty
-            risk_adjustment = 0
-            if rate < 3.5:  # Conservative
-                risk_adjustment = 5
-            elif rate > 6.5:  # Aggressive
-                risk_adjustment = -5
-
-            likelihood += risk_adjustment
-            likelihood = max(10, min(98, likelihood))
-        else:
-            # Use ML model for predictions within training bounds
-            marital_num = 1 if marital == 'married' else 0
-            X = np.array([[income, equity, savings, target, years, rate,
-                          marital_num, kids, adjusted_income, future_equity, coverage]])
-
-            # Predict
-            likelihood = self.likelihood_model.predict(X)[0]
-            likelihood = np.clip(likelihood, 10, 98)
-
-        return int(likelihood), int(future_equity)
-
-    def predict_property_price(self, sqm, rooms, bathrooms, location_type, condition, year_built):
-        """
-        Predict property price using linear regression
-
-        Parameters:
-        - sqm: Living area in square meters
-        - rooms: Number of rooms
-        - bathrooms: Number of bathrooms
-        - location_type: 'rural' (0), 'city' (1), or 'premium' (2)
-        - condition: 'renovation' (0), 'good' (1), or 'new' (2)
-        - year_built: Year the property was built
-        """
-        # Convert location type to numeric
-        location_map = {'rural': 0, 'city': 1, 'premium': 2}
-        location_premium = location_map.get(location_type, 1)
-
-        # Convert condition to numeric
-        condition_map = {'renovation': 0, 'good': 1, 'new': 2}
-        condition_value = condition_map.get(condition, 1)
-
-        # Calculate age of property
-        current_year = 2025
-        year_age = max(0, current_year - year_built)
-
-        # Prepare features for prediction
-        X = np.array([[sqm, rooms, bathrooms, location_premium, condition_value, year_age]])
-
-        # Predict
-        price = self.property_price_model.predict(X)[0]
-        price = max(50000, price)  # Minimum price
-
-        return int(price)
-
-# Initialize ML predictor
-predictor = MLPredictor()
+STARTED_AT = time.monotonic()
+
+# Routes that need the trained models (503 until a lazy start has loaded them);
+# the prediction routes answer through the formula fallbacks meanwhile
+MODEL_ONLY_ROUTES = {
+    '/api/predict-property-price', '/api/listings/valuation', '/api/outcomes',
+    '/api/models/versions', '/api/models/rollback', '/api/retrain'
+}
+
+# Initialize ML predictor (configured from the environment, see predictor.configured_predictor)
+# LAZY_MODELS=1: import returns at once and the models load on a background thread;
+# until they are published predictions use the formula fallbacks (see /api/health/ready)
+LAZY_MODELS = os.environ.get('LAZY_MODELS', '0') == '1'
+predictor = configured_predictor(lazy=LAZY_MODELS)
+ARTIFACT_PATH = predictor.artifact_path
+if LAZY_MODELS:
+    predictor.start_warm_up()
+
+# Per-endpoint result caches: size/TTL from the environment, quantization steps per input
+CACHE_CONFIG = {
+    'predict': {
+        'max_size': int(os.environ.get('PREDICT_CACHE_SIZE', 4096)),
+        'ttl': float(os.environ.get('PREDICT_CACHE_TTL', 300)),
+        'steps': {'income': 10, 'equity': 10, 'savings': 10, 'target': 100, 'rate': 0.05}
+    },
+    'property_price': {
+        'max_size': int(os.environ.get('PROPERTY_CACHE_SIZE', 4096)),
+        'ttl': float(os.environ.get('PROPERTY_CACHE_TTL', 300)),
+        'steps': {'sqm': 0.5, 'rooms': 0.5, 'bathrooms': 0.5}
+    }
+}
+prediction_caches = {
+    name: PredictionCache(max_size=config['max_size'], ttl=config['ttl'])
+    for name, config in CACHE_CONFIG.items()
+}
+
+def _score_profile_batch(profiles):
+    """Score (income, equity, savings, target, years, rate, marital, kids) tuples as one batch"""
+    incomes, equities, savings, targets, years, rates, marital, kids = zip(*profiles)
+    readiness, curr_power = predictor.predict_readiness_batch(
+        incomes, equities, savings, targets, marital, kids
+    )
+    likelihood, future_equity = predictor.predict_likelihood_batch(
+        incomes, equities, savings, targets, years, rates, marital, kids
+    )
+    return list(zip(readiness.tolist(), likelihood.tolist(), curr_power.tolist(), future_equity.tolist()))
+
+# Opt-in micro-batching of concurrent /api/predict calls (PREDICT_COALESCE=1)
+COALESCE_CONFIG = {
+    'enabled': os.environ.get('PREDICT_COALESCE', '0') == '1',
+    'max_batch_size': int(os.environ.get('PREDICT_COALESCE_MAX_BATCH', 64)),
+    'max_wait_ms': float(os.environ.get('PREDICT_COALESCE_WINDOW_MS', 2.0))
+}
+predict_coalescer = RequestCoalescer(
+    _score_profile_batch,
+    max_batch_size=COALESCE_CONFIG['max_batch_size'],
+    max_wait_ms=COALESCE_CONFIG['max_wait_ms']
+) if COALESCE_CONFIG['enabled'] else None
 
 @app.route('/api/predict', methods=['POST'])
 def predict():
@@ -336,27 +104,47 @@ def predict():
         data = request.json
 
         # Extract parameters
-        income = float(data.get('income', 0))
-        equity = float(data.get('equity', 0))
-        savings = float(data.get('savings', 0))
-        target = float(data.get('target', 1))
-        years = int(data.get('years', 1))
-        rate = float(data.get('rate', 5.0))
-        marital = data.get('marital', 'single')
-        kids = int(data.get('kids', 0))
+        try:
+            income = number_field(data, 'income', 0.0)
+            equity = number_field(data, 'equity', 0.0)
+            savings = number_field(data, 'savings', 0.0)
+            target = number_field(data, 'target', 1.0)
+            years = number_field(data, 'years', 1, int)
+            rate = number_field(data, 'rate', 5.0)
+            marital = data.get('marital', 'single')
+            kids = number_field(data, 'kids', 0, int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Validate inputs
         if target <= 0:
             return jsonify({'error': 'Target must be greater than 0'}), 400
 
-        # Get predictions
-        readiness, curr_power = predictor.predict_readiness(
-            income, equity, savings, target, marital, kids
-        )
+        mark('parse')
+
+        # Nearly identical payloads share a cache entry: the key holds the inputs rounded to
+        # the cache steps, while results are computed from the inputs as sent (like every
+        # other prediction path). Keys carry the model generation so results from replaced
+        # models are never served
+        steps = CACHE_CONFIG['predict']['steps']
+        key = (predictor.generation, quantize(income, steps['income']), quantize(equity, steps['equity']),
+               quantize(savings, steps['savings']), quantize(target, steps['target']), years,
+               quantize(rate, steps['rate']), marital, kids)
+
+        def compute():
+            if predict_coalescer is not None:
+                return predict_coalescer.submit((income, equity, savings, target, years, rate, marital, kids))
+            readiness, curr_power = predictor.predict_readiness(
+                income, equity, savings, target, marital, kids
+            )
+            likelihood, future_equity = predictor.predict_likelihood(
+                income, equity, savings, target, years, rate, marital, kids
+            )
+            return readiness, likelihood, curr_power, future_equity
 
-        likelihood, future_equity = predictor.predict_likelihood(
-            income, equity, savings, target, years, rate, marital, kids
-        )
+        # Get predictions
+        readiness, likelihood, curr_power, future_equity = \
+            prediction_caches['predict'].get_or_compute(key, compute)
 
         # Return predictions
         response = {
@@ -375,6 +163,368 @@ def predict():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _row_field(row, name, default, cast, label):
+    """number_field of one row of a batch request; the ValueError names the row (e.g. 'listing 3')"""
+    try:
+        return number_field(row, name, default, cast)
+    except ValueError as e:
+        raise ValueError(f'{e} ({label})') from None
+
+def _row_values(rows, name, default, cast, label):
+    """
+    One field of every row of a batch request, parsed like number_field;
+    ValueError naming the first row that is not an object or whose value
+    does not parse or is not finite
+    """
+    values = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f'{label} {i} must be an object')
+        values.append(_row_field(row, name, default, cast, f'{label} {i}'))
+    return values
+
+# Columnar batch input: column -> (accepted dtype kinds, /api/predict default)
+COLUMNAR_PROFILE = {
+    'income': ('fiu', 0.0),
+    'equity': ('fiu', 0.0),
+    'savings': ('fiu', 0.0),
+    'target': ('fiu', 1.0),
+    'years': ('iu', 1),
+    'rate': ('fiu', 5.0),
+    'marital': ('iub', 0),  # code, 1 = married; decoded to 'married'/'single'
+    'kids': ('iu', 0)
+}
+MARITAL_CODES = np.array(['single', 'married'])
+
+def _columnar_profiles(payload):
+    """Profile columns of a columnar request body (views of the body, defaults for missing columns)"""
+    columns, n = decode_columnar(payload)
+    if n == 0:
+        raise ColumnarError('payload has no rows')
+    profile = {}
+    for name, (kinds, default) in COLUMNAR_PROFILE.items():
+        values = columns.get(name)
+        if values is None:
+            values = np.full(n, default)
+        elif values.dtype.kind not in kinds:
+            raise ColumnarError(f'column {name} must have dtype kind {"/".join(kinds)}, not {values.dtype}')
+        elif values.dtype.kind == 'f' and not np.isfinite(values).all():
+            row = int(np.argmin(np.isfinite(values)))
+            raise ColumnarError(f'column {name} must be finite, not {values[row]} (row {row})')
+        profile[name] = values
+    # The predictors take the same strings as the JSON paths
+    profile['marital'] = MARITAL_CODES[(profile['marital'] == 1).astype(np.intp)]
+    return profile
+
+def _prefers_columnar():
+    """Whether the Accept header ranks the columnar format above JSON"""
+    return request.accept_mimetypes.best_match(['application/json', COLUMNAR_TYPE]) == COLUMNAR_TYPE
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Batch prediction endpoint
+    Expected JSON payload:
+    {
+        "profiles": [ {same fields as /api/predict}, ... ]
+    }
+    or a columnar payload (Content-Type application/vnd.rge.columnar, see
+    columnar.py) with float columns income, equity, savings, target, rate,
+    integer columns years, kids and marital (1 = married); missing columns
+    take the /api/predict defaults. Responds with columnar readiness,
+    likelihood, currPower and futureEquity columns when the Accept header
+    prefers that format.
+    """
+    try:
+        if request.mimetype == COLUMNAR_TYPE:
+            # Extract parameters: arrays viewing the request body, no per-field parsing
+            try:
+                profile = _columnar_profiles(request.get_data())
+            except ColumnarError as e:
+                return jsonify({'error': str(e)}), 400
+            incomes, equities, savings, targets = (profile[name] for name in ('income', 'equity', 'savings',
+                                                                                'target'))
+            years, rates, marital, kids = profile['years'], profile['rate'], profile['marital'], profile['kids']
+            invalid = np.flatnonzero(targets <= 0).tolist()
+        else:
+            data = request.json
+            profiles = data.get('profiles')
+
+            if not isinstance(profiles, list) or not profiles:
+                return jsonify({'error': 'profiles must be a non-empty list'}), 400
+
+            # Extract parameters column by column with the same defaults as /api/predict
+            try:
+                incomes = _row_values(profiles, 'income', 0.0, float, 'profile')
+                equities = _row_values(profiles, 'equity', 0.0, float, 'profile')
+                savings = _row_values(profiles, 'savings', 0.0, float, 'profile')
+                targets = _row_values(profiles, 'target', 1.0, float, 'profile')
+                years = _row_values(profiles, 'years', 1, int, 'profile')
+                rates = _row_values(profiles, 'rate', 5.0, float, 'profile')
+                kids = _row_values(profiles, 'kids', 0, int, 'profile')
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            marital = [p.get('marital', 'single') for p in profiles]
+            invalid = [i for i, target in enumerate(targets) if target <= 0]
+
+        # Validate inputs
+        if invalid:
+            return jsonify({'error': f'Target must be greater than 0 (profile {invalid[0]})'}), 400
+        mark('parse')
+
+        # Get predictions
+        readiness, curr_power = predictor.predict_readiness_batch(
+            incomes, equities, savings, targets, marital, kids
+        )
+
+        likelihood, future_equity = predictor.predict_likelihood_batch(
+            incomes, equities, savings, targets, years, rates, marital, kids
+        )
+
+        if _prefers_columnar():
+            return encode_columnar({'readiness': readiness, 'likelihood': likelihood, 'currPower': curr_power,
+                                    'futureEquity': future_equity}), 200, {'Content-Type': COLUMNAR_TYPE}
+
+        predictions = [
+            {
+                'readiness': r,
+                'likelihood': l,
+                'currPower': c,
+                'futureEquity': f
+            }
+            for r, l, c, f in zip(readiness.tolist(), likelihood.tolist(),
+                                  curr_power.tolist(), future_equity.tolist())
+        ]
+
+        # Return predictions
+        response = {
+            'predictions': predictions,
+            'count': len(predictions),
+            'model_info': {
+                'readiness_model': 'Polynomial Regression (degree 2)',
+                'likelihood_model': 'Linear Regression with feature engineering'
+            }
+        }
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/projection', methods=['POST'])
+def projection():
+    """
+    Year-by-year projection endpoint for the plan chart
+    Expected JSON payload:
+    {
+        "income": float,
+        "equity": float,
+        "savings": float,
+        "target": float,
+        "rate": float,
+        "marital": str,
+        "kids": int,
+        "maxYears": int  // optional, defaults to 30
+    }
+    The series come back as columnar arrays (see columnar.py) when the
+    Accept header prefers application/vnd.rge.columnar.
+    """
+    try:
+        data = request.json
+
+        # Extract parameters
+        try:
+            income = number_field(data, 'income', 0.0)
+            equity = number_field(data, 'equity', 0.0)
+            savings = number_field(data, 'savings', 0.0)
+            target = number_field(data, 'target', 1.0)
+            rate = number_field(data, 'rate', 5.0)
+            marital = data.get('marital', 'single')
+            kids = number_field(data, 'kids', 0, int)
+            max_years = number_field(data, 'maxYears', 30, int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Validate inputs
+        if target <= 0:
+            return jsonify({'error': 'Target must be greater than 0'}), 400
+        if not 1 <= max_years <= 50:
+            return jsonify({'error': 'maxYears must be between 1 and 50'}), 400
+        mark('parse')
+
+        # Get projection for every year at once
+        series = predictor.predict_projection(
+            income, equity, savings, target, rate, marital, kids, max_years
+        )
+
+        # Return projection
+        if _prefers_columnar():
+            return encode_columnar(series), 200, {'Content-Type': COLUMNAR_TYPE}
+        response = {key: values.tolist() for key, values in series.items()}
+        response['model_info'] = 'Linear Regression with feature engineering'
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Monte Carlo mode: latency budget per request (0 disables) and path cap from the environment
+SIMULATION_CONFIG = {
+    'budget_ms': float(os.environ.get('SIMULATION_BUDGET_MS', 20)),
+    'max_paths': int(os.environ.get('SIMULATION_MAX_PATHS', 50000)),
+    # Throughput seeded runs are sized by (simulation.affordable_paths); well below the
+    # 50-80k path-months per ms measured, so the clock rarely cuts them further
+    'path_months_per_ms': float(os.environ.get('SIMULATION_PATH_MONTHS_PER_MS', 30000))
+}
+
+@app.route('/api/predict/simulate', methods=['POST'])
+def predict_simulate():
+    """
+    Success likelihood under return uncertainty (Monte Carlo)
+    Expected JSON payload:
+    {
+        same fields as /api/predict, plus
+        "paths": int,         // optional, default 10000
+        "volatility": float,  // optional annual volatility in percent, default from rate
+        "seed": int           // optional, makes the result reproducible
+    }
+
+    Every run stays within SIMULATION_BUDGET_MS. A seeded run simulates the
+    requested paths cut to what the budget affords at
+    SIMULATION_PATH_MONTHS_PER_MS (the same count for the same request);
+    "truncated" reports fewer paths than requested.
+    """
+    try:
+        data = request.json
+
+        # Extract parameters
+        try:
+            income = number_field(data, 'income', 0.0)
+            equity = number_field(data, 'equity', 0.0)
+            savings = number_field(data, 'savings', 0.0)
+            target = number_field(data, 'target', 1.0)
+            years = number_field(data, 'years', 1, int)
+            rate = number_field(data, 'rate', 5.0)
+            marital = data.get('marital', 'single')
+            kids = number_field(data, 'kids', 0, int)
+            paths = number_field(data, 'paths', 10000, int)
+            volatility = number_field(data, 'volatility', None)
+            seed = number_field(data, 'seed', None, int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Validate inputs
+        if target <= 0:
+            return jsonify({'error': 'Target must be greater than 0'}), 400
+        if not 1 <= years <= 50:
+            return jsonify({'error': 'years must be between 1 and 50'}), 400
+        if not 1 <= paths <= SIMULATION_CONFIG['max_paths']:
+            return jsonify({'error': f"paths must be between 1 and {SIMULATION_CONFIG['max_paths']}"}), 400
+        if volatility is not None and not 0 <= volatility <= 100:
+            return jsonify({'error': 'volatility must be between 0 and 100'}), 400
+        if seed is not None and seed < 0:
+            return jsonify({'error': 'seed must be non-negative'}), 400
+        mark('parse')
+
+        # Simulate within the latency budget; seeded runs are cut to a path count fixed
+        # by the request, not by the clock, so they stay reproducible
+        result = predictor.simulate_likelihood(
+            income, equity, savings, target, years, rate, marital, kids,
+            paths=paths, volatility=volatility, seed=seed,
+            budget_ms=SIMULATION_CONFIG['budget_ms'] or None,
+            path_months_per_ms=SIMULATION_CONFIG['path_months_per_ms']
+        )
+
+        # Return simulation summary
+        response = dict(result, equityBands={name: band.tolist()
+                                             for name, band in result['equityBands'].items()})
+        response['model_info'] = 'Monte Carlo simulation of lognormal monthly returns'
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/solve', methods=['POST'])
+def solve():
+    """
+    Goal-seeking endpoint: minimum savings / years or maximum target
+    Expected JSON payload:
+    {
+        same fields as /api/predict, plus
+        "solveFor": str,  // 'savings', 'years' or 'target'
+        "metric": str,    // 'likelihood' (default) or 'readiness'
+        "goal": float     // metric value to reach, 0-100
+    }
+    """
+    try:
+        data = request.json
+
+        # Extract parameters
+        try:
+            income = number_field(data, 'income', 0.0)
+            equity = number_field(data, 'equity', 0.0)
+            savings = number_field(data, 'savings', 0.0)
+            target = number_field(data, 'target', 1.0)
+            years = number_field(data, 'years', 1, int)
+            rate = number_field(data, 'rate', 5.0)
+            marital = data.get('marital', 'single')
+            kids = number_field(data, 'kids', 0, int)
+            solve_for = data.get('solveFor')
+            metric = data.get('metric', 'likelihood')
+            goal = number_field(data, 'goal', 80.0)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Validate inputs
+        if solve_for not in SOLVE_RANGES:
+            return jsonify({'error': f"solveFor must be one of {', '.join(SOLVE_RANGES)}"}), 400
+        if metric not in ('likelihood', 'readiness'):
+            return jsonify({'error': "metric must be 'likelihood' or 'readiness'"}), 400
+        if metric == 'readiness' and solve_for == 'years':
+            return jsonify({'error': 'Readiness does not depend on years'}), 400
+        if not 0 <= goal <= 100:
+            return jsonify({'error': 'goal must be between 0 and 100'}), 400
+        if solve_for != 'target' and target <= 0:
+            return jsonify({'error': 'Target must be greater than 0'}), 400
+        mark('parse')
+
+        # Search the whole range with batched model calls
+        result = predictor.solve_goal(
+            income, equity, savings, target, years, rate, marital, kids,
+            solve_for, metric, goal
+        )
+
+        # Return solution
+        low, high, step = SOLVE_RANGES[solve_for]
+        response = dict(result, solveFor=solve_for, metric=metric, goal=goal,
+                        achievable=result['value'] is not None,
+                        range={'low': low, 'high': high, 'step': step})
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Per-region property price models (directory, residency and cold-load limits from the environment)
+region_models = RegionModelRegistry(
+    os.environ.get('REGION_MODELS_DIR', os.path.join(os.path.dirname(ARTIFACT_PATH), 'regions')),
+    max_resident=int(os.environ.get('REGION_MAX_RESIDENT', 64)),
+    load_timeout_ms=float(os.environ.get('REGION_LOAD_TIMEOUT_MS', 50))
+)
+
+def _region_model(region):
+    """Regional model for `region` (None: use the global model) plus a description for responses"""
+    if not region:
+        return None, None
+    model, status = region_models.get(region)
+    return model, {
+        'name': region,
+        'model': 'region' if model is not None else 'global',
+        'status': status,
+        'version': getattr(model, 'version', None)
+    }
+
 @app.route('/api/predict-property-price', methods=['POST'])
 def predict_property_price():
     """
@@ -386,19 +536,24 @@ def predict_property_price():
         "bathrooms": float,
         "location": str,  // 'rural', 'city', or 'premium'
         "condition": str, // 'renovation', 'good', or 'new'
-        "yearBuilt": int
+        "yearBuilt": int,
+        "region": str     // optional city; uses its regional model when one exists
     }
     """
     try:
         data = request.json
 
         # Extract parameters with defaults
-        sqm = float(data.get('sqm', 100))
-        rooms = float(data.get('rooms', 3))
-        bathrooms = float(data.get('bathrooms', 1))
-        location = data.get('location', 'city')
-        condition = data.get('condition', 'good')
-        year_built = int(data.get('yearBuilt', 2000))
+        try:
+            sqm = number_field(data, 'sqm', 100.0)
+            rooms = number_field(data, 'rooms', 3.0)
+            bathrooms = number_field(data, 'bathrooms', 1.0)
+            location = data.get('location', 'city')
+            condition = data.get('condition', 'good')
+            year_built = number_field(data, 'yearBuilt', 2000, int)
+            region = str(data.get('region') or '').strip()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Validate inputs
         if sqm <= 0:
@@ -406,9 +561,25 @@ def predict_property_price():
         if rooms < 0 or bathrooms < 0:
             return jsonify({'error': 'Rooms and bathrooms must be non-negative'}), 400
 
+        mark('parse')
+
+        # Regional model if one is resident or loads within the timeout, else the global one
+        model, region_info = _region_model(region)
+        mark('region')
+
+        # Nearly identical payloads share a cache entry (rounded key, results from the inputs
+        # as sent). Keyed by the serving model's version, not the region name: regions
+        # without a model share entries
+        steps = CACHE_CONFIG['property_price']['steps']
+        key = (predictor.generation, getattr(model, 'version', None), quantize(sqm, steps['sqm']),
+               quantize(rooms, steps['rooms']), quantize(bathrooms, steps['bathrooms']),
+               location, condition, year_built)
+
         # Get prediction
-        predicted_price = predictor.predict_property_price(
-            sqm, rooms, bathrooms, location, condition, year_built
+        predicted_price = prediction_caches['property_price'].get_or_compute(
+            key, lambda: predictor.predict_property_price(
+                sqm, rooms, bathrooms, location, condition, year_built, model=model
+            )
         )
 
         # Return prediction
@@ -422,6 +593,7 @@ def predict_property_price():
                 'condition': condition,
                 'yearBuilt': year_built
             },
+            'region': region_info,
             'model_info': 'Linear Regression with German real estate market data'
         }
 
@@ -430,21 +602,671 @@ def predict_property_price():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Listings proxy (upstream URL, page size and cache limits from the environment)
+listings_proxy = ListingsProxy(
+    os.environ.get('LISTINGS_UPSTREAM_URL', 'https://thinkimmo-api.mgraetz.de/thinkimmo'),
+    page_size=int(os.environ.get('LISTINGS_PAGE_SIZE', 200)),
+    cache_size=int(os.environ.get('LISTINGS_CACHE_SIZE', 256)),
+    cache_ttl=float(os.environ.get('LISTINGS_CACHE_TTL', 600))
+)
+
+@app.route('/api/listings', methods=['POST'])
+def listings():
+    """
+    Filtered, sorted listings for the Buy view, one scroll page at a time
+    Expected JSON payload:
+    {
+        "location": str,
+        "offset": int,       // rows the client already has (nextOffset of the previous page), default 0
+        "limit": int,        // rows to return, default one upstream page
+        "filters": {...},    // same keys as getActiveFilters() in buy.js
+        "desired": {"sqm": float, "rooms": float, "yearBuilt": int, "target": float}
+    }
+    """
+    try:
+        data = request.json
+
+        # Extract parameters
+        try:
+            location = str(data.get('location', '')).strip()
+            offset = number_field(data, 'offset', 0, int)
+            limit = number_field(data, 'limit', None, int) or listings_proxy.page_size
+            filters = data.get('filters') or {}
+            desired = data.get('desired') or {}
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Validate inputs
+        if not location:
+            return jsonify({'error': 'Location is required'}), 400
+        if offset < 0:
+            return jsonify({'error': 'offset must be non-negative'}), 400
+        if not 1 <= limit <= 1000:
+            return jsonify({'error': 'limit must be between 1 and 1000'}), 400
+        mark('parse')
+
+        result = listings_proxy.search(
+            location, offset=offset, limit=limit, filters=filters,
+            sort_key=filters.get('sortKey') or 'buyingPrice',
+            sort_order=filters.get('sortOrder') or 'asc',
+            desired={key: float(value) for key, value in desired.items() if value}
+        )
+        mark('search')
+        return jsonify(result), 200
+
+    except UpstreamError as e:
+        return jsonify({'error': str(e)}), 502
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/listings/valuation', methods=['POST'])
+def listings_valuation():
+    """
+    Fair-value scoring for a page of listings
+    Expected JSON payload:
+    {
+        "purchasingPower": float,   // user's current buying power
+        "region": str,              // optional city; uses its regional model when one exists
+        "listings": [
+            {
+                "id": any,              // optional, echoed back
+                "sqm": float,
+                "rooms": float,
+                "bathrooms": float,
+                "location": str,        // 'rural', 'city', or 'premium'
+                "condition": str,       // 'renovation', 'good', or 'new'
+                "yearBuilt": int,
+                "askingPrice": float    // optional
+            }, ...
+        ]
+    }
+    """
+    try:
+        data = request.json
+        listings = data.get('listings')
+        region = str(data.get('region') or '').strip()
+
+        if not isinstance(listings, list) or not listings:
+            return jsonify({'error': 'listings must be a non-empty list'}), 400
+
+        # Extract parameters column by column with the same defaults as /api/predict-property-price
+        try:
+            purchasing_power = number_field(data, 'purchasingPower', 0.0)
+            sqm = np.array(_row_values(listings, 'sqm', 100, float, 'listing'))
+            rooms = np.array(_row_values(listings, 'rooms', 3, float, 'listing'))
+            bathrooms = np.array(_row_values(listings, 'bathrooms', 1, float, 'listing'))
+            years_built = _row_values(listings, 'yearBuilt', 2000, int, 'listing')
+            asking = np.array(_row_values(listings, 'askingPrice', np.nan, float, 'listing'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        locations = [l.get('location', 'city') for l in listings]
+        conditions = [l.get('condition', 'good') for l in listings]
+
+        # Validate inputs
+        invalid = np.flatnonzero(sqm <= 0).tolist()
+        if invalid:
+            return jsonify({'error': f'Square meters must be greater than 0 (listing {invalid[0]})'}), 400
+        invalid = np.flatnonzero((rooms < 0) | (bathrooms < 0)).tolist()
+        if invalid:
+            return jsonify({'error': f'Rooms and bathrooms must be non-negative (listing {invalid[0]})'}), 400
+        mark('parse')
+
+        # Score every listing in one pass
+        model, region_info = _region_model(region)
+        mark('region')
+        predicted = predictor.predict_property_price_batch(
+            sqm, rooms, bathrooms, locations, conditions, years_built, model=model
+        )
+        ratio = asking / predicted
+        affordable = asking <= purchasing_power
+
+        has_asking = ~np.isnan(asking)
+        valuations = [
+            {
+                'id': l.get('id'),
+                'predictedPrice': p,
+                'valuationRatio': round(r, 4) if known else None,
+                'affordable': a if known else None
+            }
+            for l, p, r, a, known in zip(listings, predicted.tolist(), ratio.tolist(),
+                                         affordable.tolist(), has_asking.tolist())
+        ]
+
+        # Return valuations in input order
+        response = {
+            'valuations': valuations,
+            'count': len(valuations),
+            'purchasingPower': purchasing_power,
+            'region': region_info,
+            'model_info': 'Linear Regression with German real estate market data'
+        }
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Advice chat proxy: the Gemini key stays on the server (GEMINI_API_KEY);
+# ADVICE_LLM=stub answers offline with canned text (tests, local development)
+ADVICE_CONFIG = {
+    'llm': os.environ.get('ADVICE_LLM', 'gemini'),
+    'model': os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash-preview-09-2025'),
+    'timeout': float(os.environ.get('GEMINI_TIMEOUT', 30)),
+    'cache_size': int(os.environ.get('ADVICE_CACHE_SIZE', 2048)),
+    'cache_ttl': float(os.environ.get('ADVICE_CACHE_TTL', 3600))
+}
+
+def _advice_llm():
+    if ADVICE_CONFIG['llm'] == 'stub':
+        return StubLLM()
+    api_key = os.environ.get('GEMINI_API_KEY')
+    if not api_key:
+        print("[..] GEMINI_API_KEY not set: /api/advice is unavailable")
+        return None
+    return GeminiClient(api_key, model=ADVICE_CONFIG['model'], timeout=ADVICE_CONFIG['timeout'])
+
+advice_service = AdviceService(_advice_llm(), cache_size=ADVICE_CONFIG['cache_size'],
+                               cache_ttl=ADVICE_CONFIG['cache_ttl'])
+registry.register(advice_service.upstream_latency)
+
+@app.route('/api/advice', methods=['POST'])
+def advice():
+    """
+    Advisor chat answer for the Plan view
+    Expected JSON payload:
+    {
+        "kind": str,          // 'steps' (initial advice) or 'question'
+        "question": str,      // required for kind 'question'
+        "income": float, "equity": float, "savings": float, "target": float,
+        "years": int, "rate": float, "marital": str, "kids": int,
+        "riskName": str, "currPower": float
+    }
+    """
+    try:
+        data = request.json
+
+        # Extract parameters
+        kind = data.get('kind', 'steps')
+        question = data.get('question', '')
+
+        # Validate inputs
+        if advice_service.llm is None:
+            return jsonify({'error': 'Advice is not configured on this server'}), 503
+        mark('parse')
+
+        try:
+            result = advice_service.advise(kind, data, question)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        mark('advice')
+        return jsonify(result), 200
+
+    except LLMError as e:
+        return jsonify({'error': str(e)}), 502
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# What-if sessions: live slider updates streamed as Server-Sent Events
+SESSION_CONFIG = {
+    'max_sessions': int(os.environ.get('SESSION_MAX', 1000)),
+    'idle_ttl': float(os.environ.get('SESSION_IDLE_TTL', 900)),
+    'heartbeat': float(os.environ.get('SESSION_HEARTBEAT', 15)),
+    'max_stream_seconds': float(os.environ.get('SESSION_STREAM_SECONDS', 300)),
+    'max_streams': int(os.environ['SESSION_MAX_STREAMS']) if os.environ.get('SESSION_MAX_STREAMS') else None
+}
+# gunicorn.conf.py narrows this to the worker setup (see SessionStore.limit_to_server)
+whatif_sessions = SessionStore(predictor, **SESSION_CONFIG)
+SESSIONS_UNAVAILABLE = 'What-if sessions need a single worker process (WEB_WORKERS=1)'
+
+@app.route('/api/session', methods=['POST'])
+def create_session():
+    """
+    Open a what-if session; results arrive on GET /api/session/<id>/stream
+    Expected JSON payload: same fields as /api/predict plus optional "maxYears"
+    (projection length, default 30)
+
+    503 when sessions are off (several worker processes); clients then use
+    /api/predict and /api/projection instead.
+    """
+    try:
+        if not whatif_sessions.enabled:
+            return jsonify({'error': SESSIONS_UNAVAILABLE}), 503
+        data = request.json
+
+        # Extract and validate parameters
+        try:
+            profile = parse_fields(data, partial=False)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        mark('parse')
+
+        session = whatif_sessions.create(profile)
+        version, profile = session.snapshot()
+        return jsonify({
+            'session': session.id,
+            'version': version,
+            'profile': profile,
+            'stream_url': f'/api/session/{session.id}/stream'
+        }), 201
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/session/<session_id>', methods=['PATCH'])
+def update_session(session_id):
+    """
+    Change some profile fields of a what-if session
+    Expected JSON payload: only the changed fields, plus an optional
+    increasing "seq" so late-arriving older updates are dropped
+
+    Responds with the session's current version and profile.
+    """
+    try:
+        data = request.json
+
+        session = whatif_sessions.get(session_id)
+        if session is None:
+            return jsonify({'error': f'Unknown session {session_id}'}), 404
+
+        # Extract and validate parameters
+        try:
+            fields = parse_fields(data)
+            seq = number_field(data, 'seq', None, int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        mark('parse')
+
+        applied, _ = whatif_sessions.update(session, fields, seq)
+        # The session's profile as of `version`: clients show that, not what they sent
+        version, profile = session.snapshot()
+        return jsonify({'applied': applied, 'version': version, 'profile': profile}), 200
+
+    except SessionClosed:
+        return jsonify({'error': f'Unknown session {session_id}'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/session/<session_id>/stream', methods=['GET'])
+def session_stream(session_id):
+    """
+    Server-Sent Events with the session's readiness, likelihood and projection updates
+
+    503 (with Retry-After) while the maximum number of streams is open, so
+    streams never take the last thread other requests are served on.
+    """
+    session = whatif_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': f'Unknown session {session_id}'}), 404
+    if not whatif_sessions.open_stream():
+        return jsonify({'error': 'Too many open what-if streams'}), 503, {'Retry-After': '5'}
+    response = Response(whatif_sessions.stream(session), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(whatif_sessions.close_stream)
+    return response
+
+@app.route('/api/session/<session_id>', methods=['DELETE'])
+def close_session(session_id):
+    """Close a what-if session and end its stream"""
+    if not whatif_sessions.close(session_id):
+        return jsonify({'error': f'Unknown session {session_id}'}), 404
+    return jsonify({'closed': session_id}), 200
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({
-        'status': 'healthy',
-        'models_loaded': True,
+        'status': 'healthy' if predictor.ready.is_set() else 'warming',
+        'models_loaded': predictor.ready.is_set(),
+        'model_state': predictor.state,
+        'model_source': predictor.model_source,
+        'artifact_version': predictor.artifact_version,
+        'caches': {name: cache.stats() for name, cache in prediction_caches.items()},
+        'coalescer': predict_coalescer.stats() if predict_coalescer is not None else None,
+        'listings': listings_proxy.stats(),
+        'advice': advice_service.stats(),
+        'sessions': whatif_sessions.stats(),
+        'regions': region_models.stats(),
         'message': 'ML prediction server is running'
     }), 200
 
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness: the process is up and serving (models may still be loading)"""
+    return jsonify({
+        'status': 'alive',
+        'uptime_s': time.monotonic() - STARTED_AT,
+        'model_state': predictor.state
+    }), 200
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness: 200 once the trained models serve every endpoint, 503 while warming up or failed"""
+    body = {
+        'status': predictor.state,
+        'uptime_s': time.monotonic() - STARTED_AT,
+        'model_source': predictor.model_source,
+        'artifact_version': predictor.artifact_version
+    }
+    if not predictor.ready.is_set():
+        body['error'] = predictor.warm_up_error
+        return jsonify(body), 503, {'Retry-After': '1'}
+    return jsonify(body), 200
+
+@app.before_request
+def _start_request_timer():
+    # Label by URL rule (not path) so /api/retrain/<job_id> stays one series
+    start_request(request.url_rule.rule if request.url_rule is not None else 'unmatched')
+
+@app.before_request
+def _pick_up_shared_models():
+    _sync_models_from_artifact()
+
+@app.before_request
+def _require_models():
+    # Routes without a formula fallback wait for the warm-up (lazy start)
+    if request.url_rule is not None and request.url_rule.rule in MODEL_ONLY_ROUTES \
+            and not predictor.ready.is_set():
+        return jsonify({'error': f'Models are {predictor.state}; retry shortly'}), 503, {'Retry-After': '1'}
+
+@app.after_request
+def _record_request_metrics(response):
+    finish_request(response.status_code)
+    return response
+
+def _collect_service_metrics():
+    """Cache, coalescer, listings, advice, session and model state as exposition lines"""
+    cache_stats = {name: cache.stats() for name, cache in prediction_caches.items()}
+    cache_stats['listings'] = listings_proxy.cache.stats()
+    cache_stats['advice'] = advice_service.cache.stats()
+    lines = []
+    for field, metric_type in (('hits', 'counter'), ('misses', 'counter'),
+                               ('evictions', 'counter'), ('size', 'gauge')):
+        suffix = '_total' if metric_type == 'counter' else ''
+        lines += exposition(f'rge_cache_{field}{suffix}', f'Result cache {field}', metric_type,
+                            [({'cache': name}, stats[field]) for name, stats in cache_stats.items()])
+    lines += exposition('rge_listings_upstream_requests_total', 'Calls made to the listings API',
+                        'counter', [({}, listings_proxy.upstream_requests)])
+    lines += exposition('rge_advice_coalesced_total', 'Advice requests served by another request\'s LLM call',
+                        'counter', [({}, advice_service.coalesced)])
+    if predict_coalescer is not None:
+        stats = predict_coalescer.stats()
+        lines += exposition('rge_coalescer_batches_total', 'Micro-batches scored', 'counter',
+                            [({}, stats['batches'])])
+        lines += exposition('rge_coalescer_items_total', 'Requests scored through the coalescer',
+                            'counter', [({}, stats['items'])])
+    session_stats = whatif_sessions.stats()
+    lines += exposition('rge_sessions_active', 'Open what-if sessions', 'gauge', [({}, session_stats['active'])])
+    lines += exposition('rge_session_events_total', 'What-if updates streamed', 'counter',
+                        [({}, session_stats['events'])])
+    lines += exposition('rge_session_superseded_total', 'What-if updates not sent because newer input arrived',
+                        'counter', [({}, session_stats['superseded'])])
+    region_stats = region_models.stats()
+    for field in ('hits', 'loads', 'load_failures', 'evictions', 'fallbacks'):
+        lines += exposition(f'rge_region_model_{field}_total', f'Region model registry {field}', 'counter',
+                            [({}, region_stats[field])])
+    lines += exposition('rge_region_models_resident', 'Region models held in memory', 'gauge',
+                        [({}, region_stats['resident'])])
+    lines += exposition('rge_models_ready', 'Whether trained models are loaded (0: formula fallbacks)',
+                        'gauge', [({}, int(predictor.ready.is_set()))])
+    models = predictor.models
+    if models is not None:
+        lines += exposition('rge_model_info', 'Published model set', 'gauge', [({
+            'source': models.source,
+            'artifact_version': models.artifact_version or '',
+            'generation': models.generation
+        }, 1)])
+    return lines
+
+registry.add_collector(_collect_service_metrics)
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Request, stage and branch metrics in Prometheus text format"""
+    return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+# Retraining runs on a background worker and publishes its models with one swap
+retrain_jobs = BackgroundJobs()
+
+# Serializes model publication (retrain, outcome updates, rollback) so no update is lost
+model_update_lock = threading.Lock()
+
+def _publish_models(models):
+    """
+    Persist `models`, swap them in and drop results cached from the previous
+    set; returns the published set (a copy carrying the new artifact version)
+    """
+    if predictor.artifact_path:
+        manifest = predictor.save_artifact(predictor.artifact_path, models)
+        models = models.with_artifact_version(manifest['version'])
+
+    # Single reference assignment: requests see either the old or the new set, never a mix
+    predictor.publish(models)
+
+    # Cached results came from the previous models
+    for cache in prediction_caches.values():
+        cache.clear()
+    return models
+
+# Under gunicorn every worker holds its own models, and retrain, outcome and
+# rollback requests publish only in the worker that received them. They also
+# save the shared artifact, so the other workers pick the set up from there,
+# checking at most every ARTIFACT_SYNC_SECONDS (0 disables). Outcome updates
+# that reach two workers at the same moment are not merged: the later save wins.
+ARTIFACT_SYNC_SECONDS = float(os.environ.get('ARTIFACT_SYNC_SECONDS', 5))
+_artifact_sync = {'checked_at': time.monotonic(), 'mtime': None}
+
+def _sync_models_from_artifact():
+    """Load the shared artifact if another worker saved a different version since the last check"""
+    now = time.monotonic()
+    if not (ARTIFACT_SYNC_SECONDS and predictor.artifact_path and predictor.ready.is_set()) \
+            or now - _artifact_sync['checked_at'] < ARTIFACT_SYNC_SECONDS:
+        return
+    _artifact_sync['checked_at'] = now
+    try:
+        mtime = os.stat(manifest_path(predictor.artifact_path)).st_mtime_ns
+    except OSError:
+        return
+    if mtime == _artifact_sync['mtime']:
+        return
+    _artifact_sync['mtime'] = mtime
+
+    with model_update_lock:
+        try:
+            with open(manifest_path(predictor.artifact_path)) as f:
+                version = json.load(f).get('version')
+        except (OSError, ValueError):
+            return
+        if version != predictor.artifact_version and predictor.load_artifact(predictor.artifact_path):
+            for cache in prediction_caches.values():
+                cache.clear()
+
+def _retrain_task(progress):
+    """Build a complete new model set off to the side, persist it, then swap it in"""
+    models = predictor.build_configured_models(progress=progress)
+    with model_update_lock:
+        models = _publish_models(models)
+
+    return {
+        'artifact_version': models.artifact_version,
+        'generation': models.generation,
+        'scores': models.scores
+    }
+
 @app.route('/api/retrain', methods=['POST'])
 def retrain():
-    """Retrain models with new data (optional endpoint)"""
+    """Start retraining in the background (optional endpoint); poll the returned job"""
     try:
-        predictor.train_models()
-        return jsonify({'message': 'Models retrained successfully'}), 200
+        job = retrain_jobs.submit('retrain', _retrain_task)
+        return jsonify({
+            'message': 'Retraining started',
+            'job': job,
+            'status_url': f"/api/retrain/{job['id']}"
+        }), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/retrain/<job_id>', methods=['GET'])
+def retrain_status(job_id):
+    """Status and progress of a retrain job"""
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return jsonify(job), 200
+
+def _percent(outcome, name, i):
+    value = _row_field(outcome, name, None, float, f'outcome {i}')
+    if value is None or not 0 <= value <= 100:
+        raise ValueError(f'{name} must be between 0 and 100 (outcome {i})')
+    return value
+
+def _outcome_chunks(outcomes):
+    """
+    Column chunk per model (name -> columns, see streaming.MODEL_COLUMNS) from observed outcomes
+
+    A record updates every model whose label it carries: 'readiness',
+    'likelihood' (or 'achieved': true/false) and 'price' (sale price).
+    Inputs use the same names and defaults as the predict endpoints.
+    Raises ValueError for invalid records.
+    """
+    rows = {name: [] for name in MODEL_COLUMNS}
+    for i, outcome in enumerate(outcomes):
+        if not isinstance(outcome, dict):
+            raise ValueError(f'outcome {i} must be an object')
+
+        def field(name, default, cast=float):
+            return _row_field(outcome, name, default, cast, f'outcome {i}')
+
+        if any(key in outcome for key in ('readiness', 'likelihood', 'achieved')):
+            target = field('target', 1.0)
+            if target <= 0:
+                raise ValueError(f'Target must be greater than 0 (outcome {i})')
+            profile = {
+                'income': field('income', 0.0),
+                'equity': field('equity', 0.0),
+                'savings': field('savings', 0.0),
+                'target': target,
+                'marital': 1.0 if outcome.get('marital', 'single') == 'married' else 0.0,
+                'kids': float(field('kids', 0, int))
+            }
+            if 'readiness' in outcome:
+                rows['readiness'].append(dict(profile, readiness=_percent(outcome, 'readiness', i)))
+            if 'likelihood' in outcome or 'achieved' in outcome:
+                # A reached/missed goal is a 100/0 observation of the likelihood percentage
+                likelihood = (_percent(outcome, 'likelihood', i) if 'likelihood' in outcome
+                              else 100.0 if outcome['achieved'] else 0.0)
+                rows['likelihood'].append(dict(profile, years=float(field('years', 1, int)), rate=field('rate', 5.0),
+                                               likelihood=likelihood))
+
+        if 'price' in outcome:
+            price = field('price', 0.0)
+            if price <= 0:
+                raise ValueError(f'price must be greater than 0 (outcome {i})')
+            rows['property_price'].append({
+                'sqm': field('sqm', 100.0),
+                'rooms': field('rooms', 3.0),
+                'bathrooms': field('bathrooms', 1.0),
+                'location_premium': float(LOCATION_MAP.get(outcome.get('location', 'city'), 1)),
+                'condition': float(CONDITION_MAP.get(outcome.get('condition', 'good'), 1)),
+                'year_age': float(max(0, CURRENT_YEAR - field('yearBuilt', 2000, int))),
+                'price': price
+            })
+
+    return {name: {column: np.array([row[column] for row in model_rows]) for column in MODEL_COLUMNS[name]}
+            for name, model_rows in rows.items() if model_rows}
+
+@app.route('/api/outcomes', methods=['POST'])
+def ingest_outcomes():
+    """
+    Update the models incrementally from observed outcomes
+    Expected JSON payload:
+    {
+        "outcomes": [ {profile and/or property fields plus readiness, likelihood,
+                       achieved or price}, ... ],
+        "weight": float  (optional, training rows one outcome counts as, default 1)
+    }
+
+    Under gunicorn the update is published in this worker only; the others
+    load it from the shared artifact (see _sync_models_from_artifact).
+    """
+    try:
+        data = request.json
+
+        # Extract parameters
+        outcomes = data.get('outcomes')
+        try:
+            weight = number_field(data, 'weight', 1.0)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Validate inputs
+        if not isinstance(outcomes, list) or not outcomes:
+            return jsonify({'error': 'outcomes must be a non-empty list'}), 400
+        if weight <= 0:
+            return jsonify({'error': 'weight must be greater than 0'}), 400
+        try:
+            chunks = _outcome_chunks(outcomes)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        if not chunks:
+            return jsonify({'error': 'no outcome carries readiness, likelihood, achieved or price'}), 400
+        mark('parse')
+
+        with model_update_lock:
+            models = predictor.update_models(chunks.values(), weight=weight)
+            models = _publish_models(models)
+        mark('update')
+
+        return jsonify({
+            'accepted': {name: len(columns[MODEL_COLUMNS[name][-1]]) for name, columns in chunks.items()},
+            'generation': models.generation,
+            'parent': models.parent,
+            'artifact_version': models.artifact_version,
+            'observed': models.observed,
+            'scores': models.scores
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/models/versions', methods=['GET'])
+def model_versions():
+    """Model sets kept for rollback, most recently published last"""
+    return jsonify({
+        'current': predictor.generation,
+        'versions': predictor.versions()
+    }), 200
+
+@app.route('/api/models/rollback', methods=['POST'])
+def rollback_models():
+    """
+    Re-publish an earlier model set
+    Expected JSON payload:
+    {
+        "generation": int  (optional, defaults to the set published before the current one)
+    }
+    """
+    try:
+        data = request.json or {}
+        generation = data.get('generation')
+        if generation is None:
+            earlier = [v['generation'] for v in predictor.versions() if not v['current']]
+            if not earlier:
+                return jsonify({'error': 'No earlier model set to roll back to'}), 409
+            generation = earlier[-1]
+
+        with model_update_lock:
+            models = predictor.history.get(int(generation))
+            if models is None:
+                return jsonify({'error': f'Unknown model generation {generation}'}), 404
+            models = _publish_models(models)
+
+        return jsonify({
+            'generation': models.generation,
+            'artifact_version': models.artifact_version,
+            'observed': models.observed,
+            'scores': models.scores
+        }), 200
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -453,7 +1275,12 @@ if __name__ == '__main__':
     print(">>> Real Good Estate - ML Prediction Server <<<")
     print("="*60)
     print("Using NumPy and Scikit-learn for AI/ML predictions")
+    if LAZY_MODELS:
+        print("Lazy start: formula predictions until the models are ready (GET /api/health/ready)")
+    if predictor.training_file:
+        print(f"Models trained from {predictor.training_file} (TRAINING_FILE)")
     print("Server running on http://localhost:5000")
+    print("Development server - for production run: gunicorn -c gunicorn.conf.py wsgi:app")
     print("="*60 + "\n")
     app.run(debug=True, host='0.0.0.0', port=5000)
 
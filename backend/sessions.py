@@ -0,0 +1,359 @@
+"""
+Live what-if sessions for the Dream/Plan sliders
+
+Instead of POSTing the complete profile on every slider move, a client
+opens a session once and then sends only the fields that changed. The
+server keeps the profile, the derived features (adjusted income, current
+buying power) and the last results, and streams updated results back as
+Server-Sent Events:
+
+- Only outputs that depend on a changed field are recomputed: readiness
+  ignores years and rate, the projection ignores years, and the likelihood
+  for a horizon inside the projection is read from the projection (moving
+  the years slider computes nothing).
+- Updates carrying a client sequence number older than the last one
+  applied are dropped (requests can overtake each other).
+- Results are computed for the newest profile only; when newer input
+  arrives while an update is computed, that update is not sent and its
+  outputs go out with the next event instead.
+
+Sessions live in the memory of one server process, so the session and its
+stream must reach the same process, and every open stream occupies one
+server thread. Under a pre-forking server SessionStore.limit_to_server
+turns sessions off unless there is a single worker process, and caps the
+open streams so at least one thread is left for other requests; refused
+requests get a 503 and clients fall back to the stateless endpoints.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from validation import parse_number
+
+# Profile fields: (type, default) with the /api/predict and /api/projection defaults
+FIELDS = {
+    'income': (float, 0.0),
+    'equity': (float, 0.0),
+    'savings': (float, 0.0),
+    'target': (float, 1.0),
+    'years': (int, 1),
+    'rate': (float, 5.0),
+    'marital': (str, 'single'),
+    'kids': (int, 0),
+    'maxYears': (int, 30)
+}
+# Inputs of each output; an update recomputes only the outputs whose inputs changed
+READINESS_FIELDS = frozenset(('income', 'equity', 'savings', 'target', 'marital', 'kids'))
+PROJECTION_FIELDS = READINESS_FIELDS | {'rate', 'maxYears'}
+LIKELIHOOD_FIELDS = PROJECTION_FIELDS | {'years'}
+
+
+class SessionClosed(Exception):
+    """Raised to a stream whose session was closed, expired or taken over by another stream"""
+
+
+def parse_fields(data, partial=True):
+    """
+    Typed, validated profile fields from a request payload
+
+    Parameters:
+    - data: dict with any of FIELDS (unknown keys other than 'seq' are rejected)
+    - partial: False fills missing fields with their defaults (new session)
+
+    Raises ValueError for unknown fields, unparsable or non-finite values, a non-positive
+    target, or years/maxYears outside 1..50.
+    """
+    unknown = set(data) - set(FIELDS) - {'seq'}
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(sorted(unknown))}')
+    fields = {}
+    for name, (kind, default) in FIELDS.items():
+        if name in data:
+            if kind is str:
+                fields[name] = str(data[name])
+            else:
+                fields[name] = parse_number(data[name], name, kind)
+        elif not partial:
+            fields[name] = default
+    if fields.get('target', 1) <= 0:
+        raise ValueError('Target must be greater than 0')
+    if not 1 <= fields.get('maxYears', 30) <= 50:
+        raise ValueError('maxYears must be between 1 and 50')
+    if not 1 <= fields.get('years', 1) <= 50:
+        raise ValueError('years must be between 1 and 50')
+    return fields
+
+
+def format_event(event, data, event_id=None):
+    """One Server-Sent Events message"""
+    head = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{head}event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+class WhatIfSession:
+    """
+    Server-side profile of one what-if session
+
+    `version` increases with every update that changes a field; `changed`
+    collects the fields changed since the stream last evaluated.
+    """
+
+    def __init__(self, session_id, profile):
+        self.id = session_id
+        self.profile = profile
+        self.version = 1
+        self.seq = None
+        self.changed = set(FIELDS)
+        self.closed = False
+        self.touched = time.monotonic()
+        self.outputs = {}  # last results (readiness, derived features, projection); stream thread only
+        self._stream = 0
+        self._cond = threading.Condition()
+
+    def update(self, fields, seq=None):
+        """
+        Apply changed fields; returns (applied, version)
+
+        An update whose seq is not newer than the last applied one is
+        dropped (applied is False).
+        """
+        with self._cond:
+            if self.closed:
+                raise SessionClosed(self.id)
+            self.touched = time.monotonic()
+            if seq is not None:
+                if self.seq is not None and seq <= self.seq:
+                    return False, self.version
+                self.seq = seq
+            changed = {name for name, value in fields.items() if self.profile[name] != value}
+            if changed:
+                self.profile.update(fields)
+                self.changed |= changed
+                self.version += 1
+                self._cond.notify_all()
+            return True, self.version
+
+    def snapshot(self):
+        """(version, profile copy) as one consistent pair"""
+        with self._cond:
+            return self.version, dict(self.profile)
+
+    def attach(self):
+        """Token of a new stream; an earlier stream of this session ends"""
+        with self._cond:
+            self._stream += 1
+            self.changed = set(FIELDS)  # a (re)connecting client gets the full state
+            self.outputs = {}
+            self._cond.notify_all()
+            return self._stream
+
+    def wait(self, token, after_version, timeout):
+        """Current version once it is newer than after_version, or after timeout"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.closed or self._stream != token or self.version > after_version,
+                                timeout)
+            if self.closed or self._stream != token:
+                raise SessionClosed(self.id)
+            self.touched = time.monotonic()
+            return self.version
+
+    def take_changes(self):
+        """(version, profile copy, changed fields) for an evaluation; resets the changed fields"""
+        with self._cond:
+            changed, self.changed = self.changed, set()
+            return self.version, dict(self.profile), changed
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class SessionStore:
+    """
+    Bounded set of what-if sessions and their event streams
+
+    Parameters:
+    - predictor: MLPredictor used for the results
+    - max_sessions: Open sessions kept; the least recently used one is closed beyond that
+    - idle_ttl: Seconds without an update or stream activity before a session expires
+    - heartbeat: Seconds between keep-alive comments on an idle stream
+    - max_stream_seconds: Lifetime of one stream (EventSource reconnects with the same session)
+    - max_streams: Streams open at once (None: no limit)
+    """
+
+    def __init__(self, predictor, max_sessions=1000, idle_ttl=900.0, heartbeat=15.0,
+                 max_stream_seconds=300.0, max_streams=None):
+        self.predictor = predictor
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.heartbeat = heartbeat
+        self.max_stream_seconds = max_stream_seconds
+        self.max_streams = max_streams
+        self.enabled = True
+        self.streams = 0
+        self.refused_streams = 0
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.updates = 0
+        self.out_of_order = 0
+        self.events = 0
+        self.superseded = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def limit_to_server(self, workers, threads):
+        """
+        Fit sessions to a server running `workers` processes of `threads`
+        threads each: off unless workers is 1 (another process would not know
+        the session), and at most threads - 1 streams (lowering max_streams)
+        """
+        with self._lock:
+            self.enabled = workers == 1
+            limit = max(0, threads - 1)
+            self.max_streams = limit if self.max_streams is None else min(self.max_streams, limit)
+            return self.enabled
+
+    def open_stream(self):
+        """Reserve a stream slot; False if max_streams are open. Release with close_stream"""
+        with self._lock:
+            if self.max_streams is not None and self.streams >= self.max_streams:
+                self.refused_streams += 1
+                return False
+            self.streams += 1
+            return True
+
+    def close_stream(self):
+        with self._lock:
+            self.streams -= 1
+
+    def _expire(self, now):
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.touched < self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            session.close()
+            self.expired += 1
+
+    def create(self, profile):
+        """Open a session for a full profile (see parse_fields)"""
+        session = WhatIfSession(uuid.uuid4().hex, profile)
+        with self._lock:
+            self._expire(time.monotonic())
+            while len(self._sessions) >= self.max_sessions:
+                _, oldest = self._sessions.popitem(last=False)
+                oldest.close()
+                self.evicted += 1
+            self._sessions[session.id] = session
+            self.created += 1
+        return session
+
+    def get(self, session_id):
+        """Open session by id, or None"""
+        with self._lock:
+            self._expire(time.monotonic())
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def update(self, session, fields, seq=None):
+        applied, version = session.update(fields, seq)
+        with self._lock:
+            self.updates += 1
+            self.out_of_order += not applied
+        return applied, version
+
+    def close(self, session_id):
+        """Close a session (ending its stream); False if it is unknown"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+    def evaluate(self, session):
+        """Results for the session's newest profile, recomputing only what its changes affect"""
+        version, profile, changed = session.take_changes()
+        outputs = session.outputs
+        generation = self.predictor.generation
+        if outputs.get('generation') != generation:
+            changed = set(FIELDS)
+            outputs['generation'] = generation
+        income, equity, savings, target = (profile[name] for name in ('income', 'equity', 'savings', 'target'))
+        rate, marital, kids, years = profile['rate'], profile['marital'], profile['kids'], profile['years']
+
+        result = {}
+        if changed & READINESS_FIELDS:
+            readiness, curr_power = self.predictor.predict_readiness(income, equity, savings, target,
+                                                                     marital, kids)
+            cost_deduction = (400 if marital == 'married' else 0) + kids * 300
+            outputs['adjustedIncome'] = max(1000, income - cost_deduction)
+            result.update(readiness=readiness, currPower=curr_power, adjustedIncome=outputs['adjustedIncome'])
+        if changed & PROJECTION_FIELDS:
+            series = self.predictor.predict_projection(income, equity, savings, target, rate, marital, kids,
+                                                       profile['maxYears'])
+            outputs['projection'] = series
+            result['projection'] = {key: values.tolist() for key, values in series.items()}
+        if changed & LIKELIHOOD_FIELDS:
+            series = outputs['projection']
+            if 1 <= years <= len(series['years']):
+                likelihood, future_equity = int(series['likelihood'][years - 1]), int(series['equity'][years - 1])
+            else:
+                likelihood, future_equity = self.predictor.predict_likelihood(income, equity, savings, target,
+                                                                              years, rate, marital, kids)
+            result.update(likelihood=likelihood, futureEquity=future_equity)
+        return version, result
+
+    def stream(self, session):
+        """
+        Server-Sent Events for a session: an 'update' event (id = version)
+        with the outputs that changed, keep-alive comments while idle, and a
+        'closed' event when the session ends
+        """
+        token = session.attach()
+        deadline = time.monotonic() + self.max_stream_seconds
+        sent, pending = 0, {}
+        try:
+            while time.monotonic() < deadline:
+                version = session.wait(token, sent, min(self.heartbeat, deadline - time.monotonic()))
+                if version == sent:
+                    yield ': keep-alive\n\n'
+                    continue
+                version, result = self.evaluate(session)
+                pending.update(result)
+                if session.version != version:
+                    # Newer input arrived meanwhile: send these outputs with its update
+                    with self._lock:
+                        self.superseded += 1
+                    continue
+                yield format_event('update', dict(pending, version=version), event_id=version)
+                with self._lock:
+                    self.events += 1
+                sent, pending = version, {}
+        except SessionClosed:
+            yield format_event('closed', {'session': session.id})
+
+    def stats(self):
+        """Session and stream counters as a JSON-serialisable dict"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'active': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'streams': self.streams,
+                'max_streams': self.max_streams,
+                'refused_streams': self.refused_streams,
+                'created': self.created,
+                'expired': self.expired,
+                'evicted': self.evicted,
+                'updates': self.updates,
+                'out_of_order': self.out_of_order,
+                'events': self.events,
+                'superseded': self.superseded
+            }
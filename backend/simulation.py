@@ -0,0 +1,186 @@
+"""
+Monte Carlo simulation of monthly savings plans under return uncertainty
+
+growth.future_value assumes the same return every month. Here every path
+draws its own monthly log-returns around the chosen rate, and equity
+    E_m = E_{m-1} * (1 + r_m) + savings
+is evaluated for all paths at once through
+    E_m = G_m * (E_0 + savings * sum_{k<=m} 1 / G_k),  G_m = prod_{k<=m} (1 + r_k)
+advancing one month per step over a (paths,) vector. Draws are antithetic
+(each normal is used as +z and -z) and kept in float32, which halves the
+RNG work. Random numbers come from one stream per BLOCK_PATHS paths, so a
+seed gives the same paths however the blocks are grouped into chunks.
+Under a latency budget the first chunk is a single block; later chunks are
+sized from its measured cost, and the budget is checked after every month
+step (a chunk that runs past it is dropped), so one call overruns the
+budget by at most one step, or by one block when even that does not fit.
+How many paths finish then depends on timing; seeded runs are first cut
+to the paths the budget affords at a fixed throughput (path-months per
+millisecond), so the same request keeps giving the same paths, and the
+clock only cuts them further on a machine slower than that figure.
+"""
+import time
+
+import numpy as np
+
+from growth import monthly_rate
+
+# Annual volatility (percent) per risk profile; thresholds as in predict_likelihood
+CONSERVATIVE_VOLATILITY = 4.0    # rate < 3.5
+BALANCED_VOLATILITY = 10.0
+AGGRESSIVE_VOLATILITY = 16.0     # rate > 6.5
+
+PERCENTILES = (5, 25, 50, 75, 95)
+# Paths per random stream, and the smallest unit the latency budget can cut
+BLOCK_PATHS = 1000
+
+
+def default_volatility(annual_rate_percent):
+    """Annual return volatility in percent implied by the chosen rate"""
+    if annual_rate_percent < 3.5:
+        return CONSERVATIVE_VOLATILITY
+    if annual_rate_percent > 6.5:
+        return AGGRESSIVE_VOLATILITY
+    return BALANCED_VOLATILITY
+
+
+def affordable_paths(n_paths, months, budget_ms, path_months_per_ms):
+    """
+    Most whole blocks of paths (at least one, at most n_paths) that fit
+    budget_ms at path_months_per_ms; depends on the arguments only
+    """
+    blocks = int(budget_ms * path_months_per_ms // (months * BLOCK_PATHS))
+    return min(n_paths, max(1, blocks) * BLOCK_PATHS)
+
+
+def _simulate_chunk(blocks, principal, contribution, mu, sigma, months, checkpoints, deadline=None):
+    """
+    Equity at each checkpoint month for a chunk of blocks [(rng, n_paths), ...],
+    shape (len(checkpoints), total paths); None if perf_counter() passes
+    `deadline` before the last month
+    """
+    halves = [(n_paths + 1) // 2 for _, n_paths in blocks]
+    z = np.hstack([rng.standard_normal((months, half), dtype=np.float32)
+                   for (rng, _), half in zip(blocks, halves)])
+    half = z.shape[1]
+    # Output column -> position in [+z, -z]: per block its +z draws, then its -z draws
+    offsets = np.cumsum([0] + halves[:-1])
+    columns = np.concatenate([np.r_[offset:offset + h, half + offset:half + offset + h][:n_paths]
+                              for offset, h, (_, n_paths) in zip(offsets, halves, blocks)])
+    mu, sigma = np.float32(mu), np.float32(sigma)
+
+    log_growth = np.zeros(2 * half, dtype=np.float32)   # log G_m
+    inverse_sum = np.zeros(2 * half, dtype=np.float32)  # sum_{k<=m} 1 / G_k
+    step = np.empty(2 * half, dtype=np.float32)
+    scratch = np.empty(2 * half, dtype=np.float32)
+
+    equity = np.empty((len(checkpoints), len(columns)))
+    row = 0
+    for month in range(months):
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        np.multiply(z[month], sigma, out=step[:half])
+        np.negative(step[:half], out=step[half:])
+        step += mu
+        log_growth += step
+        np.negative(log_growth, out=scratch)
+        np.exp(scratch, out=scratch)
+        inverse_sum += scratch
+        while row < len(checkpoints) and checkpoints[row] == month + 1:
+            growth = np.exp(log_growth[columns].astype(float))
+            equity[row] = growth * (principal + contribution * inverse_sum[columns].astype(float))
+            row += 1
+    return equity
+
+
+def simulate_equity(principal, contribution, annual_rate_percent, volatility_percent, months,
+                    n_paths=10000, seed=None, checkpoints=None, budget_ms=None, chunk_paths=5000,
+                    path_months_per_ms=None):
+    """
+    Simulated equity paths for one savings plan
+
+    Parameters:
+    - principal: Starting equity
+    - contribution: Monthly savings added after each month's return
+    - annual_rate_percent: Expected annual return in percent (mean of the monthly gross return
+      equals monthly_rate of it, so the path mean tracks growth.future_value)
+    - volatility_percent: Annual volatility of returns in percent
+    - months: Horizon in months
+    - n_paths: Paths requested
+    - seed: Makes results reproducible (block i always uses the i-th spawned stream)
+    - checkpoints: Months at which equity is reported (default: only `months`)
+    - budget_ms: Stop once this much time has passed, dropping the chunk in progress
+      (None: no limit); the first block always runs
+    - chunk_paths: Most paths per chunk (whole blocks, at least one)
+    - path_months_per_ms: Throughput assumed for seeded runs under a budget: n_paths is
+      first lowered to affordable_paths, so the paths kept do not depend on timing
+      unless the machine is slower than this
+
+    Returns a dict with 'equity' (len(checkpoints) x paths simulated), 'paths',
+    'truncated' (True if fewer than n_paths were simulated) and 'elapsed_ms'.
+    """
+    started = time.perf_counter()
+    months = int(months)
+    checkpoints = [months] if checkpoints is None else sorted(int(m) for m in checkpoints)
+    if months < 1 or checkpoints[0] < 1 or checkpoints[-1] > months:
+        raise ValueError('checkpoints must lie within 1..months')
+
+    requested = n_paths
+    if seed is not None and budget_ms and path_months_per_ms:
+        n_paths = affordable_paths(n_paths, months, budget_ms, path_months_per_ms)
+
+    sigma = volatility_percent / 100 / np.sqrt(12)
+    # Log-return drift chosen so that E[1 + r] = 1 + monthly_rate
+    mu = float(np.log1p(monthly_rate(annual_rate_percent))) - sigma ** 2 / 2
+
+    block_sizes = [min(BLOCK_PATHS, n_paths - start) for start in range(0, n_paths, BLOCK_PATHS)]
+    streams = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    blocks = [(np.random.default_rng(stream), size) for stream, size in zip(streams, block_sizes)]
+    blocks_per_chunk = max(1, chunk_paths // BLOCK_PATHS)
+    deadline = started + budget_ms / 1000 if budget_ms else None
+
+    chunks, done = [], 0
+    while done < len(blocks):
+        take = blocks_per_chunk
+        if deadline is not None:
+            now = time.perf_counter()
+            if not chunks:
+                take = 1  # measure the cost of one block first
+            else:
+                block_seconds = (now - started) / done
+                take = min(take, int((deadline - now) / block_seconds))
+                if take < 1:
+                    break
+        chunk = _simulate_chunk(blocks[done:done + take], principal, contribution, mu, sigma, months,
+                                checkpoints, deadline if chunks else None)
+        if chunk is None:
+            break
+        chunks.append(chunk)
+        done += take
+
+    equity = np.concatenate(chunks, axis=1)
+    return {
+        'equity': equity,
+        'paths': equity.shape[1],
+        'truncated': equity.shape[1] < requested,
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    }
+
+
+def percentile_bands(values, percentiles=PERCENTILES):
+    """
+    {'p5': ..., 'p50': ...} percentiles over the last axis of `values`
+
+    Same linear interpolation as np.percentile, but from one sort shared by
+    all percentiles (several times faster for a handful of bands).
+    """
+    ordered = np.sort(values, axis=-1)
+    n = ordered.shape[-1]
+    bands = {}
+    for p in percentiles:
+        position = p / 100 * (n - 1)
+        low = int(np.floor(position))
+        high = min(low + 1, n - 1)
+        fraction = position - low
+        bands[f'p{p}'] = ordered[..., low] + fraction * (ordered[..., high] - ordered[..., low])
+    return bands
@@ -0,0 +1,96 @@
+"""
+Goal seeking over the vectorized predict paths
+
+Instead of bisecting with one model call per step, each round scores a
+whole grid of candidate values with one batch call and narrows the search
+to the bracket where the goal is first (or last) met. With 64 points per
+round, a lattice of 20,000 values is resolved in three rounds. The result
+always lies on the lattice low + k * step and has been scored itself.
+
+The scorers switch between the ML models and the fallback formulas at the
+training bounds, and their values jump there. Callers pass those switch
+points as `breaks`; each branch is searched as its own segment (monotone
+within, for the metrics used here) and the best segment answer wins.
+"""
+import numpy as np
+
+
+def _grid(lo, hi, points):
+    """Up to `points` distinct lattice indices spanning lo..hi (both included)"""
+    return np.unique(np.linspace(lo, hi, points).round().astype(np.int64))
+
+
+def _segments(low, high, step, breaks):
+    """Lattice index ranges (lo, hi) split so every break value starts a new segment"""
+    last = int(np.floor((high - low) / step + 1e-9))
+    starts = {0} | {int(np.ceil((b - low) / step - 1e-9))
+                    for b in breaks if low < b <= low + last * step}
+    starts = sorted(starts)
+    return [(start, end - 1) for start, end in zip(starts, starts[1:] + [last + 1])]
+
+
+def _first_met(evaluate, low, step, goal, lo, hi, points):
+    """Smallest index in lo..hi whose metric reaches goal (None if none on the grid)"""
+    evaluations = 0
+    while True:
+        ks = _grid(lo, hi, points)
+        met = np.asarray(evaluate(low + ks * step)) >= goal
+        evaluations += len(ks)
+        if not met.any():
+            return None, evaluations
+        i = int(np.argmax(met))
+        if i == 0 or ks[i] - ks[i - 1] == 1:
+            return ks[i], evaluations
+        lo, hi = ks[i - 1] + 1, ks[i]
+
+
+def _last_met(evaluate, low, step, goal, lo, hi, points):
+    """Largest index in lo..hi whose metric reaches goal (None if none on the grid)"""
+    evaluations = 0
+    while True:
+        ks = _grid(lo, hi, points)
+        met = np.asarray(evaluate(low + ks * step)) >= goal
+        evaluations += len(ks)
+        if not met.any():
+            return None, evaluations
+        j = len(ks) - 1 - int(np.argmax(met[::-1]))
+        if j == len(ks) - 1 or ks[j + 1] - ks[j] == 1:
+            return ks[j], evaluations
+        lo, hi = ks[j], ks[j + 1] - 1
+
+
+def solve_min(evaluate, low, high, step, goal, breaks=(), points=64):
+    """
+    Smallest value on the lattice low + k * step (<= high) whose metric reaches `goal`
+
+    Parameters:
+    - evaluate: Callable mapping an array of candidate values to metric values
+    - low / high / step: Search range and resolution
+    - goal: Metric value to reach (metric >= goal)
+    - breaks: Values where the metric may jump (each starts a new segment)
+    - points: Candidates scored per round
+
+    Returns (value or None if no candidate reaches the goal, candidates scored).
+    """
+    evaluations = 0
+    for lo, hi in _segments(low, high, step, breaks):
+        k, used = _first_met(evaluate, low, step, goal, lo, hi, points)
+        evaluations += used
+        if k is not None:
+            return low + k * step, evaluations
+    return None, evaluations
+
+
+def solve_max(evaluate, low, high, step, goal, breaks=(), points=64):
+    """
+    Largest value on the lattice low + k * step (<= high) whose metric still reaches `goal`
+
+    Same parameters and return value as solve_min.
+    """
+    evaluations = 0
+    for lo, hi in reversed(_segments(low, high, step, breaks)):
+        k, used = _last_met(evaluate, low, step, goal, lo, hi, points)
+        evaluations += used
+        if k is not None:
+            return low + k * step, evaluations
+    return None, evaluations
@@ -0,0 +1,273 @@
+"""
+Out-of-core training: least-squares fits accumulated chunk by chunk
+
+Training data arrives as a stream of column chunks (dicts of equal-length
+arrays keyed by column name) from the synthetic generators, a CSV file or
+a Parquet file, so the full dataset never has to fit in memory. Each model
+keeps a StreamingLeastSquares accumulator whose size depends only on the
+number of features.
+
+The accumulator holds the column means and the triangular factor R of the
+centered [X, y] data (R^T R is the centered X^T X / X^T y block matrix).
+Keeping the factor instead of X^T X itself avoids squaring the condition
+number, which matters for the polynomial readiness features: their
+centered singular values span more than 20 orders of magnitude. Solving
+on R with LinearRegression's singular value cutoff yields the same
+coefficients as fitting LinearRegression on the concatenated data.
+
+scipy and scikit-learn are imported on first use, so importing this module
+stays cheap for a lazily starting server (see LAZY_MODELS in server.py).
+"""
+import csv
+import hashlib
+import itertools
+import os
+
+import numpy as np
+
+from training_data import (likelihood_dataset, likelihood_features, property_dataset,
+                           readiness_dataset, readiness_features, sample_profiles)
+
+# Input and label columns of each model in a training file
+MODEL_COLUMNS = {
+    'readiness': ('income', 'equity', 'savings', 'target', 'marital', 'kids', 'readiness'),
+    'likelihood': ('income', 'equity', 'savings', 'target', 'years', 'rate', 'marital', 'kids',
+                   'likelihood'),
+    'property_price': ('sqm', 'rooms', 'bathrooms', 'location_premium', 'condition', 'year_age',
+                       'price')
+}
+
+# Width of readiness_features, before the polynomial expansion
+READINESS_INPUTS = 9
+
+DEFAULT_CHUNK_ROWS = 50000
+
+
+class StreamingLeastSquares:
+    """
+    Ordinary (optionally weighted) least squares with intercept, fitted from
+    (X, y) chunks
+
+    Parameters:
+    - tol: Singular values below tol * largest are treated as zero
+      (LinearRegression's cutoff, so rank-deficient inputs agree too)
+    """
+
+    def __init__(self, tol=1e-6):
+        self.tol = tol
+        self.n_samples = 0
+        self.weight = 0.0  # sum of sample weights (== n_samples when unweighted)
+        self.mean = None   # weighted column means of [X, y]
+        self.r = None      # triangular factor of the centered, weight-scaled [X, y]
+
+    def _combine(self, n, weight, mean, r):
+        """Merge the statistics of another block of rows into this accumulator"""
+        if self.n_samples == 0:
+            self.n_samples, self.weight, self.mean, self.r = n, weight, mean, r
+            return
+        total = self.weight + weight
+        delta = mean - self.mean
+        # Re-centering both blocks on the joint mean adds one rank-one row
+        correction = np.sqrt(self.weight * weight / total) * delta
+        self.r = np.linalg.qr(np.vstack([self.r, r, correction]), mode='r')
+        self.mean = self.mean + delta * (weight / total)
+        self.weight = total
+        self.n_samples += n
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """
+        Add a chunk of rows; returns self
+
+        Each update costs O(features^2 * (features + rows)), independent of
+        the rows seen before.
+        """
+        Z = np.column_stack([np.asarray(X, dtype=float), np.asarray(y, dtype=float)])
+        if len(Z) == 0:
+            return self
+        if self.mean is not None and Z.shape[1] != len(self.mean):
+            raise ValueError(f'expected {len(self.mean) - 1} features, got {Z.shape[1] - 1}')
+        if sample_weight is None:
+            mean = Z.mean(axis=0)
+            self._combine(len(Z), float(len(Z)), mean, np.linalg.qr(Z - mean, mode='r'))
+            return self
+        w = np.broadcast_to(np.asarray(sample_weight, dtype=float), (len(Z),))
+        if (w <= 0).any():
+            raise ValueError('sample weights must be positive')
+        mean = w @ Z / w.sum()
+        r = np.linalg.qr(np.sqrt(w)[:, None] * (Z - mean), mode='r')
+        self._combine(len(Z), float(w.sum()), mean, r)
+        return self
+
+    def merge(self, other):
+        """Add everything another accumulator has seen (e.g. from a worker process); returns self"""
+        if other.n_samples:
+            self._combine(other.n_samples, other.weight, other.mean, other.r)
+        return self
+
+    def copy(self):
+        """Independent accumulator with the same statistics"""
+        return StreamingLeastSquares(self.tol).merge(self)
+
+    def state(self):
+        """Statistics as a dict of arrays (for artifacts); see from_state"""
+        return {'r': self.r, 'mean': self.mean, 'count': np.array([self.n_samples, self.weight])}
+
+    @classmethod
+    def from_state(cls, state, tol=1e-6):
+        """Accumulator restored from state()"""
+        acc = cls(tol)
+        acc.r = np.asarray(state['r'], dtype=float)
+        acc.mean = np.asarray(state['mean'], dtype=float)
+        acc.n_samples, acc.weight = int(state['count'][0]), float(state['count'][1])
+        return acc
+
+    def solve(self):
+        """Fitted (coef, intercept); minimum-norm coefficients if X is rank deficient"""
+        if self.n_samples == 0:
+            raise ValueError('no rows seen')
+        from scipy import linalg
+
+        k = len(self.mean) - 1
+        coef = linalg.lstsq(self.r[:, :k], self.r[:, k], cond=self.tol, check_finite=False)[0]
+        return coef, float(self.mean[k] - self.mean[:k] @ coef)
+
+    def score(self, coef=None):
+        """Training R^2 of `coef` (default: the least-squares solution)"""
+        if coef is None:
+            coef, _ = self.solve()
+        k = len(self.mean) - 1
+        residual = self.r[:, k] - self.r[:, :k] @ coef
+        total = self.r[:, k] @ self.r[:, k]
+        return float(1 - residual @ residual / total) if total > 0 else 0.0
+
+    def to_linear_regression(self):
+        """Fitted LinearRegression holding the streamed solution"""
+        from sklearn.linear_model import LinearRegression
+
+        coef, intercept = self.solve()
+        model = LinearRegression()
+        model.coef_ = coef
+        model.intercept_ = intercept
+        model.n_features_in_ = coef.shape[0]
+        return model
+
+
+def _profiles(columns):
+    """training_data profile dict from file columns"""
+    return {'incomes': columns['income'], 'equities': columns['equity'], 'savings': columns['savings'],
+            'targets': columns['target'], 'marital': columns['marital'], 'kids': columns['kids']}
+
+
+def model_chunks(columns):
+    """
+    (X, y) for every model whose columns are all present in a column chunk
+
+    Derived features (adjusted income, purchasing power, coverage, ...) are
+    computed exactly as for the synthetic datasets.
+    """
+    chunks = {}
+    if all(name in columns for name in MODEL_COLUMNS['readiness']):
+        chunks['readiness'] = (readiness_features(_profiles(columns)), columns['readiness'])
+    if all(name in columns for name in MODEL_COLUMNS['likelihood']):
+        X = likelihood_features(_profiles(columns), columns['years'], columns['rate'])
+        chunks['likelihood'] = (X, columns['likelihood'])
+    if all(name in columns for name in MODEL_COLUMNS['property_price']):
+        X = np.column_stack([columns[name] for name in MODEL_COLUMNS['property_price'][:-1]])
+        chunks['property_price'] = (X, columns['price'])
+    return chunks
+
+
+def synthetic_chunks(n_samples, chunk_rows=DEFAULT_CHUNK_ROWS, seed=42):
+    """
+    Synthetic training rows for all three models, generated one chunk at a time
+
+    Each chunk draws from its own generator spawned from `seed`, so the
+    stream is reproducible for a given chunk size.
+    """
+    n_chunks = -(-n_samples // chunk_rows)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        rng = np.random.default_rng(child)
+        rows = min(chunk_rows, n_samples - i * chunk_rows)
+        profiles = sample_profiles(rng, rows)
+        _, readiness = readiness_dataset(rng, profiles)
+        X_likelihood, likelihood = likelihood_dataset(rng, profiles)
+        X_property, price = property_dataset(rng, rows)
+        columns = {'income': profiles['incomes'], 'equity': profiles['equities'],
+                   'savings': profiles['savings'], 'target': profiles['targets'],
+                   'marital': profiles['marital'], 'kids': profiles['kids'],
+                   'years': X_likelihood[:, 4], 'rate': X_likelihood[:, 5],
+                   'readiness': readiness, 'likelihood': likelihood, 'price': price}
+        columns.update(zip(MODEL_COLUMNS['property_price'][:-1], X_property.T))
+        yield columns
+
+
+def csv_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Numeric columns of a CSV file with a header row, chunk_rows rows at a time"""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader)]
+        while True:
+            rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                return
+            values = np.array(rows, dtype=float).reshape(len(rows), len(header))
+            yield dict(zip(header, values.T))
+
+
+def parquet_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Columns of a Parquet file, one record batch at a time (requires pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError('Parquet input needs pyarrow (pip install pyarrow)') from e
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield {name: column.to_numpy(zero_copy_only=False).astype(float)
+               for name, column in zip(batch.schema.names, batch.columns)}
+
+
+def file_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Column chunks of a .csv or .parquet training file"""
+    if path.endswith('.parquet'):
+        return parquet_chunks(path, chunk_rows)
+    return csv_chunks(path, chunk_rows)
+
+
+def file_signature(path):
+    """
+    Identity of a training file for the artifact fingerprint: its name and
+    content hash (a moved file still matches; an edited one does not)
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'file': os.path.basename(path), 'sha256': digest.hexdigest()}
+
+
+def fit_stream(chunks, poly_degree=2, progress=None):
+    """
+    Fit the three models from a stream of column chunks
+
+    Parameters:
+    - chunks: Iterable of column dicts (synthetic_chunks, csv_chunks, ...)
+    - poly_degree: Degree of the readiness polynomial features
+    - progress: Optional callback(rows_seen) after each chunk
+
+    Returns (poly_features, {model name: StreamingLeastSquares}); models
+    without any rows in the stream are left out.
+    """
+    from sklearn.preprocessing import PolynomialFeatures
+
+    poly_features = PolynomialFeatures(degree=poly_degree)
+    poly_features.fit(np.zeros((1, READINESS_INPUTS)))
+    accumulators = {name: StreamingLeastSquares() for name in MODEL_COLUMNS}
+    rows_seen = 0
+    for columns in chunks:
+        for name, (X, y) in model_chunks(columns).items():
+            if name == 'readiness':
+                X = poly_features.transform(X)
+            accumulators[name].partial_fit(X, y)
+        rows_seen += len(next(iter(columns.values()), ()))
+        if progress:
+            progress(rows_seen)
+    return poly_features, {name: acc for name, acc in accumulators.items() if acc.n_samples}
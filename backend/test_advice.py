@@ -0,0 +1,90 @@
+"""
+Tests for the advice chat proxy (advice.py, /api/advice)
+"""
+import threading
+
+import pytest
+
+from advice import AdviceService, LLMError, StubLLM, build_prompt, profile_bucket
+from server import advice_service, app
+
+PROFILE = {'income': 5000, 'equity': 60000, 'savings': 900, 'target': 400000, 'years': 6, 'rate': 5.0,
+           'marital': 'married', 'kids': 1, 'riskName': 'Balanced', 'currPower': 310000}
+
+
+class FailingLLM(StubLLM):
+    def generate(self, prompt):
+        super().generate(prompt)
+        raise LLMError('upstream unavailable')
+
+
+def _concurrently(fn, n):
+    barrier = threading.Barrier(n)
+    results, errors = [None] * n, [None] * n
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_similar_profiles_share_bucket_and_cache():
+    llm = StubLLM()
+    service = AdviceService(llm)
+    near = dict(PROFILE, income=5040, savings=910, marital=' Married ')
+    assert profile_bucket(near) == profile_bucket(PROFILE)
+    assert 'Income: €5000' in build_prompt('steps', profile_bucket(near))
+
+    first = service.advise('question', PROFILE, 'Should I  buy now?')
+    second = service.advise('question', near, 'should i buy NOW?')
+    assert (first['cached'], second['cached']) == (False, True)
+    assert first['advice'] == second['advice'] and llm.calls == 1
+
+    service.advise('steps', PROFILE)
+    assert llm.calls == 2
+    with pytest.raises(ValueError):
+        service.advise('question', PROFILE, '   ')
+    with pytest.raises(ValueError):
+        service.advise('poem', PROFILE)
+
+
+def test_concurrent_identical_requests_make_one_upstream_call():
+    llm = StubLLM(delay=0.2)
+    service = AdviceService(llm)
+    results, errors = _concurrently(lambda: service.advise('steps', PROFILE), 8)
+    assert errors == [None] * 8 and llm.calls == 1
+    assert len({r['advice'] for r in results}) == 1
+    assert sum(r['coalesced'] for r in results) == 7 == service.stats()['coalesced']
+
+    failing = FailingLLM(delay=0.2)
+    service = AdviceService(failing)
+    _, errors = _concurrently(lambda: service.advise('steps', PROFILE), 4)
+    assert failing.calls == 1 and all(isinstance(e, LLMError) for e in errors)
+    stats = service.stats()
+    assert (stats['upstream_calls'], stats['upstream_errors'], stats['cache']['size']) == (1, 1, 0)
+
+
+def test_advice_endpoint_reports_cache_and_upstream_latency():
+    client = app.test_client()
+    advice_service.cache.clear()
+    response = client.post('/api/advice', json=dict(PROFILE, kind='steps'))
+    assert response.status_code == 200 and response.get_json()['cached'] is False
+    assert client.post('/api/advice', json=dict(PROFILE, kind='steps')).get_json()['cached'] is True
+
+    assert client.post('/api/advice', json=dict(PROFILE, kind='question')).status_code == 400
+    assert client.post('/api/advice', json=dict(PROFILE, kind='poem')).status_code == 400
+
+    health = client.get('/api/health').get_json()['advice']
+    assert health['configured'] and health['cache']['hits'] >= 1 and health['upstream_calls'] >= 1
+    metrics = client.get('/api/metrics').get_data(as_text=True)
+    assert 'rge_advice_upstream_seconds_count{outcome="ok"}' in metrics
+    assert 'rge_cache_hits_total{cache="advice"}' in metrics
@@ -0,0 +1,64 @@
+"""
+Tests for persisted model artifacts and warm-start loading
+"""
+import numpy as np
+
+from artifacts import manifest_path
+from server import MLPredictor, app
+
+
+def _profiles_batch(predictor):
+    return predictor.predict_readiness_batch(
+        [3000, 6000, 9000], [10000, 75000, 150000], [500, 1200, 2000],
+        [250000, 450000, 600000], ['single', 'married', 'married'], [0, 2, 3]
+    )
+
+
+def test_warm_start_restores_identical_models(tmp_path):
+    path = str(tmp_path / 'predictor.npz')
+    trained = MLPredictor(n_samples=1500, artifact_path=path)
+    loaded = MLPredictor(n_samples=1500, artifact_path=path)
+
+    assert trained.model_source == 'trained'
+    assert loaded.model_source == 'artifact'
+    assert loaded.artifact_version == trained.artifact_version
+    assert loaded.scores == trained.scores
+    np.testing.assert_array_equal(loaded.readiness_model.coef_, trained.readiness_model.coef_)
+
+    for expected, actual in zip(_profiles_batch(trained), _profiles_batch(loaded)):
+        np.testing.assert_array_equal(expected, actual)
+    assert loaded.predict_likelihood(6000, 75000, 1200, 450000, 7, 5.0, 'married', 2) == \
+        trained.predict_likelihood(6000, 75000, 1200, 450000, 7, 5.0, 'married', 2)
+    assert loaded.predict_property_price(120, 4, 2, 'city', 'good', 2010) == \
+        trained.predict_property_price(120, 4, 2, 'city', 'good', 2010)
+
+
+def test_stale_artifact_is_retrained(tmp_path):
+    path = str(tmp_path / 'predictor.npz')
+    MLPredictor(n_samples=1500, artifact_path=path)
+
+    retrained = MLPredictor(n_samples=1500, seed=7, artifact_path=path)
+
+    assert retrained.model_source == 'trained'
+    assert MLPredictor(n_samples=1500, seed=7, artifact_path=path).model_source == 'artifact'
+
+
+def test_corrupt_artifact_is_retrained(tmp_path):
+    path = str(tmp_path / 'predictor.npz')
+    MLPredictor(n_samples=1500, artifact_path=path)
+    with open(path, 'r+b') as f:
+        f.seek(-8, 2)
+        f.write(b'\x00' * 8)
+
+    assert MLPredictor(n_samples=1500, artifact_path=path).model_source == 'trained'
+
+    with open(manifest_path(path), 'w') as f:
+        f.write('not json')
+    assert MLPredictor(n_samples=1500, artifact_path=path).model_source == 'trained'
+
+
+def test_health_reports_artifact_version():
+    with app.test_client() as client:
+        body = client.get('/api/health').get_json()
+    assert body['artifact_version']
+    assert body['model_source'] in ('trained', 'artifact')
@@ -0,0 +1,54 @@
+"""
+Tests for the benchmark regression comparison (timings themselves are not asserted)
+"""
+import json
+
+import bench_regression
+from bench_regression import compare
+
+
+def _case(value, better='lower', unit='us', normalized=None, threshold=0.3):
+    case = {'value': value, 'median': value, 'unit': unit, 'better': better, 'threshold': threshold}
+    if normalized is not None:
+        case['normalized'] = normalized
+    return case
+
+
+def test_compare_flags_slower_latency_and_lower_throughput():
+    baseline = {'cases': {'latency': _case(100), 'throughput': _case(1000, better='higher'),
+                          'steady': _case(50)}}
+    cases = {'latency': _case(140), 'throughput': _case(700, better='higher'), 'steady': _case(55)}
+
+    regressions = {name: round(change, 3) for name, _, _, change in compare(cases, baseline)}
+    assert regressions == {'latency': 0.4, 'throughput': round(1000 / 700 - 1, 3)}
+
+    # A global threshold overrides the per-case ones
+    assert {name for name, *_ in compare(cases, baseline, threshold=1.0)} == set()
+
+
+def test_compare_prefers_normalized_timings():
+    # Raw time doubled because the whole machine was slower: not a regression
+    baseline = {'cases': {'predict': _case(100, normalized=2.0)}}
+    assert compare({'predict': _case(200, normalized=2.1)}, baseline) == []
+    assert compare({'predict': _case(100, normalized=3.0)}, baseline)[0][0] == 'predict'
+
+
+def test_compare_skips_new_cases_and_unit_changes():
+    baseline = {'cases': {'train': _case(0.01, unit='s')}}
+    cases = {'train': _case(10, unit='ms'), 'new_case': _case(1)}
+    assert compare(cases, baseline) == []
+
+
+def test_main_writes_results_and_fails_on_regression(tmp_path, monkeypatch):
+    baseline_path = tmp_path / 'baseline.json'
+    output_path = tmp_path / 'results.json'
+    baseline_path.write_text(json.dumps({'cases': {'predict_single': _case(50)}}))
+
+    monkeypatch.setattr(bench_regression, 'run_suite', lambda quick=False: {'predict_single': _case(51)})
+    assert bench_regression.main(['--baseline', str(baseline_path), '--output', str(output_path)]) == 0
+    saved = json.loads(output_path.read_text())
+    assert saved['cases']['predict_single']['value'] == 51
+    assert {'python', 'numpy', 'cpu_count', 'created_at'} <= saved.keys()
+
+    monkeypatch.setattr(bench_regression, 'run_suite', lambda quick=False: {'predict_single': _case(90)})
+    assert bench_regression.main(['--baseline', str(baseline_path), '--output', str(output_path)]) == 1
@@ -0,0 +1,89 @@
+"""
+Tests for the bulk portfolio scorer (bulk_score.py)
+"""
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+from bulk_score import main, score_stream
+from server import app
+
+PROFILES = [
+    {'income': 5000, 'equity': 50000, 'savings': 800, 'target': 350000, 'years': 5, 'rate': 5.0,
+     'marital': 'married', 'kids': 2},
+    {'income': 20000, 'equity': 300000, 'savings': 3000, 'target': 900000, 'years': 20, 'rate': 2.5,
+     'marital': 'single', 'kids': 0},
+    {'income': 3200, 'equity': 0, 'savings': 150, 'target': 250000, 'years': 12, 'rate': 7.5,
+     'marital': 'single', 'kids': 1},
+]
+
+
+def _expected(profiles):
+    response = app.test_client().post('/api/predict/batch', json={'profiles': profiles})
+    return response.get_json()['predictions']
+
+
+def _csv_input(profiles, extra_lines=()):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(['id'] + list(PROFILES[0]))
+    for i, profile in enumerate(profiles):
+        writer.writerow([f'c{i}'] + list(profile.values()))
+    return out.getvalue() + ''.join(extra_lines)
+
+
+def test_csv_scores_match_batch_endpoint_across_workers_and_chunks():
+    profiles = PROFILES * 7
+    text = _csv_input(profiles, ['bad,abc,1,1,100000,1,5,single,0\n', 'zero,4000,0,0,0,1,5,single,0\n',
+                                 'short,4000\n', 'nan,nan,1,1,100000,1,5,single,0\n'])
+    outputs = []
+    for workers, chunk_rows in ((1, 1000), (1, 4), (2, 5)):
+        sink = io.StringIO()
+        assert score_stream(io.StringIO(text), sink, 'csv', workers=workers, chunk_rows=chunk_rows) == 25
+        outputs.append(sink.getvalue())
+    assert outputs[0] == outputs[1] == outputs[2]
+
+    rows = list(csv.DictReader(io.StringIO(outputs[0])))
+    assert [row['id'] for row in rows] == [f'c{i}' for i in range(21)] + ['bad', 'zero', 'short', 'nan']
+    for row, expected in zip(rows, _expected(profiles)):
+        assert {key: float(row[key]) for key in expected} == expected
+        assert row['error'] == ''
+    assert 'abc' in rows[21]['error'] and rows[21]['readiness'] == ''
+    assert rows[22]['error'] == 'Target must be greater than 0'
+    assert rows[23]['error'] == '' and float(rows[23]['readiness']) >= 0  # missing fields use defaults
+    assert 'non-finite' in rows[24]['error'] and rows[24]['readiness'] == ''
+
+
+def test_jsonl_keeps_input_fields_and_reports_bad_lines():
+    lines = [json.dumps(dict(p, id=i)) for i, p in enumerate(PROFILES)] + ['{not json', '[1, 2]',
+                                                                            '{"income": NaN}', '{"target": "inf"}']
+    sink = io.StringIO()
+    assert score_stream(io.StringIO('\n'.join(lines) + '\n\n'), sink, 'jsonl', chunk_rows=2) == 7
+
+    rows = [json.loads(line) for line in sink.getvalue().splitlines()]
+    for row, profile, expected in zip(rows, PROFILES, _expected(PROFILES)):
+        assert {key: row[key] for key in expected} == expected
+        assert row['income'] == profile['income']
+    assert rows[3]['error'].startswith('invalid JSON') and rows[4]['error'].startswith('invalid JSON')
+    assert 'non-finite' in rows[5]['error'] and 'non-finite' in rows[6]['error']
+
+
+def test_cli_writes_output_and_reports_throughput(tmp_path, capsys):
+    source = tmp_path / 'book.csv'
+    source.write_text(_csv_input(PROFILES))
+    target = tmp_path / 'scored.csv'
+
+    assert main([str(source), '-o', str(target), '--workers', '1']) == 0
+    assert len(target.read_text().splitlines()) == 1 + len(PROFILES)
+    assert 'rows/s' in capsys.readouterr().err
+
+
+def test_workers_load_the_predictor_without_the_web_app():
+    code = ("import sys, bulk_score; bulk_score._load_predictor(); "
+            "print(sorted({'flask', 'server', 'jobs', 'listings'} & set(sys.modules)))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    assert out.strip() == '[]'
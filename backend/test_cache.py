@@ -0,0 +1,101 @@
+"""
+Tests for the prediction result cache and its use by the endpoints
+"""
+from cache import PredictionCache, quantize
+from server import app, prediction_caches, retrain_jobs
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_quantize():
+    assert quantize(5003, 10) == 5000
+    assert quantize(5006, 10) == 5010
+    assert quantize(4.97, 0.05) == 4.95
+    assert quantize(7.5, 0.05) == 7.5
+    assert quantize(123.456, 0) == 123.456
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(max_size=2, ttl=None)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == (True, 1)  # 'a' becomes most recently used
+    cache.put('c', 3)                   # evicts 'b'
+
+    assert cache.get('b') == (False, None)
+    assert cache.get('c') == (True, 3)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 1, 1, 2)
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = PredictionCache(max_size=10, ttl=5, clock=clock)
+    cache.put('a', 1)
+    clock.now = 4.9
+    assert cache.get('a') == (True, 1)
+    clock.now = 5.0
+    assert cache.get('a') == (False, None)
+    assert cache.stats()['expirations'] == 1
+
+
+def test_disabled_cache_always_computes():
+    cache = PredictionCache(max_size=0)
+    calls = []
+    for _ in range(3):
+        cache.get_or_compute('a', lambda: calls.append(1) or len(calls))
+    assert len(calls) == 3
+
+
+def test_endpoint_shares_entries_for_near_identical_payloads():
+    cache = prediction_caches['predict']
+    cache.clear()
+    hits = cache.hits
+    profile = {"income": 5003, "equity": 50000, "savings": 800, "target": 350000,
+               "years": 5, "rate": 5.01, "marital": "married", "kids": 2}
+
+    with app.test_client() as client:
+        first = client.post('/api/predict', json=profile).get_json()
+        second = client.post('/api/predict', json={**profile, 'income': 4998, 'rate': 4.99}).get_json()
+        assert second == first
+        assert cache.hits == hits + 1
+
+        job = client.post('/api/retrain').get_json()['job']
+        retrain_jobs.wait(job['id'], timeout=30)
+        assert cache.stats()['size'] == 0
+        health = client.get('/api/health').get_json()
+    assert set(health['caches']) == {'predict', 'property_price'}
+
+
+def test_property_price_endpoint_is_cached():
+    cache = prediction_caches['property_price']
+    cache.clear()
+    misses = cache.misses
+    payload = {"sqm": 120.2, "rooms": 4, "bathrooms": 2, "location": "city",
+               "condition": "good", "yearBuilt": 2010}
+
+    with app.test_client() as client:
+        first = client.post('/api/predict-property-price', json=payload).get_json()
+        second = client.post('/api/predict-property-price', json={**payload, 'sqm': 119.9}).get_json()
+
+    assert first['predictedPrice'] == second['predictedPrice']
+    assert cache.misses == misses + 1
+
+
+def test_cache_miss_computes_from_the_inputs_as_sent():
+    prediction_caches['predict'].clear()
+    profile = {"income": 5003.7, "equity": 50004, "savings": 803, "target": 350040,
+               "years": 5, "rate": 4.97, "marital": "married", "kids": 2}
+
+    with app.test_client() as client:
+        single = client.post('/api/predict', json=profile).get_json()
+        batch = client.post('/api/predict/batch', json={'profiles': [profile]}).get_json()['predictions'][0]
+
+    for key in ('readiness', 'likelihood', 'currPower', 'futureEquity'):
+        assert single[key] == batch[key]
@@ -0,0 +1,69 @@
+"""
+Tests for the micro-batching request coalescer
+"""
+import threading
+
+import pytest
+
+import server
+from coalescer import RequestCoalescer
+from server import app, predictor
+
+
+def _profile(i):
+    return (3000 + 97 * i, 10000 + 1500 * i, 300 + 11 * i, 250000 + 4000 * i,
+            1 + i % 15, (2.5, 5.0, 7.5)[i % 3], ('single', 'married')[i % 2], i % 4)
+
+
+def test_concurrent_submits_are_batched_and_match_single_path():
+    coalescer = RequestCoalescer(server._score_profile_batch, max_batch_size=16, max_wait_ms=20)
+    results = {}
+    barrier = threading.Barrier(32)
+
+    def call(i):
+        barrier.wait()
+        results[i] = coalescer.submit(_profile(i), timeout=10)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i in range(32):
+        income, equity, savings, target, years, rate, marital, kids = _profile(i)
+        readiness, curr_power = predictor.predict_readiness(income, equity, savings, target, marital, kids)
+        likelihood, future_equity = predictor.predict_likelihood(
+            income, equity, savings, target, years, rate, marital, kids
+        )
+        assert results[i] == (readiness, likelihood, curr_power, future_equity)
+
+    stats = coalescer.stats()
+    assert stats['items'] == 32
+    assert stats['batches'] < 32
+    assert stats['mean_batch_size'] <= 16
+
+
+def test_batch_errors_reach_every_caller():
+    def failing(items):
+        raise ValueError('boom')
+
+    coalescer = RequestCoalescer(failing, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        coalescer.submit('x', timeout=5)
+
+
+def test_predict_endpoint_uses_coalescer_when_enabled(monkeypatch):
+    coalescer = RequestCoalescer(server._score_profile_batch, max_wait_ms=1)
+    monkeypatch.setattr(server, 'predict_coalescer', coalescer)
+    server.prediction_caches['predict'].clear()
+    profile = {"income": 4321, "equity": 12345, "savings": 678, "target": 333300,
+               "years": 4, "rate": 2.5, "marital": "single", "kids": 1}
+
+    with app.test_client() as client:
+        body = client.post('/api/predict', json=profile).get_json()
+        health = client.get('/api/health').get_json()
+
+    readiness, curr_power = predictor.predict_readiness(4321, 12345, 678, 333300, 'single', 1)
+    assert (body['readiness'], body['currPower']) == (readiness, curr_power)
+    assert health['coalescer']['items'] == 1
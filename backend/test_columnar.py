@@ -0,0 +1,91 @@
+"""
+Tests for the columnar binary batch format (columnar.py) and its content negotiation
+"""
+import numpy as np
+import pytest
+
+from columnar import MEDIA_TYPE, ColumnarError, decode, encode
+from server import app
+
+PROFILES = [
+    {'income': 5000.0, 'equity': 50000.0, 'savings': 800.0, 'target': 350000.0, 'years': 5, 'rate': 5.0,
+     'marital': 'married', 'kids': 2},
+    {'income': 20000.0, 'equity': 300000.0, 'savings': 3000.0, 'target': 900000.0, 'years': 20, 'rate': 2.5,
+     'marital': 'single', 'kids': 0},
+    {'income': 3200.0, 'equity': 0.0, 'savings': 150.0, 'target': 250000.0, 'years': 12, 'rate': 7.5,
+     'marital': 'single', 'kids': 1},
+]
+
+
+def _columns(profiles):
+    columns = {name: np.array([p[name] for p in profiles]) for name in ('income', 'equity', 'savings',
+                                                                         'target', 'rate')}
+    columns['years'] = np.array([p['years'] for p in profiles], dtype=np.int32)
+    columns['kids'] = np.array([p['kids'] for p in profiles], dtype=np.uint8)
+    columns['marital'] = np.array([p['marital'] == 'married' for p in profiles], dtype=np.uint8)
+    return columns
+
+
+def test_round_trip_decodes_views_of_the_payload():
+    columns = {'a': np.arange(5, dtype=np.float64), 'flag': np.array([1, 0, 1, 1, 0], dtype=np.uint8),
+               'big_endian': np.arange(5, dtype='>i4'), 'n': np.arange(5, dtype=np.int64)}
+    payload = encode(columns)
+    assert len(payload) % 8 == 0
+
+    decoded, n = decode(payload)
+    assert n == 5 and list(decoded) == list(columns)
+    for name, values in columns.items():
+        np.testing.assert_array_equal(decoded[name], values)
+        assert np.shares_memory(decoded[name], np.frombuffer(payload, dtype=np.uint8))
+    assert decoded['big_endian'].dtype == np.dtype('<i4')
+
+    assert decode(encode({}))[1] == 0
+    with pytest.raises(ColumnarError):
+        encode({'a': np.arange(3), 'b': np.arange(4)})
+    with pytest.raises(ColumnarError):
+        encode({'s': np.array(['x'])})
+    for broken in (b'', b'JSON' + payload[4:], payload[:-8], payload[:20]):
+        with pytest.raises(ColumnarError):
+            decode(broken)
+
+
+def test_batch_endpoint_negotiates_columnar_io():
+    client = app.test_client()
+    expected = client.post('/api/predict/batch', json={'profiles': PROFILES}).get_json()['predictions']
+
+    response = client.post('/api/predict/batch', data=encode(_columns(PROFILES)), content_type=MEDIA_TYPE)
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['predictions'] == expected
+
+    response = client.post('/api/predict/batch', json={'profiles': PROFILES},
+                           headers={'Accept': f'{MEDIA_TYPE}, application/json;q=0.5'})
+    assert response.mimetype == MEDIA_TYPE
+    columns, n = decode(response.get_data())
+    assert n == 3 and list(columns) == ['readiness', 'likelihood', 'currPower', 'futureEquity']
+    assert [{name: int(values[i]) for name, values in columns.items()} for i in range(n)] == expected
+
+    # Missing columns take the /api/predict defaults
+    partial = {name: _columns(PROFILES)[name] for name in ('income', 'equity', 'target')}
+    defaults = [{**{'savings': 0, 'years': 1, 'rate': 5.0, 'marital': 'single', 'kids': 0}, **p}
+                for p in ({name: p[name] for name in partial} for p in PROFILES)]
+    response = client.post('/api/predict/batch', data=encode(partial), content_type=MEDIA_TYPE)
+    assert response.get_json()['predictions'] == \
+        client.post('/api/predict/batch', json={'profiles': defaults}).get_json()['predictions']
+
+
+def test_columnar_input_validation_and_projection():
+    client = app.test_client()
+    bad_target = _columns(PROFILES)
+    bad_target['target'][1] = 0
+    float_years = dict(_columns(PROFILES), years=np.array([5.0, 20.0, 12.0]))
+    nan_income = _columns(PROFILES)
+    nan_income['income'][2] = np.nan
+    for payload in (encode(bad_target), encode(float_years), encode(nan_income), encode({}), b'garbage'):
+        assert client.post('/api/predict/batch', data=payload, content_type=MEDIA_TYPE).status_code == 400
+
+    profile = dict(PROFILES[0], maxYears=10)
+    series = client.post('/api/projection', json=profile).get_json()
+    response = client.post('/api/projection', json=profile, headers={'Accept': MEDIA_TYPE})
+    columns, n = decode(response.get_data())
+    assert n == 10 and {name: values.tolist() for name, values in columns.items()} == \
+        {name: series[name] for name in columns}
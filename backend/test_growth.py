@@ -0,0 +1,57 @@
+"""
+Regression tests: closed-form growth must match the original month-by-month loop
+"""
+import numpy as np
+
+from growth import future_value, future_value_by_horizon, horizon_months, monthly_rate
+
+
+def _loop_future_value(equity, savings, rate, years):
+    """The compounding loop formerly used by train_models / predict_likelihood"""
+    monthly = (rate / 100) / 12
+    months = int(years * 12)
+    future_equity = equity
+    for _ in range(months):
+        future_equity = (future_equity * (1 + monthly)) + savings
+    return future_equity
+
+
+def test_matches_loop_for_random_profiles():
+    rng = np.random.default_rng(0)
+    equities = rng.uniform(0, 300000, 2000)
+    savings = rng.uniform(0, 3000, 2000)
+    rates = rng.uniform(0.0, 10.0, 2000)
+    years = rng.uniform(0, 30, 2000)
+
+    closed = future_value(equities, savings, monthly_rate(rates), horizon_months(years))
+    loop = np.array([_loop_future_value(*args) for args in zip(equities, savings, rates, years)])
+
+    np.testing.assert_allclose(closed, loop, rtol=1e-10, atol=1e-6)
+
+
+def test_edge_cases_match_loop():
+    cases = [
+        (50000.0, 800.0, 0.0, 10),     # zero rate degenerates to equity + savings * months
+        (50000.0, 800.0, 5.0, 0),      # zero horizon leaves equity unchanged
+        (0.0, 0.0, 5.0, 15),           # nothing to compound
+        (10000.0, 500.0, 1e-9, 30),    # tiny rate stays accurate
+        (10000.0, 500.0, 5.0, -2),     # negative horizon behaves like range(negative)
+        (10000.0, 500.0, 7.5, 2.99),   # fractional years are truncated to whole months
+    ]
+    for equity, savings, rate, years in cases:
+        closed = float(future_value(equity, savings, monthly_rate(rate), horizon_months(years)))
+        assert np.isclose(closed, _loop_future_value(equity, savings, rate, years), rtol=1e-12, atol=1e-6)
+
+
+def test_by_horizon_matches_loop_per_year():
+    equities = [10000.0, 75000.0]
+    savings = [500.0, 1200.0]
+    rates = [2.5, 7.5]
+    years = np.arange(1, 31)
+
+    grid = future_value_by_horizon(equities, savings, monthly_rate(rates), years * 12)
+
+    assert grid.shape == (2, 30)
+    for i in range(2):
+        for j, y in enumerate(years):
+            assert np.isclose(grid[i, j], _loop_future_value(equities[i], savings[i], rates[i], y), rtol=1e-12)
@@ -0,0 +1,66 @@
+"""
+Parity tests: compiled NumPy scorers must reproduce sklearn outputs exactly
+"""
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import PolynomialFeatures
+
+from inference import CompiledLinearModel, CompiledPolynomialModel
+from server import predictor
+
+
+def _rows(n_features, n_rows=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    # Mix of realistic magnitudes (incomes, targets, ratios) and sign changes
+    scales = 10.0 ** rng.integers(-1, 6, n_features)
+    return rng.normal(0, 1, (n_rows, n_features)) * scales
+
+
+def test_readiness_scorer_matches_sklearn():
+    X = _rows(9)
+    expected = predictor.readiness_model.predict(predictor.poly_features.transform(X))
+    np.testing.assert_array_equal(predictor.compiled_readiness.predict(X), expected)
+
+    for row in X[:50]:
+        single = predictor.readiness_model.predict(predictor.poly_features.transform(row[None, :]))
+        np.testing.assert_array_equal(predictor.compiled_readiness.predict(row), single)
+
+
+def test_linear_scorers_match_sklearn():
+    X = _rows(11)
+    np.testing.assert_array_equal(predictor.compiled_likelihood.predict(X),
+                                  predictor.likelihood_model.predict(X))
+    X = _rows(6)
+    np.testing.assert_array_equal(predictor.compiled_property_price.predict(X),
+                                  predictor.property_price_model.predict(X))
+
+
+@pytest.mark.parametrize('interaction_only,include_bias', [(False, True), (True, True), (False, False)])
+def test_polynomial_expansion_matches_transform(interaction_only, include_bias):
+    X = _rows(4, n_rows=200)
+    poly = PolynomialFeatures(degree=2, interaction_only=interaction_only, include_bias=include_bias)
+    X_poly = poly.fit_transform(X)
+    model = LinearRegression().fit(X_poly, X[:, 0] + X[:, 1] * X[:, 2])
+
+    compiled = CompiledPolynomialModel(poly, model)
+
+    np.testing.assert_array_equal(compiled.features(X), X_poly)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X_poly))
+
+
+# Higher degrees of dollar amounts are ill-conditioned by design (as in selection.py)
+@pytest.mark.filterwarnings('ignore::scipy.linalg.LinAlgWarning')
+@pytest.mark.parametrize('degree,interaction_only,n_inputs', [(3, False, 3), (4, False, 3), (3, True, 2)])
+def test_higher_degree_expansion_matches_transform(degree, interaction_only, n_inputs):
+    X = _rows(n_inputs, n_rows=50)
+    poly = PolynomialFeatures(degree=degree, interaction_only=interaction_only)
+    X_poly = poly.fit_transform(X)
+    model = Ridge(alpha=1.0).fit(X_poly, X[:, 0])
+
+    compiled = CompiledPolynomialModel(poly, model)
+
+    # Products of three or more factors are rounded in another order than sklearn's
+    np.testing.assert_allclose(compiled.features(X), X_poly, rtol=1e-12)
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X_poly), rtol=1e-9)
+    assert CompiledLinearModel(model).n_features == poly.n_output_features_
@@ -0,0 +1,76 @@
+"""
+Tests for background retraining and the atomic model swap
+"""
+import threading
+import time
+
+from jobs import BackgroundJobs
+from server import app, predictor, retrain_jobs
+
+
+def test_job_lifecycle_and_progress():
+    jobs = BackgroundJobs()
+    release = threading.Event()
+
+    def task(progress):
+        progress(0.5, 'halfway')
+        release.wait(5)
+        return {'answer': 42}
+
+    job = jobs.submit('demo', task)
+    assert job['status'] in ('queued', 'running')
+    # A second submit of the same kind joins the running job
+    assert jobs.submit('demo', task)['id'] == job['id']
+
+    release.set()
+    done = jobs.wait(job['id'], timeout=5)
+    assert done['status'] == 'succeeded'
+    assert done['progress'] == 1.0
+    assert done['result'] == {'answer': 42}
+
+
+def test_failed_job_reports_error():
+    jobs = BackgroundJobs()
+    job = jobs.submit('demo', lambda progress: 1 / 0)
+    done = jobs.wait(job['id'], timeout=5)
+    assert done['status'] == 'failed'
+    assert 'division' in done['error']
+
+
+def test_retrain_endpoint_swaps_models_without_blocking_requests():
+    profile = {"income": 6000, "equity": 75000, "savings": 1200, "target": 450000,
+               "years": 7, "rate": 5.0, "marital": "married", "kids": 2}
+    old_models = predictor.models
+    errors = []
+    stop = threading.Event()
+
+    def hammer():
+        with app.test_client() as client:
+            while not stop.is_set():
+                response = client.post('/api/predict', json=profile)
+                if response.status_code != 200:
+                    errors.append(response.get_json())
+
+    workers = [threading.Thread(target=hammer) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+
+    with app.test_client() as client:
+        started = time.perf_counter()
+        response = client.post('/api/retrain')
+        assert time.perf_counter() - started < 1.0
+        assert response.status_code == 202
+        job = response.get_json()['job']
+
+        retrain_jobs.wait(job['id'], timeout=30)
+        status = client.get(f"/api/retrain/{job['id']}").get_json()
+        assert client.get('/api/retrain/unknown').status_code == 404
+
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    assert status['status'] == 'succeeded'
+    assert status['result']['generation'] == predictor.models.generation
+    assert predictor.models is not old_models
+    assert errors == []
@@ -0,0 +1,176 @@
+"""
+Tests for the listings proxy, run against a local stub of the upstream API
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import listings
+import server
+from listings import ListingsProxy, filter_listings, sort_listings
+
+TOTAL_LISTINGS = 450
+
+
+def _listing(i):
+    return {
+        'id': i,
+        'title': f'Listing {i}',
+        'buyingPrice': None if i % 50 == 0 else 100000 + (i * 7919) % 600000,
+        'squareMeter': 40 + i % 120,
+        'rooms': 1 + i % 5,
+        'constructionYear': 1950 + i % 70,
+        'publishDate': f'2025-{1 + i % 12:02d}-01T00:00:00Z'
+    }
+
+
+class StubUpstream:
+    """Minimal ThinkImmo stand-in: pages over TOTAL_LISTINGS synthetic rows"""
+
+    def __init__(self):
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.requests.append(body)
+                start = body['from'] - 1
+                rows = [_listing(i) for i in range(start, min(start + body['size'], TOTAL_LISTINGS))]
+                payload = json.dumps({'results': rows}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/thinkimmo'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def upstream():
+    stub = StubUpstream()
+    yield stub
+    stub.close()
+
+
+def test_pages_are_cached_and_next_page_prefetched(upstream):
+    proxy = ListingsProxy(upstream.url, page_size=200)
+
+    first = proxy.search('Munich')
+    assert first['loaded'] == 200 and first['hasMore']
+    proxy.drain(timeout=10)  # let the prefetch of page 1 land
+
+    assert sorted(r['from'] for r in upstream.requests) == [1, 201]
+    assert upstream.requests[0]['geoSearches']['geoSearchQuery'] == 'Munich'
+
+    # A scroll past the prefetched page fetches only what is missing
+    second = proxy.search('munich ', offset=first['nextOffset'], limit=400)
+    assert second['loaded'] == TOTAL_LISTINGS
+    assert not second['hasMore']
+    assert sorted(r['from'] for r in upstream.requests) == [1, 201, 401]
+    assert proxy.stats()['hits'] >= 1
+
+
+def test_budget_filter_and_sort_on_server(upstream):
+    proxy = ListingsProxy(upstream.url, page_size=200)
+    result = proxy.search('Berlin', filters={'maxPrice': 300000, 'priceListedOnly': True, 'minRooms': 2},
+                          sort_key='buyingPrice', sort_order='desc', limit=25)
+
+    rows = result['results']
+    assert len(rows) == 25
+    assert result['total'] > 25
+    prices = [row['buyingPrice'] for row in rows]
+    assert prices == sorted(prices, reverse=True)
+    assert all(price <= 300000 for price in prices)
+    assert all(row['rooms'] >= 2 for row in rows)
+
+
+def test_scroll_pages_append_without_reloading(upstream, monkeypatch):
+    proxy = ListingsProxy(upstream.url, page_size=200)
+    filtered = []
+    monkeypatch.setattr(listings, 'filter_listings',
+                        lambda items, filters: filtered.append(len(items)) or filter_listings(items, filters))
+    filters = {'priceListedOnly': True}
+
+    # The stub returns rows by id, so sorting by id is the upstream order: exactly sorted
+    pages, offset = [], 0
+    while True:
+        page = proxy.search('Leipzig', offset=offset, limit=100, filters=filters, sort_key='id')
+        pages.append(page['results'])
+        offset = page['nextOffset']
+        if not page['hasMore']:
+            break
+
+    # Every upstream row is filtered once, however many scroll pages there were
+    assert sum(filtered) == TOTAL_LISTINGS and len(pages) == 5
+    rows = [row for page in pages for row in page]
+    assert [row['id'] for row in rows] == [row['id'] for row in sort_listings(
+        filter_listings([_listing(i) for i in range(TOTAL_LISTINGS)], filters), 'id')]
+
+    # Descending order over several upstream pages: rows already returned never move
+    first = proxy.search('Leipzig', limit=150, sort_key='squareMeter', sort_order='desc')
+    rest = proxy.search('Leipzig', offset=150, limit=1000, sort_key='squareMeter', sort_order='desc')
+    ids = [row['id'] for row in first['results'] + rest['results']]
+    assert len(ids) == len(set(ids)) == TOTAL_LISTINGS
+    assert proxy.search('Leipzig', limit=150, sort_key='squareMeter', sort_order='desc')['results'] == \
+        first['results']
+
+
+def test_filter_and_sort_helpers_follow_buy_js():
+    items = [{'buyingPrice': 200000, 'rooms': 3}, {'buyingPrice': None, 'rooms': 2},
+             {'buyingPrice': 150000, 'rooms': None}]
+
+    # Missing values pass range filters unless a minimum price is set
+    assert len(filter_listings(items, {'maxPrice': 180000})) == 2
+    assert len(filter_listings(items, {'minPrice': 100000})) == 2
+    assert len(filter_listings(items, {'priceListedOnly': True, 'minRooms': 3})) == 2
+
+    # Missing sort values go last ascending, first descending
+    assert [i['buyingPrice'] for i in sort_listings(items, 'buyingPrice', 'asc')] == [150000, 200000, None]
+    assert [i['buyingPrice'] for i in sort_listings(items, 'buyingPrice', 'desc')] == [None, 200000, 150000]
+
+    desired = {'target': 200000, 'rooms': 3}
+    assert sort_listings(items, 'recommendation', 'desc', desired)[0]['buyingPrice'] == 200000
+
+
+def test_listings_endpoint(upstream, monkeypatch):
+    monkeypatch.setattr(server, 'listings_proxy', ListingsProxy(upstream.url, page_size=200))
+
+    with server.app.test_client() as client:
+        response = client.post('/api/listings', json={
+            'location': 'Hamburg', 'limit': 10,
+            'filters': {'maxPrice': 400000, 'sortKey': 'buyingPrice', 'sortOrder': 'asc'}
+        })
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['results']) == 10
+        assert body['hasMore'] and body['nextOffset'] == 10
+
+        following = client.post('/api/listings', json={
+            'location': 'Hamburg', 'offset': 10, 'limit': 10,
+            'filters': {'maxPrice': 400000, 'sortKey': 'buyingPrice', 'sortOrder': 'asc'}
+        }).get_json()
+        assert following['results'][0]['buyingPrice'] >= body['results'][-1]['buyingPrice']
+        assert not {r['id'] for r in following['results']} & {r['id'] for r in body['results']}
+
+        assert client.post('/api/listings', json={'limit': 10}).status_code == 400
+        assert client.post('/api/listings', json={'location': 'Hamburg', 'offset': -1}).status_code == 400
+
+
+def test_upstream_failure_maps_to_bad_gateway(monkeypatch):
+    monkeypatch.setattr(server, 'listings_proxy', ListingsProxy('http://127.0.0.1:9/none', timeout=1))
+    with server.app.test_client() as client:
+        response = client.post('/api/listings', json={'location': 'Cologne'})
+    assert response.status_code == 502
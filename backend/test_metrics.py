@@ -0,0 +1,97 @@
+"""
+Tests for request/stage instrumentation and the /api/metrics endpoint
+"""
+import re
+
+from metrics import (Counter, Histogram, Registry, finish_request, mark, prediction_branch,
+                     stage_duration, start_request)
+from server import app
+
+
+def _sample(text, name, **labels):
+    """Value of one exposition sample (None if absent)"""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = re.escape(f'{name}{{{label_text}}}' if labels else name) + r' (\S+)$'
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('h_seconds', 'test', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, '/x')
+
+    text = '\n'.join(histogram.render())
+    assert _sample(text, 'h_seconds_bucket', route='/x', le='0.1') == 1
+    assert _sample(text, 'h_seconds_bucket', route='/x', le='1.0') == 3
+    assert _sample(text, 'h_seconds_bucket', route='/x', le='+Inf') == 4
+    assert _sample(text, 'h_seconds_count', route='/x') == 4
+    assert _sample(text, 'h_seconds_sum', route='/x') == 6.05
+
+
+def test_registry_renders_counters_and_escapes_labels():
+    registry = Registry()
+    counter = registry.register(Counter('c_total', 'test', ('name',)))
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    registry.add_collector(lambda: ['# TYPE extra gauge', 'extra 1'])
+
+    text = registry.render()
+    assert '# TYPE c_total counter' in text
+    assert 'c_total{name="a\\"b"} 3' in text
+    assert text.endswith('extra 1\n')
+
+
+def test_repeated_stages_are_summed_per_request():
+    before = stage_duration.count('/unit', 'predict')
+    start_request('/unit')
+    mark('parse')
+    mark('predict')
+    mark('predict')
+    finish_request(200)
+
+    # One observation per stage per request, plus the trailing serialize stage
+    assert stage_duration.count('/unit', 'predict') == before + 1
+    assert stage_duration.count('/unit', 'serialize') >= 1
+
+    # Outside a request marks are ignored
+    mark('predict')
+    assert stage_duration.count('/unit', 'predict') == before + 1
+
+
+def test_metrics_endpoint_reports_stages_and_branches():
+    client = app.test_client()
+    ml_before = prediction_branch.value('readiness', 'ml')
+    formula_before = prediction_branch.value('readiness', 'formula')
+
+    # In bounds -> ML branch; income above the training range -> formula branch
+    profile = {'income': 5130, 'equity': 50070, 'savings': 1010, 'target': 400300,
+               'years': 10, 'rate': 5.0, 'marital': 'single', 'kids': 0}
+    assert client.post('/api/predict', json=profile).status_code == 200
+    assert client.post('/api/predict', json=dict(profile, income=40130)).status_code == 200
+
+    assert prediction_branch.value('readiness', 'ml') == ml_before + 1
+    assert prediction_branch.value('readiness', 'formula') == formula_before + 1
+
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    text = response.get_data(as_text=True)
+
+    for stage in ('parse', 'features', 'fallback', 'predict', 'serialize'):
+        assert _sample(text, 'rge_stage_duration_seconds_count', route='/api/predict', stage=stage) >= 1
+    assert _sample(text, 'rge_requests_total', route='/api/predict', status='200') >= 2
+    assert _sample(text, 'rge_request_duration_seconds_count', route='/api/predict') >= 2
+    assert _sample(text, 'rge_prediction_rows_total', model='likelihood', branch='formula') >= 1
+    assert 'rge_cache_hits_total{cache="predict"}' in text
+    assert 'rge_model_info{' in text
+
+
+def test_routes_are_labelled_by_rule():
+    client = app.test_client()
+    client.get('/api/retrain/does-not-exist')
+    client.get('/api/no-such-route')
+
+    text = client.get('/api/metrics').get_data(as_text=True)
+    assert _sample(text, 'rge_requests_total', route='/api/retrain/<job_id>', status='404') >= 1
+    assert _sample(text, 'rge_requests_total', route='unmatched', status='404') >= 1
@@ -0,0 +1,210 @@
+"""
+Offline tests for MLPredictor and the prediction endpoints (no live server needed)
+"""
+import numpy as np
+import pytest
+
+from server import MLPredictor, app, predictor
+
+
+def _random_profiles(n, seed=7):
+    """Profiles spanning both the in-bounds (ML) and out-of-bounds (formula) paths"""
+    rng = np.random.default_rng(seed)
+    return {
+        'incomes': rng.uniform(500, 20000, n),
+        'equities': rng.uniform(-10000, 300000, n),
+        'savings': rng.uniform(0, 3000, n),
+        'targets': rng.uniform(50000, 1000000, n),
+        'years': rng.integers(0, 20, n),
+        'rates': rng.choice([1.5, 2.5, 5.0, 7.5, 9.0], n),
+        'marital': rng.choice(['single', 'married'], n),
+        'kids': rng.integers(0, 5, n),
+    }
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_readiness_batch_matches_single_row():
+    p = _random_profiles(500)
+    readiness, curr_power = predictor.predict_readiness_batch(
+        p['incomes'], p['equities'], p['savings'], p['targets'], p['marital'], p['kids']
+    )
+    for i in range(500):
+        expected = predictor.predict_readiness(
+            p['incomes'][i], p['equities'][i], p['savings'][i], p['targets'][i],
+            p['marital'][i], int(p['kids'][i])
+        )
+        assert (readiness[i], curr_power[i]) == expected
+
+
+def test_likelihood_batch_matches_single_row():
+    p = _random_profiles(500)
+    likelihood, future_equity = predictor.predict_likelihood_batch(
+        p['incomes'], p['equities'], p['savings'], p['targets'], p['years'],
+        p['rates'], p['marital'], p['kids']
+    )
+    for i in range(500):
+        expected = predictor.predict_likelihood(
+            p['incomes'][i], p['equities'][i], p['savings'][i], p['targets'][i],
+            int(p['years'][i]), p['rates'][i], p['marital'][i], int(p['kids'][i])
+        )
+        assert (likelihood[i], future_equity[i]) == expected
+
+
+def test_batch_endpoint_matches_single_endpoint(client):
+    profiles = [
+        {"income": 3000, "equity": 10000, "savings": 500, "target": 250000, "years": 3, "rate": 5.0, "marital": "single", "kids": 0},
+        {"income": 6000, "equity": 75000, "savings": 1200, "target": 450000, "years": 7, "rate": 2.5, "marital": "married", "kids": 2},
+        {"income": 25000, "equity": 900000, "savings": 2000, "target": 600000, "years": 20, "rate": 7.5, "marital": "married", "kids": 3},
+    ]
+    response = client.post('/api/predict/batch', json={'profiles': profiles})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == len(profiles)
+
+    for profile, prediction in zip(profiles, body['predictions']):
+        single = client.post('/api/predict', json=profile).get_json()
+        for key in ('readiness', 'likelihood', 'currPower', 'futureEquity'):
+            assert prediction[key] == single[key]
+
+
+def test_batch_rows_match_single_predictions_whatever_the_batch(client):
+    # A numeric marital code is not 'married' on any JSON path, alone or next to strings
+    profile = {"income": 5000, "equity": 50000, "savings": 800, "target": 350000, "years": 5, "rate": 5.0,
+               "marital": 1, "kids": 0}
+    single = client.post('/api/predict', json=profile).get_json()
+    alone = client.post('/api/predict/batch', json={'profiles': [profile]}).get_json()['predictions']
+    mixed = client.post('/api/predict/batch',
+                        json={'profiles': [profile, dict(profile, marital='married')]}).get_json()['predictions']
+    for key in ('readiness', 'likelihood', 'currPower', 'futureEquity'):
+        assert alone[0][key] == mixed[0][key] == single[key]
+    assert mixed[1]['currPower'] != mixed[0]['currPower']
+
+
+def test_batch_endpoint_rejects_invalid_target(client):
+    response = client.post('/api/predict/batch', json={'profiles': [{'target': 0}]})
+    assert response.status_code == 400
+
+    response = client.post('/api/predict/batch', json={'profiles': []})
+    assert response.status_code == 400
+
+
+def test_endpoints_reject_non_finite_values(client):
+    profile = {"income": 5000, "equity": 50000, "savings": 800, "target": 350000, "years": 5}
+    for payload in (dict(profile, target='nan'), dict(profile, income='inf'), dict(profile, years='nan')):
+        response = client.post('/api/predict', json=payload)
+        assert response.status_code == 400
+    assert client.post('/api/projection', json=dict(profile, rate='-inf')).status_code == 400
+
+    response = client.post('/api/predict/batch', json={'profiles': [profile, dict(profile, equity='NaN')]})
+    assert response.status_code == 400
+    assert 'profile 1' in response.get_json()['error']
+
+
+def test_projection_matches_single_predictions(client):
+    profile = {"income": 6000, "equity": 75000, "savings": 1200, "target": 450000,
+               "rate": 7.5, "marital": "married", "kids": 2}
+    response = client.post('/api/projection', json={**profile, 'maxYears': 20})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['years'] == list(range(1, 21))
+
+    for i, year in enumerate(body['years']):
+        single = client.post('/api/predict', json={**profile, 'years': year}).get_json()
+        assert body['likelihood'][i] == single['likelihood']
+        assert body['equity'][i] == single['futureEquity']
+    assert body['purchasingPower'][0] > body['equity'][0]
+    assert body['purchasingPower'] == sorted(body['purchasingPower'])
+
+
+def test_projection_rejects_invalid_horizon(client):
+    response = client.post('/api/projection', json={'target': 300000, 'maxYears': 0})
+    assert response.status_code == 400
+
+
+def test_training_is_reproducible_and_leaves_global_rng_alone():
+    np.random.seed(123)
+    expected_draw = np.random.random()
+    np.random.seed(123)
+
+    first = MLPredictor(n_samples=2000)
+    second = MLPredictor(n_samples=2000)
+
+    assert np.random.random() == expected_draw
+    np.testing.assert_array_equal(first.readiness_model.coef_, second.readiness_model.coef_)
+    np.testing.assert_array_equal(first.property_price_model.coef_, second.property_price_model.coef_)
+    assert first.scores['property_price'] > 0.9
+
+
+def test_training_fits_match_in_memory_least_squares():
+    from sklearn.linear_model import LinearRegression
+
+    from training_data import likelihood_dataset, property_dataset, readiness_dataset, sample_profiles
+
+    models = MLPredictor(n_samples=2000, lazy=True).build_models()
+    rng = np.random.default_rng(42)  # the generator build_models draws from (seed 42)
+    profiles = sample_profiles(rng, 2000)
+    readiness_dataset(rng, profiles)
+    X, y = likelihood_dataset(rng, profiles)
+    reference = LinearRegression().fit(X, y)
+    np.testing.assert_allclose(models.likelihood_model.coef_, reference.coef_, rtol=1e-7)
+    assert models.scores['likelihood'] == pytest.approx(reference.score(X, y))
+    X, y = property_dataset(rng, 2000)
+    np.testing.assert_allclose(models.property_price_model.coef_, LinearRegression().fit(X, y).coef_, rtol=1e-7)
+
+
+def test_property_price_batch_matches_single_row():
+    rng = np.random.default_rng(11)
+    n = 400
+    sqm = rng.uniform(20, 400, n)
+    rooms = rng.integers(0, 8, n).astype(float)
+    bathrooms = rng.integers(0, 4, n).astype(float)
+    locations = rng.choice(['rural', 'city', 'premium', 'unknown'], n)
+    conditions = rng.choice(['renovation', 'good', 'new', 'other'], n)
+    years_built = rng.integers(1850, 2030, n)
+
+    prices = predictor.predict_property_price_batch(sqm, rooms, bathrooms, locations, conditions, years_built)
+
+    for i in range(n):
+        assert prices[i] == predictor.predict_property_price(
+            sqm[i], rooms[i], bathrooms[i], locations[i], conditions[i], int(years_built[i])
+        )
+
+
+def test_listings_valuation_endpoint(client):
+    listings = [
+        {"id": "a", "sqm": 80, "rooms": 2, "bathrooms": 1, "location": "city",
+         "condition": "good", "yearBuilt": 2015, "askingPrice": 300000},
+        {"id": "b", "sqm": 200, "rooms": 6, "bathrooms": 3, "location": "premium",
+         "condition": "new", "yearBuilt": 2022},
+    ]
+    response = client.post('/api/listings/valuation', json={'listings': listings, 'purchasingPower': 350000})
+    assert response.status_code == 200
+    first, second = response.get_json()['valuations']
+
+    single = client.post('/api/predict-property-price', json=listings[0]).get_json()
+    assert first['predictedPrice'] == single['predictedPrice']
+    assert first['valuationRatio'] == round(300000 / single['predictedPrice'], 4)
+    assert first['affordable'] is True
+    assert second['id'] == 'b'
+    assert second['valuationRatio'] is None and second['affordable'] is None
+
+    bad = client.post('/api/listings/valuation', json={'listings': [{'sqm': 0}]})
+    assert bad.status_code == 400
+
+
+def test_listings_valuation_rejects_unparsable_rows(client):
+    listing = {"sqm": 80, "rooms": 2, "bathrooms": 1, "askingPrice": 300000}
+    response = client.post('/api/listings/valuation',
+                           json={'listings': [listing, dict(listing, askingPrice='n/a')]})
+    assert response.status_code == 400
+    assert 'listing 1' in response.get_json()['error']
+
+    response = client.post('/api/listings/valuation', json={'listings': [listing, [80]]})
+    assert response.status_code == 400
+    assert 'listing 1' in response.get_json()['error']
@@ -0,0 +1,125 @@
+"""
+Tests for region-sharded property price models
+"""
+import os
+import time
+
+import regions
+from regions import RegionModelRegistry, build_synthetic_regions, region_key
+from server import app, predictor, region_models
+
+
+def test_region_key_normalizes_names():
+    assert region_key(' München ') == 'muenchen'
+    assert region_key('Frankfurt am Main') == 'frankfurt-am-main'
+    assert region_key('KÖLN') == 'koeln'
+    assert region_key(None) == ''
+
+
+def test_lazy_load_and_lru_residency(tmp_path):
+    build_synthetic_regions(tmp_path, {'Aachen': 1.0, 'Bonn': 1.2, 'Celle': 0.8}, n_samples=200)
+    registry = RegionModelRegistry(str(tmp_path), max_resident=2)
+
+    assert registry.stats()['available'] == 3
+    assert registry.stats()['resident'] == 0  # nothing is loaded up front
+    assert registry.get('Nowhere') == (None, 'unknown')
+
+    assert registry.get('Aachen')[1] == 'loaded'
+    assert registry.get('aachen')[1] == 'resident'
+    registry.get('Bonn')
+    registry.get('Celle')  # evicts Aachen, the least recently used
+
+    stats = registry.stats()
+    assert (stats['resident'], stats['loads'], stats['evictions'], stats['hits']) == (2, 3, 1, 1)
+    assert registry.get('Aachen')[1] == 'loaded'
+
+
+def test_slow_cold_load_falls_back_then_becomes_resident(tmp_path, monkeypatch):
+    build_synthetic_regions(tmp_path, {'Aachen': 1.0}, n_samples=200)
+    read_artifact = regions.read_artifact
+
+    def slow_read(*args):
+        time.sleep(0.2)
+        return read_artifact(*args)
+
+    monkeypatch.setattr(regions, 'read_artifact', slow_read)
+    registry = RegionModelRegistry(str(tmp_path), load_timeout_ms=20)
+
+    started = time.perf_counter()
+    assert registry.get('Aachen') == (None, 'loading')
+    assert time.perf_counter() - started < 0.15  # bounded by the timeout, not the load
+
+    deadline = time.time() + 5
+    while registry.stats()['resident'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert registry.get('Aachen')[1] == 'resident'
+
+
+def test_corrupt_region_falls_back(tmp_path):
+    build_synthetic_regions(tmp_path, {'Aachen': 1.0}, n_samples=200)
+    with open(os.path.join(tmp_path, 'aachen.npz'), 'ab') as f:
+        f.write(b'tampered')
+    registry = RegionModelRegistry(str(tmp_path))
+
+    assert registry.get('Aachen') == (None, 'failed')
+    assert registry.get('Aachen') == (None, 'failed')  # not retried until refresh()
+    assert registry.stats()['load_failures'] == 1
+
+
+def test_unreadable_region_archive_falls_back(tmp_path, monkeypatch):
+    build_synthetic_regions(tmp_path, {'Aachen': 1.0, 'Bonn': 1.0}, n_samples=200)
+
+    def unreadable(path, fingerprint):
+        raise OSError('truncated archive')
+
+    monkeypatch.setattr(regions, 'read_artifact', unreadable)
+    registry = RegionModelRegistry(str(tmp_path))
+    for _ in range(2):
+        assert registry.get('Aachen') == (None, 'failed')
+    assert not registry._loading and registry.stats()['load_failures'] == 1
+
+    # A loader that raises past its own handling still leaves the global model in charge
+    def broken(key, path):
+        raise RuntimeError('loader crashed')
+
+    monkeypatch.setattr(registry, '_load', broken)
+    assert registry.get('Bonn') == (None, 'failed')
+    assert not registry._loading and registry.get('Bonn') == (None, 'failed')
+
+
+def test_regional_model_scales_prices(tmp_path):
+    build_synthetic_regions(tmp_path, {'Expensive': 1.5}, n_samples=2000)
+    model, _ = RegionModelRegistry(str(tmp_path)).get('Expensive')
+
+    args = (120, 4, 2, 'city', 'good', 1995)
+    regional = predictor.predict_property_price(*args, model=model)
+    assert 1.3 < regional / predictor.predict_property_price(*args) < 1.7
+
+    batch = predictor.predict_property_price_batch([120], [4], [2], ['city'], ['good'], [1995], model=model)
+    assert batch.tolist() == [regional]
+
+
+def test_endpoints_use_regional_models():
+    build_synthetic_regions(region_models.directory, {'Teststadt': 1.5}, n_samples=500)
+    region_models.refresh()
+    client = app.test_client()
+    payload = {'sqm': 95, 'rooms': 3, 'bathrooms': 1, 'location': 'city', 'condition': 'good',
+               'yearBuilt': 1990}
+
+    plain = client.post('/api/predict-property-price', json=payload).get_json()
+    regional = client.post('/api/predict-property-price', json=dict(payload, region='Teststadt')).get_json()
+    unknown = client.post('/api/predict-property-price', json=dict(payload, region='Atlantis')).get_json()
+
+    assert plain['region'] is None
+    assert regional['region']['model'] == 'region' and regional['region']['version']
+    assert regional['predictedPrice'] > plain['predictedPrice']
+    assert unknown['region'] == {'name': 'Atlantis', 'model': 'global', 'status': 'unknown', 'version': None}
+    assert unknown['predictedPrice'] == plain['predictedPrice']
+
+    listing = dict(payload, askingPrice=300000)
+    valuation = client.post('/api/listings/valuation', json={
+        'listings': [listing], 'purchasingPower': 400000, 'region': 'Teststadt'
+    }).get_json()
+    assert valuation['valuations'][0]['predictedPrice'] == regional['predictedPrice']
+    assert client.get('/api/health').get_json()['regions']['available'] >= 1
+    assert region_models.stats()['fallbacks'] >= 1
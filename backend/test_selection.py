@@ -0,0 +1,53 @@
+"""
+Tests for the cross-validated model selection under a latency budget (selection.py)
+"""
+import json
+
+import selection
+from selection import PRODUCTION, main, select_models
+
+
+def test_selection_picks_lowest_error_within_budget():
+    report = select_models(n_samples=300, folds=3, degrees=(1, 2), alphas=(0.0, 1.0))
+    assert set(report['models']) == set(PRODUCTION)
+    for name, result in report['models'].items():
+        candidates = result['candidates']
+        assert len(candidates) == 4
+        assert [(c['degree'], c['alpha']) for c in candidates if c['production']] == [PRODUCTION[name]]
+        assert all(c['latency_us'] > 0 and c['cv_seconds'] > 0 and c['n_features'] > 0 for c in candidates)
+
+        eligible = [c for c in candidates if c['latency_us'] <= result['latency_budget_us']]
+        best = min(eligible, key=lambda c: c['cv_rmse'])
+        assert [c for c in candidates if c['recommended']] == [best]
+        assert result['recommended'] == {'degree': best['degree'], 'alpha': best['alpha']}
+
+    # Pool workers report the same accuracy as the in-process run
+    pooled = select_models(n_samples=300, folds=3, workers=2, degrees=(1, 2), alphas=(0.0, 1.0))
+    for name, result in report['models'].items():
+        assert [c['cv_rmse'] for c in pooled['models'][name]['candidates']] == \
+            [c['cv_rmse'] for c in result['candidates']]
+
+
+def test_slightly_better_but_slow_candidate_is_rejected(monkeypatch):
+    # Degree 2 ten times slower than production for every model
+    monkeypatch.setattr(selection, '_latency_us', lambda fitted, X: 50.0 if hasattr(fitted, 'steps') else 5.0)
+    report = select_models(n_samples=300, folds=3, degrees=(1, 2), alphas=(0.0,), latency_budget=3)
+
+    likelihood = report['models']['likelihood']
+    slow = next(c for c in likelihood['candidates'] if c['degree'] == 2)
+    assert slow['cv_rmse'] < next(c for c in likelihood['candidates'] if c['production'])['cv_rmse']
+    assert not slow['within_budget'] and likelihood['recommended'] == {'degree': 1, 'alpha': 0.0}
+    assert likelihood['latency_budget_us'] == 15.0
+    # Readiness is served at degree 2 already, so its budget scales with that
+    assert report['models']['readiness']['recommended']['degree'] == 2
+
+
+def test_cli_writes_report(tmp_path, capsys):
+    path = tmp_path / 'report.json'
+    assert main(['--samples', '200', '--folds', '3', '--workers', '1', '--degrees', '1', '--alphas', '0', '1',
+                 '--report', str(path)]) == 0
+
+    report = json.loads(path.read_text())
+    assert (report['n_samples'], report['folds'], report['workers']) == (200, 3, 1)
+    assert sum(c['recommended'] for c in report['models']['property_price']['candidates']) == 1
+    assert 'Report written to' in capsys.readouterr().out
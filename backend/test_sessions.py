@@ -0,0 +1,170 @@
+"""
+Tests for live what-if sessions (sessions.py, /api/session)
+"""
+import json
+import threading
+
+import pytest
+
+from server import app, predictor
+from sessions import SessionClosed, SessionStore, parse_fields
+
+PROFILE = {'income': 5000, 'equity': 60000, 'savings': 900, 'target': 400000, 'years': 6, 'rate': 5.0,
+           'marital': 'married', 'kids': 1}
+
+
+class CountingPredictor:
+    """Records which predictor methods a session evaluation calls"""
+
+    def __init__(self):
+        self.generation = predictor.generation
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(predictor, name)
+
+        def call(*args):
+            self.calls.append(name)
+            return method(*args)
+        return call
+
+
+def _events(stream, count):
+    """First `count` update events of an SSE body iterator"""
+    events, buffer = [], ''
+    for chunk in stream:
+        buffer += chunk.decode() if isinstance(chunk, bytes) else chunk
+        while '\n\n' in buffer:
+            message, buffer = buffer.split('\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+            if fields:
+                events.append((fields['event'], json.loads(fields['data'])))
+        if len(events) >= count:
+            return events
+    return events
+
+
+def test_updates_recompute_only_affected_outputs():
+    counting = CountingPredictor()
+    store = SessionStore(counting)
+    session = store.create(parse_fields(PROFILE, partial=False))
+    session.attach()
+
+    version, first = store.evaluate(session)
+    assert version == 1 and set(first) == {'readiness', 'currPower', 'adjustedIncome', 'projection',
+                                           'likelihood', 'futureEquity'}
+    assert (first['likelihood'], first['futureEquity']) == predictor.predict_likelihood(
+        5000.0, 60000.0, 900.0, 400000.0, 6, 5.0, 'married', 1)
+    assert first['adjustedIncome'] == 5000 - 700
+
+    # Years inside the projection: read from it, no model call
+    counting.calls.clear()
+    session.update({'years': 12})
+    _, result = store.evaluate(session)
+    assert set(result) == {'likelihood', 'futureEquity'} and counting.calls == []
+    assert result['likelihood'] == first['projection']['likelihood'][11]
+
+    session.update({'rate': 7.5})
+    _, result = store.evaluate(session)
+    assert 'readiness' not in result and counting.calls == ['predict_projection']
+
+    session.update({'years': 45})  # beyond maxYears 30
+    assert store.evaluate(session)[1]['likelihood'] == predictor.predict_likelihood(
+        5000.0, 60000.0, 900.0, 400000.0, 45, 7.5, 'married', 1)[0]
+
+    assert session.update({'income': 5000.0}) == (True, session.version)  # no change, no new version
+    assert session.update({'income': 6000}, seq=5)[0]
+    assert session.update({'income': 4000}, seq=4) == (False, session.version)
+    assert session.profile['income'] == 6000
+
+
+def test_stream_skips_superseded_updates():
+    store = SessionStore(predictor, heartbeat=0.05)
+    session = store.create(parse_fields(PROFILE, partial=False))
+    stream = store.stream(session)
+    assert _events(stream, 1)[0][1]['version'] == 1
+
+    # Three slider moves before the stream wakes up: one event for the newest profile
+    for years in (7, 8, 9):
+        session.update({'years': years})
+    event, data = _events(stream, 1)[0]
+    assert event == 'update' and data['version'] == 4
+    assert data['likelihood'] == predictor.predict_likelihood(5000.0, 60000.0, 900.0, 400000.0, 9, 5.0,
+                                                              'married', 1)[0]
+    assert next(stream) == ': keep-alive\n\n'
+
+    # Input arriving during an evaluation: that result is merged into the next event
+    original = store.evaluate
+
+    def evaluate_then_update(s):
+        result = original(s)
+        if s.profile['kids'] == 2:
+            s.update({'target': 500000})
+        return result
+
+    store.evaluate = evaluate_then_update
+    session.update({'kids': 2})
+    data = _events(stream, 1)[0][1]
+    assert data['version'] == 6 and 'readiness' in data and store.stats()['superseded'] == 1
+
+    store.close(session.id)
+    assert _events(stream, 1)[0][0] == 'closed'
+    with pytest.raises(SessionClosed):
+        session.update({'years': 3})
+
+
+def test_session_endpoints_stream_updates():
+    client = app.test_client()
+    assert client.post('/api/session', json=dict(PROFILE, target=0)).status_code == 400
+    assert client.post('/api/session', json=dict(PROFILE, colour='red')).status_code == 400
+
+    response = client.post('/api/session', json=PROFILE)
+    assert response.status_code == 201
+    session_id = response.get_json()['session']
+    stream = client.get(f'/api/session/{session_id}/stream')
+    assert stream.mimetype == 'text/event-stream'
+    body = stream.response
+    first = _events(body, 1)[0][1]
+    assert len(first['projection']['years']) == 30
+
+    patched = client.patch(f'/api/session/{session_id}', json={'years': 10, 'seq': 1}).get_json()
+    assert patched == {'applied': True, 'version': 2, 'profile': dict(PROFILE, years=10, maxYears=30)}
+    # A dropped update answers with the profile the session actually holds
+    late = client.patch(f'/api/session/{session_id}', json={'years': 3, 'seq': 1}).get_json()
+    assert late['applied'] is False and late['profile']['years'] == 10
+    assert client.patch(f'/api/session/{session_id}', json={'kids': 'many'}).status_code == 400
+    assert client.patch(f'/api/session/{session_id}', json={'years': 0}).status_code == 400
+    assert client.patch(f'/api/session/{session_id}', json={'income': 'nan'}).status_code == 400
+    update = _events(body, 1)[0][1]
+    assert update['version'] == 2 and update['likelihood'] == first['projection']['likelihood'][9]
+
+    assert client.get('/api/health').get_json()['sessions']['active'] >= 1
+    closer = threading.Thread(target=lambda: client.delete(f'/api/session/{session_id}'))
+    closer.start()
+    assert _events(body, 1)[0][0] == 'closed'
+    closer.join()
+    assert client.patch(f'/api/session/{session_id}', json={'years': 4}).status_code == 404
+    assert client.get(f'/api/session/{session_id}/stream').status_code == 404
+    stream.close()
+    assert client.get('/api/health').get_json()['sessions']['streams'] == 0
+
+
+def test_sessions_fit_the_worker_setup(monkeypatch):
+    store = SessionStore(predictor)
+    assert store.limit_to_server(workers=1, threads=3) and store.max_streams == 2
+    assert not SessionStore(predictor, max_streams=1).limit_to_server(workers=4, threads=8)
+    assert store.open_stream() and store.open_stream() and not store.open_stream()
+    store.close_stream()
+    assert store.open_stream() and store.stats()['refused_streams'] == 1
+
+    import server
+    client = app.test_client()
+    session_id = client.post('/api/session', json=PROFILE).get_json()['session']
+    # Streams never take a worker's last thread; other requests keep being served
+    monkeypatch.setattr(server.whatif_sessions, 'max_streams', 0)
+    refused = client.get(f'/api/session/{session_id}/stream')
+    assert refused.status_code == 503 and refused.headers['Retry-After'] == '5'
+    assert client.post('/api/predict', json=PROFILE).status_code == 200
+    # Several workers: no sessions at all, clients use the stateless endpoints
+    monkeypatch.setattr(server.whatif_sessions, 'enabled', False)
+    assert client.post('/api/session', json=PROFILE).status_code == 503
@@ -0,0 +1,126 @@
+"""
+Tests for the Monte Carlo likelihood mode
+"""
+import numpy as np
+
+from growth import future_value, monthly_rate
+from server import SIMULATION_CONFIG, app, predictor
+from simulation import BLOCK_PATHS, _simulate_chunk, affordable_paths, percentile_bands, simulate_equity
+
+
+def test_seeded_runs_are_reproducible():
+    first = simulate_equity(50000, 800, 5.0, 10.0, 120, n_paths=3000, seed=7, chunk_paths=1000)
+    second = simulate_equity(50000, 800, 5.0, 10.0, 120, n_paths=3000, seed=7, chunk_paths=1000)
+    other = simulate_equity(50000, 800, 5.0, 10.0, 120, n_paths=3000, seed=8, chunk_paths=1000)
+
+    np.testing.assert_array_equal(first['equity'], second['equity'])
+    # Paths depend on the seed only, not on how blocks are grouped into chunks
+    regrouped = simulate_equity(50000, 800, 5.0, 10.0, 120, n_paths=3000, seed=7, chunk_paths=5000)
+    np.testing.assert_array_equal(first['equity'], regrouped['equity'])
+    assert not np.array_equal(first['equity'], other['equity'])
+    assert first['equity'].shape == (1, 3000)
+
+
+def test_zero_volatility_matches_closed_form():
+    run = simulate_equity(50000, 800, 5.0, 0.0, 180, n_paths=11, seed=0, checkpoints=[60, 120, 180])
+    expected = future_value(50000, 800, monthly_rate(5.0), np.array([60, 120, 180]))
+    # float32 accumulation across 180 months
+    np.testing.assert_allclose(run['equity'], np.repeat(expected[:, None], 11, axis=1), rtol=1e-4)
+
+
+def test_path_mean_tracks_deterministic_growth():
+    run = simulate_equity(50000, 800, 5.0, 10.0, 180, n_paths=20000, seed=1)
+    expected = future_value(50000, 800, monthly_rate(5.0), 180)
+    assert abs(run['equity'].mean() / expected - 1) < 0.01
+
+
+def test_budget_stops_after_the_first_block():
+    run = simulate_equity(50000, 800, 5.0, 10.0, 180, n_paths=10000, seed=1, budget_ms=1e-6)
+    assert run['paths'] == BLOCK_PATHS  # the first block always runs
+    assert run['truncated']
+
+    full = simulate_equity(50000, 800, 5.0, 10.0, 180, n_paths=10000, seed=1)
+    np.testing.assert_array_equal(run['equity'], full['equity'][:, :BLOCK_PATHS])
+
+
+def test_budget_is_checked_every_month():
+    blocks = [(np.random.default_rng(0), 100)]
+    assert _simulate_chunk(blocks, 50000, 800, 0.004, 0.03, 120, [120], deadline=0.0) is None
+
+    one_block = simulate_equity(50000, 800, 5.0, 10.0, 600, n_paths=BLOCK_PATHS)['elapsed_ms']
+    budget_ms = 5 * one_block
+    run = simulate_equity(50000, 800, 5.0, 10.0, 600, n_paths=50000, budget_ms=budget_ms)
+    assert run['paths'] % BLOCK_PATHS == 0 and run['truncated']
+    # Overrun bounded by a month step, not by a 5000-path chunk (with slack for a loaded machine)
+    assert run['elapsed_ms'] < budget_ms + 2 * one_block
+
+
+def test_seeded_budget_runs_are_cut_by_cost_not_by_time():
+    assert affordable_paths(10000, 120, 20, 50000) == 8000
+    assert affordable_paths(3000, 12, 20, 50000) == 3000
+    assert affordable_paths(50000, 600, 1, 50000) == BLOCK_PATHS  # never below one block
+
+    run = simulate_equity(50000, 800, 5.0, 10.0, 120, n_paths=10000, seed=3, budget_ms=100,
+                          path_months_per_ms=2400)
+    assert run['paths'] == 2000 and run['truncated']
+    full = simulate_equity(50000, 800, 5.0, 10.0, 120, n_paths=10000, seed=3)
+    np.testing.assert_array_equal(run['equity'], full['equity'][:, :2000])
+
+
+def test_percentile_bands_match_numpy():
+    values = np.random.default_rng(0).normal(size=(4, 1001))
+    bands = percentile_bands(values)
+    for p in (5, 25, 50, 75, 95):
+        np.testing.assert_allclose(bands[f'p{p}'], np.percentile(values, p, axis=-1))
+
+
+def test_probability_follows_target():
+    args = (5000, 50000, 800)
+    rest = (10, 5.0, 'single', 0)
+    easy = predictor.simulate_likelihood(*args, 200000, *rest, paths=2000, seed=3)
+    hard = predictor.simulate_likelihood(*args, 2000000, *rest, paths=2000, seed=3)
+    middle = predictor.simulate_likelihood(*args, 450000 + easy['futureEquity']['p50'], *rest,
+                                           paths=2000, seed=3)
+
+    assert easy['probability'] == 1.0
+    assert hard['probability'] == 0.0
+    assert 0.4 < middle['probability'] < 0.6
+
+
+def test_simulate_endpoint(monkeypatch):
+    client = app.test_client()
+    payload = {'income': 5000, 'equity': 20000, 'savings': 600, 'target': 520000,
+               'years': 10, 'rate': 7.5, 'paths': 4000, 'seed': 11}
+
+    response = client.post('/api/predict/simulate', json=payload)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['paths'] == 4000 and not data['truncated']
+    assert data['months'] == list(range(12, 121, 12))
+    assert data['volatility'] == 16.0  # aggressive profile
+    assert 0 <= data['likelihood'] <= 100
+    bands = data['equityBands']
+    assert all(len(band) == 10 for band in bands.values())
+    assert all(low <= high for low, high in zip(bands['p5'], bands['p95']))
+
+    again = client.post('/api/predict/simulate', json=payload).get_json()
+    assert again['equityBands'] == data['equityBands']
+
+    # Seeded requests stay within the budget through a path count fixed by the request
+    assert SIMULATION_CONFIG['budget_ms'] > 0
+    seeded = dict(payload, paths=10000, seed=1, years=15)
+    assert affordable_paths(10000, 180, SIMULATION_CONFIG['budget_ms'],
+                            SIMULATION_CONFIG['path_months_per_ms']) == 3000  # default budget and throughput
+    # A seed does not lift the budget: the longest horizon at the path limit gets one block
+    longest = client.post('/api/predict/simulate', json=dict(seeded, paths=50000, years=50)).get_json()
+    assert longest['paths'] == BLOCK_PATHS and longest['elapsed_ms'] < 5 * SIMULATION_CONFIG['budget_ms']
+
+    # The count comes from the cost model, not the clock (generous clock so a loaded machine cannot cut it)
+    monkeypatch.setitem(SIMULATION_CONFIG, 'budget_ms', 1000)
+    monkeypatch.setitem(SIMULATION_CONFIG, 'path_months_per_ms', 600)
+    runs = [client.post('/api/predict/simulate', json=seeded).get_json() for _ in range(3)]
+    assert all(run['paths'] == 3000 and run['truncated'] for run in runs)
+    assert all(run['equityBands'] == runs[0]['equityBands'] for run in runs)
+
+    too_many = client.post('/api/predict/simulate', json=dict(payload, paths=10 ** 7))
+    assert too_many.status_code == 400
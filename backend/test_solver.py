@@ -0,0 +1,105 @@
+"""
+Tests for goal seeking (solver.py and /api/solve)
+"""
+import numpy as np
+
+from predictor import LIKELIHOOD_BOUNDED, SOLVE_BREAKS, _within_bounds
+from server import SOLVE_RANGES, app, predictor
+from solver import solve_max, solve_min
+from training_data import TRAINING_BOUNDS
+
+
+def test_solve_min_and_max_on_lattice():
+    calls = []
+
+    def evaluate(values):
+        calls.append(len(values))
+        return values // 7  # monotone step function
+
+    value, evaluations = solve_min(evaluate, 0, 20000, 1, goal=1000)
+    assert value == 7000
+    assert evaluations == sum(calls) and len(calls) <= 4
+
+    value, _ = solve_max(lambda values: 20000 - values, 0, 20000, 5, goal=1234)
+    assert value == 18765  # largest multiple of 5 with 20000 - v >= 1234
+
+    # A narrow branch between 5000 and 5010 is invisible to a plain grid search
+    def branchy(values):
+        return np.where((values < 100) | ((values >= 5000) & (values <= 5010)), 1, 0)
+    assert solve_max(branchy, 0, 10000, 1, goal=1)[0] == 99
+    assert solve_max(branchy, 0, 10000, 1, goal=1, breaks=(5000, 5011))[0] == 5010
+
+    assert solve_min(lambda values: values * 0, 0, 100, 1, goal=1)[0] is None
+
+
+def test_solve_breaks_follow_training_bounds():
+    assert SOLVE_BREAKS == {'savings': (), 'years': (1, 16), 'target': (100000, 800100)}
+    for name, breaks in SOLVE_BREAKS.items():
+        if name not in LIKELIHOOD_BOUNDED:
+            continue
+        step = SOLVE_RANGES[name][2]
+        low, high = breaks
+        assert low == TRAINING_BOUNDS[name][0] and high - step <= TRAINING_BOUNDS[name][1] < high
+        # The ML branch ends exactly where the last break starts the formula segment
+        assert _within_bounds([name], high - step) and not _within_bounds([name], high)
+    assert solve_min(lambda values: values * 0 + 5, 10, 100, 1, goal=1)[0] == 10
+
+
+def _brute_force(profile, solve_for, goal):
+    """First (or for target: last) lattice value whose likelihood reaches goal"""
+    low, high, step = SOLVE_RANGES[solve_for]
+    values = np.arange(low, high + step, step, dtype=float)
+    n = len(values)
+    columns = {name: np.full(n, float(profile[name])) for name in ('savings', 'target', 'years')}
+    columns[solve_for] = values
+    likelihood, _ = predictor.predict_likelihood_batch(
+        np.full(n, profile['income']), np.full(n, profile['equity']), columns['savings'],
+        columns['target'], columns['years'], np.full(n, profile['rate']),
+        np.full(n, profile['marital']), np.full(n, profile['kids'])
+    )
+    met = np.nonzero(likelihood >= goal)[0]
+    if len(met) == 0:
+        return None
+    return int(values[met[-1] if solve_for == 'target' else met[0]])
+
+
+def test_solutions_match_exhaustive_search():
+    rng = np.random.default_rng(3)
+    for _ in range(10):
+        profile = {'income': rng.uniform(2500, 12000), 'equity': rng.uniform(0, 150000),
+                   'savings': 800, 'target': rng.uniform(150000, 700000),
+                   'years': int(rng.integers(1, 15)), 'rate': rng.uniform(2, 8),
+                   'marital': 'married', 'kids': 1}
+        for solve_for in ('savings', 'years', 'target'):
+            goal = float(rng.integers(30, 95))
+            result = predictor.solve_goal(*(profile[k] for k in ('income', 'equity', 'savings', 'target',
+                                                                  'years', 'rate', 'marital', 'kids')),
+                                          solve_for, 'likelihood', goal)
+            assert result['value'] == _brute_force(profile, solve_for, goal)
+
+
+def test_solve_endpoint():
+    client = app.test_client()
+    profile = {'income': 4000, 'equity': 30000, 'savings': 500, 'target': 450000,
+               'years': 8, 'rate': 5.0, 'marital': 'single', 'kids': 0}
+
+    data = client.post('/api/solve', json=dict(profile, solveFor='savings', goal=75)).get_json()
+    assert data['achievable'] and data['likelihood'] >= 75
+    # Ten euros less (the /api/predict cache step) no longer reaches the goal
+    below = client.post('/api/predict', json=dict(profile, savings=data['value'] - 10)).get_json()
+    assert below['likelihood'] < 75 or data['value'] < 10
+
+    data = client.post('/api/solve', json=dict(profile, solveFor='target', metric='readiness',
+                                               goal=50)).get_json()
+    assert data['achievable'] and data['readiness'] >= 50
+    assert data['range'] == {'low': 10000, 'high': 5000000, 'step': 100}
+
+    data = client.post('/api/solve', json=dict(profile, solveFor='years', goal=99)).get_json()
+    assert data['value'] is None and not data['achievable']
+
+
+def test_solve_endpoint_validation():
+    client = app.test_client()
+    assert client.post('/api/solve', json={'solveFor': 'income'}).status_code == 400
+    assert client.post('/api/solve', json={'solveFor': 'years', 'metric': 'readiness'}).status_code == 400
+    assert client.post('/api/solve', json={'solveFor': 'savings', 'goal': 150}).status_code == 400
@@ -0,0 +1,61 @@
+"""
+Tests for the lazy start (LAZY_MODELS): formula answers while warming up, readiness-gated health
+"""
+import numpy as np
+
+from bench_startup import _free_port, launch, request, wait_for
+from server import ARTIFACT_PATH, MLPredictor, predictor
+
+# Seconds from process start to the first /api/health/live answer (about 0.5 s here;
+# an eager start needs the sklearn import plus training, 2 s or more)
+FIRST_RESPONSE_BUDGET_S = 1.5
+
+PROFILE = {'income': 5000, 'equity': 60000, 'savings': 900, 'target': 400000, 'years': 6, 'rate': 5.0,
+           'marital': 'married', 'kids': 1}
+
+
+def _formula(income, equity, target, marital, kids):
+    adjusted_income = max(1000, income - (400 if marital == 'married' else 0) - kids * 300)
+    ratio = (adjusted_income * 90 + equity) / target
+    return int(100 if ratio >= 1 else 100 * ratio ** 2)
+
+
+def test_lazy_predictor_uses_formulas_until_warm():
+    lazy = MLPredictor(n_samples=predictor.n_samples, artifact_path=ARTIFACT_PATH, lazy=True)
+    assert (lazy.state, lazy.models, lazy.generation) == ('cold', None, 0)
+    assert lazy.predict_readiness(5000, 60000, 900, 400000, 'married', 1)[0] == _formula(
+        5000, 60000, 400000, 'married', 1)
+    readiness, _ = lazy.predict_readiness_batch([5000, 40000], [60000, 0], [900, 0], [400000, 400000],
+                                                ['married', 'single'], [1, 0])
+    assert readiness.tolist() == [_formula(5000, 60000, 400000, 'married', 1),
+                                  _formula(40000, 0, 400000, 'single', 0)]
+
+    lazy.start_warm_up()
+    assert lazy.ready.wait(60) and lazy.state == 'ready'
+    lazy.start_warm_up()  # no-op once ready
+    assert lazy.predict_likelihood(5000, 60000, 900, 400000, 6, 5.0, 'married', 1) == \
+        predictor.predict_likelihood(5000, 60000, 900, 400000, 6, 5.0, 'married', 1)
+    np.testing.assert_array_equal(lazy.models.readiness_model.coef_, predictor.readiness_model.coef_)
+
+
+def test_lazy_server_answers_before_models_are_ready():
+    port = _free_port()
+    # Large training set: the warm-up takes seconds, so the warming window is observable
+    process = launch(port, lazy=True, env={'TRAINING_SAMPLES': '100000'})
+    try:
+        first_response = wait_for(port, '/api/health/live', timeout=30)
+        assert first_response < FIRST_RESPONSE_BUDGET_S
+
+        status, body = request(port, '/api/health/ready')
+        assert (status, body['status']) == (503, 'warming')
+        status, body = request(port, '/api/predict', PROFILE)
+        assert status == 200 and body['readiness'] == _formula(5000, 60000, 400000, 'married', 1)
+        assert request(port, '/api/predict-property-price', {'sqm': 120})[0] == 503
+        assert request(port, '/api/health')[1]['models_loaded'] is False
+
+        wait_for(port, '/api/health/ready', timeout=60)
+        assert request(port, '/api/predict-property-price', {'sqm': 120})[0] == 200
+        assert request(port, '/api/health')[1]['model_state'] == 'ready'
+    finally:
+        process.terminate()
+        process.wait()
@@ -0,0 +1,120 @@
+"""
+Tests for out-of-core training (streaming.py)
+"""
+import csv
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import PolynomialFeatures
+
+from server import MLPredictor, predictor
+from streaming import (MODEL_COLUMNS, StreamingLeastSquares, csv_chunks, fit_stream, model_chunks,
+                       synthetic_chunks)
+
+
+def _in_memory_fit(chunks):
+    """LinearRegression per model on the concatenated chunks"""
+    stacked = {}
+    for columns in chunks:
+        for name, (X, y) in model_chunks(columns).items():
+            stacked.setdefault(name, []).append((X, y))
+    models = {}
+    for name, parts in stacked.items():
+        X = np.vstack([X for X, _ in parts])
+        y = np.concatenate([y for _, y in parts])
+        if name == 'readiness':
+            X = PolynomialFeatures(degree=2).fit_transform(X)
+        models[name] = LinearRegression().fit(X, y)
+    return models
+
+
+def _assert_same_model(streamed, reference):
+    scale = np.abs(reference.coef_).max()
+    np.testing.assert_allclose(streamed.coef_, reference.coef_, rtol=0, atol=1e-7 * scale)
+    assert streamed.intercept_ == pytest.approx(reference.intercept_, rel=1e-7, abs=1e-7 * scale)
+
+
+def test_streamed_fit_matches_in_memory_fit():
+    chunks = list(synthetic_chunks(20000, chunk_rows=3001, seed=7))
+    poly_features, stats = fit_stream(iter(chunks))
+    reference = _in_memory_fit(chunks)
+
+    assert {name: acc.n_samples for name, acc in stats.items()} == dict.fromkeys(MODEL_COLUMNS, 20000)
+    assert poly_features.n_output_features_ == 55
+    for name in MODEL_COLUMNS:
+        _assert_same_model(stats[name].to_linear_regression(), reference[name])
+    assert stats['property_price'].score() > 0.9
+
+
+def test_accumulators_merge_and_handle_tiny_chunks():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 4)) * [1, 1e3, 1e-3, 1]
+    X[:, 3] = X[:, 0] * 2  # exactly collinear column
+    y = X @ [1.0, 2.0, 3.0, 4.0] + 5 + rng.normal(size=500)
+    reference = LinearRegression().fit(X, y)
+
+    single_rows = StreamingLeastSquares()
+    for i in range(len(X)):
+        single_rows.partial_fit(X[i:i + 1], y[i:i + 1])
+    halves = StreamingLeastSquares().partial_fit(X[:123], y[:123])
+    halves.merge(StreamingLeastSquares().partial_fit(X[123:], y[123:]))
+
+    for acc in (single_rows, halves):
+        _assert_same_model(acc.to_linear_regression(), reference)
+        assert acc.score() == pytest.approx(reference.score(X, y))
+
+    with pytest.raises(ValueError):
+        halves.partial_fit(X[:, :2], y)
+    with pytest.raises(ValueError):
+        StreamingLeastSquares().solve()
+
+
+def _write_csv(path, chunks):
+    header = list(chunks[0])
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for columns in chunks:
+            writer.writerows(zip(*(columns[name].tolist() for name in header)))
+
+
+def test_csv_stream_trains_servable_models(tmp_path):
+    chunks = list(synthetic_chunks(3000, chunk_rows=1000, seed=3))
+    path = tmp_path / 'training.csv'
+    _write_csv(path, chunks)
+
+    read_back = list(csv_chunks(str(path), chunk_rows=700))
+    assert [len(c['income']) for c in read_back] == [700, 700, 700, 700, 200]
+
+    models = predictor.build_models_streamed(read_back)
+    reference = _in_memory_fit(chunks)
+    assert models.source == 'streamed' and models.n_samples == 3000
+    _assert_same_model(models.readiness_model, reference['readiness'])
+    _assert_same_model(models.likelihood_model, reference['likelihood'])
+    _assert_same_model(models.property_price_model, reference['property_price'])
+
+    property_only = [{name: c[name] for name in MODEL_COLUMNS['property_price']} for c in chunks]
+    with pytest.raises(ValueError, match='readiness'):
+        predictor.build_models_streamed(property_only)
+
+
+def test_training_file_trains_and_fingerprints_the_artifact(tmp_path):
+    chunks = list(synthetic_chunks(2000, chunk_rows=1000, seed=5))
+    training_file, artifact = str(tmp_path / 'training.csv'), str(tmp_path / 'predictor.npz')
+    _write_csv(training_file, chunks)
+
+    trained = MLPredictor(artifact_path=artifact, training_file=training_file)
+    assert trained.model_source == 'streamed' and trained.models.n_samples == 2000
+    _assert_same_model(trained.property_price_model, _in_memory_fit(chunks)['property_price'])
+
+    restarted = MLPredictor(artifact_path=artifact, training_file=training_file)
+    assert restarted.model_source == 'artifact'
+    assert restarted.artifact_version == trained.artifact_version
+    assert restarted.models.data_source == trained.models.data_source
+
+    # Neither synthetic data nor an edited file may reuse the file-trained artifact
+    assert MLPredictor(n_samples=2000, artifact_path=artifact).model_source == 'trained'
+    _write_csv(training_file, chunks[:1])
+    edited = MLPredictor(artifact_path=artifact, training_file=training_file)
+    assert edited.model_source == 'streamed' and edited.models.n_samples == 1000
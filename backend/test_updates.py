@@ -0,0 +1,123 @@
+"""
+Tests for incremental model updates from observed outcomes and rollback
+"""
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from server import ARTIFACT_PATH, MLPredictor, app, predictor
+from streaming import StreamingLeastSquares
+from training_data import likelihood_dataset, property_dataset, readiness_dataset, sample_profiles
+
+
+def test_update_matches_weighted_refit():
+    local = MLPredictor(n_samples=400, seed=3)
+    base = local.models
+    rng = np.random.default_rng(0)
+    observed = {'sqm': rng.uniform(50, 200, 30), 'rooms': rng.uniform(1, 6, 30),
+                'bathrooms': rng.uniform(1, 3, 30), 'location_premium': rng.integers(0, 3, 30) * 1.0,
+                'condition': rng.integers(0, 3, 30) * 1.0, 'year_age': rng.uniform(0, 80, 30),
+                'price': rng.uniform(2e5, 9e5, 30)}
+
+    updated = local.update_models([observed], weight=5.0)
+    assert (updated.parent, updated.observed, updated.source) == (base.generation, 30, 'updated')
+    assert local.models is base  # building an update publishes nothing
+    assert updated.readiness_model is base.readiness_model  # untouched models are shared
+    assert base.stats['property_price'].n_samples == 400  # published statistics unchanged
+
+    # Same coefficients as refitting on the training rows (replayed) + observed rows with weight 5
+    rng = np.random.default_rng(3)
+    profiles = sample_profiles(rng, 400)
+    readiness_dataset(rng, profiles)
+    likelihood_dataset(rng, profiles)
+    X, y = property_dataset(rng, 400)
+    X_new = np.column_stack([observed[name] for name in list(observed)[:-1]])
+    reference = LinearRegression().fit(np.vstack([X, X_new]), np.concatenate([y, observed['price']]),
+                                       sample_weight=np.r_[np.ones(400), np.full(30, 5.0)])
+    np.testing.assert_allclose(updated.property_price_model.coef_, reference.coef_, rtol=1e-8)
+    assert updated.property_price_model.intercept_ == pytest.approx(reference.intercept_, rel=1e-8)
+
+
+def test_statistics_state_round_trip():
+    rng = np.random.default_rng(1)
+    X, y = rng.normal(size=(50, 3)), rng.normal(size=50)
+    acc = StreamingLeastSquares().partial_fit(X, y, sample_weight=2.0)
+    restored = StreamingLeastSquares.from_state(acc.state())
+    assert (restored.n_samples, restored.weight) == (50, 100.0)
+    np.testing.assert_array_equal(restored.solve()[0], acc.solve()[0])
+    with pytest.raises(ValueError):
+        acc.partial_fit(X, y, sample_weight=0)
+
+
+def test_outcomes_endpoint_versions_and_rollback():
+    client = app.test_client()
+    house = {'sqm': 120, 'rooms': 4, 'bathrooms': 2, 'location': 'city', 'condition': 'good',
+             'yearBuilt': 1995}
+    profile = {'income': 5000, 'equity': 60000, 'savings': 900, 'target': 400000, 'years': 6,
+               'rate': 5.0, 'marital': 'married', 'kids': 1}
+    before_price = client.post('/api/predict-property-price', json=house).get_json()['predictedPrice']
+    before = predictor.models
+    before_generation, before_version = before.generation, before.artifact_version
+
+    outcomes = [dict(house, price=2 * before_price)] * 20 + [dict(profile, achieved=False, readiness=10)] * 20
+    response = client.post('/api/outcomes', json={'outcomes': outcomes, 'weight': 50})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['accepted'] == {'readiness': 20, 'likelihood': 20, 'property_price': 20}
+    assert data['parent'] == before_generation and data['observed'] >= 60
+
+    # The cached price was dropped and the model moved towards the observed sales
+    after_price = client.post('/api/predict-property-price', json=house).get_json()['predictedPrice']
+    assert after_price > before_price * 1.1
+    assert MLPredictor(n_samples=predictor.n_samples, artifact_path=ARTIFACT_PATH).models.observed == \
+        data['observed']
+
+    versions = client.get('/api/models/versions').get_json()
+    assert versions['current'] == data['generation']
+    assert [v['generation'] for v in versions['versions']][-2:] == [before_generation, data['generation']]
+
+    updated = predictor.models
+    updated_version = updated.artifact_version
+    rolled_back = client.post('/api/models/rollback', json={}).get_json()
+    assert rolled_back['generation'] == before_generation == predictor.models.generation
+    # Published sets are never modified: rollback publishes a copy under the new artifact version
+    assert predictor.models is not before and predictor.models.artifact_version == rolled_back['artifact_version']
+    assert (before.artifact_version, updated.artifact_version) == (before_version, updated_version)
+    assert client.post('/api/predict-property-price', json=house).get_json()['predictedPrice'] == before_price
+    assert client.post('/api/models/rollback', json={'generation': 10 ** 6}).status_code == 404
+
+
+def test_workers_pick_up_artifact_saved_elsewhere(monkeypatch):
+    import server
+
+    client = app.test_client()
+    house = {'sqm': 90, 'rooms': 3, 'bathrooms': 1, 'location': 'suburb', 'condition': 'good',
+             'yearBuilt': 2005}
+    current = predictor.models
+    before_price = client.post('/api/predict-property-price', json=house).get_json()['predictedPrice']
+    other = predictor.update_models([{'sqm': [90.0] * 10, 'rooms': [3.0] * 10, 'bathrooms': [1.0] * 10,
+                                      'location_premium': [1.0] * 10, 'condition': [1.0] * 10,
+                                      'year_age': [20.0] * 10, 'price': [3 * before_price] * 10}], weight=50)
+
+    # Another worker published `other` and saved it to the shared artifact
+    manifest = predictor.save_artifact(ARTIFACT_PATH, other)
+    monkeypatch.setattr(server, 'ARTIFACT_SYNC_SECONDS', 1e-9)
+    after_price = client.post('/api/predict-property-price', json=house).get_json()['predictedPrice']
+    assert predictor.artifact_version == manifest['version'] != current.artifact_version
+    assert after_price > before_price * 1.1  # cached price was dropped
+
+    # Back to the set the rest of the suite expects
+    assert client.post('/api/models/rollback', json={'generation': current.generation}).status_code == 200
+
+
+def test_outcomes_endpoint_validation():
+    client = app.test_client()
+    generation = predictor.models.generation
+    assert client.post('/api/outcomes', json={'outcomes': []}).status_code == 400
+    assert client.post('/api/outcomes', json={'outcomes': [{'income': 4000}]}).status_code == 400
+    assert client.post('/api/outcomes', json={'outcomes': [{'readiness': 140}]}).status_code == 400
+    assert client.post('/api/outcomes', json={'outcomes': [{'price': -1}]}).status_code == 400
+    assert client.post('/api/outcomes', json={'outcomes': [{'price': 'x'}]}).status_code == 400
+    assert client.post('/api/outcomes', json={'outcomes': [{'price': 1e5, 'sqm': 'nan'}]}).status_code == 400
+    assert client.post('/api/outcomes', json={'outcomes': [{'price': 1e5}], 'weight': 0}).status_code == 400
+    assert predictor.models.generation == generation
@@ -0,0 +1,146 @@
+"""
+Synthetic training data for the MLPredictor models
+
+Every dataset is generated as whole-array NumPy operations from a caller
+supplied np.random.Generator, so n_samples can grow to 10^6 without any
+per-sample Python work and without touching the global NumPy RNG.
+"""
+import numpy as np
+
+from growth import future_value, horizon_months, monthly_rate
+
+# Ranges the synthetic profiles are drawn from (inclusive lower, exclusive upper)
+TRAINING_BOUNDS = {
+    'income': (2000, 15000),
+    'equity': (0, 200000),
+    'savings': (0, 2000),
+    'target': (100000, 800000),
+    'years': (1, 15),
+    'rate': (2.0, 8.0),
+}
+
+
+def sample_profiles(rng, n_samples):
+    """
+    Draw customer profiles shared by the readiness and likelihood datasets
+
+    Returns a dict of length-n_samples arrays: incomes, equities, savings,
+    targets, marital (0=single, 1=married) and kids.
+    """
+    return {
+        'incomes': rng.uniform(*TRAINING_BOUNDS['income'], n_samples),
+        'equities': rng.uniform(*TRAINING_BOUNDS['equity'], n_samples),
+        'savings': rng.uniform(*TRAINING_BOUNDS['savings'], n_samples),
+        'targets': rng.uniform(*TRAINING_BOUNDS['target'], n_samples),
+        'marital': rng.integers(0, 2, n_samples),
+        'kids': rng.integers(0, 5, n_samples),
+    }
+
+
+def adjusted_incomes(profiles):
+    """Income left after family cost deductions (never below 1000)"""
+    cost_deduction = profiles['marital'] * 400 + profiles['kids'] * 300
+    return np.maximum(1000, profiles['incomes'] - cost_deduction)
+
+
+def readiness_features(profiles):
+    """
+    Readiness model inputs for `profiles`
+    Features: [income, equity, savings, target, marital_status, kids,
+               adjusted_income, curr_power, ratio]
+    """
+    adjusted_income = adjusted_incomes(profiles)
+    curr_power = (adjusted_income * 90) + profiles['equities']
+    ratio = curr_power / profiles['targets']
+    return np.column_stack([profiles['incomes'], profiles['equities'], profiles['savings'],
+                            profiles['targets'], profiles['marital'], profiles['kids'],
+                            adjusted_income, curr_power, ratio])
+
+
+def readiness_dataset(rng, profiles):
+    """
+    Readiness training set
+    Features: see readiness_features
+    """
+    n_samples = len(profiles['incomes'])
+    X = readiness_features(profiles)
+    ratio = X[:, 8]
+
+    # Quadratic readiness with some noise for ML learning
+    readiness = np.where(ratio >= 1.0, 100.0, np.maximum(0, 100 * (ratio ** 2)))
+    readiness += rng.normal(0, 2, n_samples)  # Add small noise
+    readiness = np.clip(readiness, 0, 100)
+
+    return X, readiness
+
+
+def likelihood_features(profiles, years, rates):
+    """
+    Likelihood model inputs for `profiles` saving for `years` at `rates` percent
+    Features: [income, equity, savings, target, years, rate, marital_status, kids,
+               adjusted_income, future_equity, coverage]
+    """
+    adjusted_income = adjusted_incomes(profiles)
+    future_equity = future_value(profiles['equities'], profiles['savings'],
+                                 monthly_rate(rates), horizon_months(years))
+    coverage = ((adjusted_income * 90) + future_equity) / profiles['targets']
+    return np.column_stack([profiles['incomes'], profiles['equities'], profiles['savings'],
+                            profiles['targets'], years, rates, profiles['marital'],
+                            profiles['kids'], adjusted_income, future_equity, coverage])
+
+
+def likelihood_dataset(rng, profiles):
+    """
+    Likelihood training set
+    Features: see likelihood_features
+    """
+    n_samples = len(profiles['incomes'])
+    years = rng.uniform(*TRAINING_BOUNDS['years'], n_samples)
+    rates = rng.uniform(*TRAINING_BOUNDS['rate'], n_samples)
+
+    X = likelihood_features(profiles, years, rates)
+    future_power = (X[:, 8] * 90) + X[:, 9]
+    coverage = X[:, 10]
+
+    # Risk adjustment factor: Higher risk = more uncertainty = lower confidence
+    # Conservative (<3.5%): +5, Balanced: 0, Aggressive (>6.5%): -5
+    risk_adjustment = np.where(rates < 3.5, 5, np.where(rates > 6.5, -5, 0))
+
+    # Logistic-based likelihood with noise and risk adjustment
+    likelihood = 100 / (1 + np.exp(-10 * (coverage - 0.85)))
+    likelihood = np.maximum(10, likelihood)
+    likelihood = np.where(future_power >= profiles['targets'], 98.0, likelihood)
+    likelihood += risk_adjustment
+    likelihood += rng.normal(0, 2, n_samples)  # Add small noise
+    likelihood = np.clip(likelihood, 10, 98)
+
+    return X, likelihood
+
+
+def property_dataset(rng, n_samples):
+    """
+    Property price training set
+    Features: [sqm, rooms, bathrooms, location_premium, condition, year_built_age]
+    """
+    sqm_values = rng.uniform(50, 250, n_samples)
+    rooms_values = rng.uniform(1, 6, n_samples)
+    bathrooms_values = rng.uniform(1, 4, n_samples)
+    location_premium = rng.uniform(0, 2, n_samples)  # 0=rural, 1=city, 2=premium
+    condition = rng.uniform(0, 2, n_samples)  # 0=renovation, 1=good, 2=new
+    year_age = rng.uniform(0, 100, n_samples)  # age of property in years
+
+    # Base price with realistic German market data (4000-8000 EUR per sqm by location)
+    base_price_per_sqm = 3500 + (location_premium * 2000)
+    room_bonus = rooms_values * 5000  # Extra value per room
+    bathroom_bonus = bathrooms_values * 8000  # Bathrooms add value
+    condition_factor = 1.0 + (condition * 0.15)  # Up to 30% more for new
+    age_penalty = np.maximum(0, 1 - (year_age / 200))  # Older = less valuable
+
+    price = (sqm_values * base_price_per_sqm * condition_factor * age_penalty +
+             room_bonus + bathroom_bonus)
+    price += rng.normal(0, price * 0.05)  # 5% noise
+    price = np.maximum(50000, price)  # Minimum price
+
+    X = np.column_stack([sqm_values, rooms_values, bathrooms_values,
+                         location_premium, condition, year_age])
+    return X, price
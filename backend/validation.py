@@ -0,0 +1,26 @@
+"""
+Parsing of numeric request fields
+
+The JSON endpoints and the what-if sessions parse numbers the same way: a
+value must convert with the field's type and be finite, so 'nan', 'inf' or
+a NaN literal is rejected with a ValueError (a 400 for the client) instead
+of flowing into the models. bulk_score applies the same rule column-wise.
+"""
+import math
+
+
+def parse_number(value, name, kind=float):
+    """value converted with kind (float or int); ValueError naming the field if it does not parse or is not finite"""
+    try:
+        number = kind(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f'{name} must be a {kind.__name__}') from None
+    if not math.isfinite(number):
+        raise ValueError(f'{name} must be finite, not {value!r}')
+    return number
+
+
+def number_field(data, name, default, kind=float):
+    """Field of a request dict parsed with parse_number; a missing or null field takes the default"""
+    value = data.get(name)
+    return default if value is None else parse_number(value, name, kind)
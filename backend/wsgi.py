@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production serving
+
+Importing this module trains or warm-loads the models once (via server.py).
+With gunicorn's preload_app (see gunicorn.conf.py) that happens in the master
+process before workers fork, so every worker shares the same read-only model
+arrays copy-on-write instead of building its own copy. With LAZY_MODELS=1 the
+import returns at once and the models load in the background instead.
+
+Run with: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from server import app, predictor  # noqa: F401
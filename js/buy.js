@@ -4,17 +4,15 @@
     // Track whether defaults have been applied to avoid reapplying after clear
     let _defaultsApplied = false;
     
-    // Pagination state
-    let _currentPage = 0;
+    // Pagination state: _offset = rows already rendered (the server's nextOffset)
+    let _offset = 0;
     let _pageSize = 200;
-    let _allListings = [];
     let _hasMoreData = true;
     let _isLoading = false;
 
     app.fetchListings = async function(reset = true){
         if (reset) {
-            _currentPage = 0;
-            _allListings = [];
+            _offset = 0;
             _hasMoreData = true;
         }
         const grid = document.getElementById('listings-grid');
@@ -90,18 +88,22 @@
         const grid = document.getElementById('listings-grid');
         const msg = document.getElementById('listings-msg');
 
+        // Backend proxy caches upstream pages, filters and sorts; each scroll gets only the next rows
         const payload = {
-            "active": true,
-            "type": "APARTMENTBUY" | "HOUSEBUY",
-            "sortBy": "asc",
-            "sortKey": "buyingPrice",
-            "from": _currentPage * _pageSize + 1,
-            "size": _pageSize,
-            "geoSearches": { "geoSearchQuery": app.data.location, "geoSearchType": "city" }
+            location: app.data.location,
+            offset: _offset,
+            filters: getActiveFilters(),
+            desired: {
+                sqm: app.data.sqm,
+                rooms: app.data.rooms,
+                yearBuilt: app.data.yearBuilt,
+                target: app.data.target
+            },
+            limit: _pageSize
         };
         
         try {
-            const res = await fetch('https://thinkimmo-api.mgraetz.de/thinkimmo', {
+            const res = await fetch('http://localhost:5000/api/listings', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify(payload)
@@ -109,26 +111,18 @@
 
             if (!res.ok) throw new Error('API Error');
             const data = await res.json();
-            const newListings = data.results || [];
-            
-            if (newListings.length < _pageSize) {
-                _hasMoreData = false;
-            }
-            
-            _allListings = _allListings.concat(newListings);
-            _currentPage++;
-            
-            const matches = _allListings.filter(l => l.buyingPrice >= 0);
-            console.log('[buy.js] Total matches loaded:', matches.length);
-            const filters = getActiveFilters();
-            const filtered = applyFilters(matches, filters);
-            console.log('[buy.js] Matches after UI filters:', filtered.length);
-            app.renderListings(filtered, effectiveBudget);
+
+            const append = _offset > 0;
+            _hasMoreData = data.hasMore;
+            _offset = data.nextOffset;
+
+            console.log('[buy.js] Listings loaded:', data.loaded, 'matches after filters:', data.total);
+            app.renderListings(data.results || [], effectiveBudget, append);
             
             _isLoading = false;
         } catch (e) {
             console.error('[buy.js] Error:', e);
-            if (_currentPage === 0) {
+            if (_offset === 0) {
                 grid.innerHTML = '';
                 msg.innerHTML = `Connection Error or No Data.`;
                 msg.classList.remove('hidden');
@@ -246,13 +240,6 @@
         return filters;
     }
 
-    // Get recommendation score for sorting
-    function getRecommendationScore(item) {
-        if (item._recommendation !== undefined) return item._recommendation;
-        item._recommendation = calculateRecommendation(item);
-        return item._recommendation;
-    }
-
     function parseNumber(v) {
         if (v === null || v === undefined || v === '') return null;
         const n = Number(v);
@@ -321,91 +308,6 @@
         return null;
     }
 
-    function applyFilters(items, filters) {
-        if (!filters) return items;
-        let out = items.filter(item => {
-            const price = getFirstField(item, ['buyingPrice', 'price', 'priceValue']);
-            if (filters.priceListedOnly) {
-                if (price === null || price === undefined || price === 0) return false;
-            }
-            if (filters.minPrice != null && price != null && Number(price) < filters.minPrice) return false;
-            if (filters.minPrice != null && price === null) return false;
-            if (filters.maxPrice != null && price != null && Number(price) > filters.maxPrice) return false;
-
-            const rooms = getFirstField(item, ['rooms', 'roomCount']);
-            if (filters.minRooms != null && rooms != null && Number(rooms) < filters.minRooms) return false;
-            if (filters.maxRooms != null && rooms != null && Number(rooms) > filters.maxRooms) return false;
-
-            const sqm = getFirstField(item, ['squareMeter', 'area', 'size']);
-            if (filters.minSqm != null && sqm != null && Number(sqm) < filters.minSqm) return false;
-            if (filters.maxSqm != null && sqm != null && Number(sqm) > filters.maxSqm) return false;
-
-            let ppsqm = getFirstField(item, ['pricePerSqm', 'pricePerSquareMeter']);
-            if ((ppsqm === null || ppsqm === undefined) && price != null && sqm != null && Number(sqm) > 0) {
-                ppsqm = Number(price) / Number(sqm);
-            }
-            if (filters.minPPSqm != null && ppsqm != null && Number(ppsqm) < filters.minPPSqm) return false;
-            if (filters.maxPPSqm != null && ppsqm != null && Number(ppsqm) > filters.maxPPSqm) return false;
-
-            const cYear = getFirstField(item, ['constructionYear', 'yearBuilt', 'builtYear']);
-            if (filters.minYear != null && cYear != null && Number(cYear) < filters.minYear) return false;
-            if (filters.maxYear != null && cYear != null && Number(cYear) > filters.maxYear) return false;
-
-            const pub = parseDate(getFirstField(item, ['publishDate', 'publishedAt', 'datePublished']));
-            if (filters.publishedFrom && pub && pub < filters.publishedFrom) return false;
-            if (filters.publishedTo && pub && pub > filters.publishedTo) return false;
-
-            const upd = parseDate(getFirstField(item, ['updatedAt', 'lastUpdated', 'modified']));
-            if (filters.updatedFrom && upd && upd < filters.updatedFrom) return false;
-            if (filters.updatedTo && upd && upd > filters.updatedTo) return false;
-
-            return true;
-        });
-
-        const key = filters.sortKey || 'buyingPrice';
-        const order = (filters.sortOrder || 'asc').toLowerCase();
-        out.sort((a, b) => {
-            // Special handling for recommendation sorting
-            if (key === 'recommendation') {
-                const aScore = getRecommendationScore(a);
-                const bScore = getRecommendationScore(b);
-                return order === 'asc' ? aScore - bScore : bScore - aScore;
-            }
-
-            const aVal = getFirstField(a, [key, key === 'pricePerSqm' ? 'pricePerSqm' : key]);
-            const bVal = getFirstField(b, [key, key === 'pricePerSqm' ? 'pricePerSqm' : key]);
-
-            let aNum = aVal;
-            let bNum = bVal;
-            if ((aNum === null || aNum === undefined) && key === 'pricePerSqm') {
-                const aPrice = getFirstField(a, ['buyingPrice', 'price']);
-                const aSqm = getFirstField(a, ['squareMeter', 'area']);
-                if (aPrice != null && aSqm != null && Number(aSqm) > 0) aNum = Number(aPrice) / Number(aSqm);
-            }
-            if ((bNum === null || bNum === undefined) && key === 'pricePerSqm') {
-                const bPrice = getFirstField(b, ['buyingPrice', 'price']);
-                const bSqm = getFirstField(b, ['squareMeter', 'area']);
-                if (bPrice != null && bSqm != null && Number(bSqm) > 0) bNum = Number(bPrice) / Number(bSqm);
-            }
-
-            const dateKeys = ['publishDate','publishedAt','datePublished','updatedAt','lastUpdated','modified'];
-            if (dateKeys.includes(key)) {
-                const da = parseDate(aVal) || 0;
-                const db = parseDate(bVal) || 0;
-                return order === 'asc' ? da - db : db - da;
-            }
-
-            const na = aNum === null || aNum === undefined ? Number.NEGATIVE_INFINITY : Number(aNum);
-            const nb = bNum === null || bNum === undefined ? Number.NEGATIVE_INFINITY : Number(bNum);
-            if (na === Number.NEGATIVE_INFINITY && nb === Number.NEGATIVE_INFINITY) return 0;
-            if (na === Number.NEGATIVE_INFINITY) return order === 'asc' ? 1 : -1;
-            if (nb === Number.NEGATIVE_INFINITY) return order === 'asc' ? -1 : 1;
-            return order === 'asc' ? na - nb : nb - na;
-        });
-
-        return out;
-    }
-
     function updateActiveSummary() {
         const s = document.getElementById('active-filter-summary');
         if (!s) return;
@@ -419,14 +321,19 @@
         if (parts.length === 0) s.innerText = 'No filters selected'; else s.innerText = parts.join(' · ');
     }
 
-    app.renderListings = function(items, effectiveBudget){
+    // append: add the rows after those already shown (next scroll page) instead of redrawing
+    app.renderListings = function(items, effectiveBudget, append = false){
         const grid = document.getElementById('listings-grid');
         const msg = document.getElementById('listings-msg');
         if (!grid || !msg) return;
 
-        grid.innerHTML = '';
+        if (append) {
+            if (!items) return;
+        } else {
+            grid.innerHTML = '';
+        }
         msg.classList.add('hidden');
-        if(!items || items.length === 0) {
+        if(!append && (!items || items.length === 0)) {
             const bud = (typeof effectiveBudget === 'number' && effectiveBudget > 0) ? effectiveBudget : app.data.currPower;
             msg.innerHTML = `No properties found under <b>${app.fmt(bud)}</b> in ${app.data.location}.`;
             msg.classList.remove('hidden');
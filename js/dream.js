@@ -20,6 +20,114 @@
         updateYearsFill();
     }
 
+    // After an analysis, edits to these fields stream new results from the what-if session
+    const WHATIF_INPUTS = {
+        'inp-income': ['income', parseFloat],
+        'inp-equity': ['equity', parseFloat],
+        'inp-savings': ['savings', parseFloat],
+        'inp-target': ['target', parseFloat],
+        'inp-kids': ['kids', (v) => parseInt(v, 10)],
+        'inp-marital': ['marital', String],
+        'inp-years': ['years', (v) => parseInt(v, 10)]
+    };
+    Object.entries(WHATIF_INPUTS).forEach(([id, [field, parse]]) => {
+        const el = document.getElementById(id);
+        if (!el) return;
+        el.addEventListener(el.tagName === 'SELECT' ? 'change' : 'input',
+            () => app.whatIf.update({[field]: parse(el.value)}));
+    });
+
+    // --- What-if session: send only changed fields, results arrive as Server-Sent Events ---
+    // app.data follows the session: it changes only with a profile the server accepted
+    app.whatIf = {id: null, seq: 0, version: 0, source: null};
+
+    app.whatIf.accept = function(answer) {
+        // Answers can overtake each other; keep the newest session state
+        if (answer.version <= app.whatIf.version) return;
+        app.whatIf.version = answer.version;
+        const {maxYears, ...profile} = answer.profile;
+        Object.assign(app.data, profile);
+    };
+
+    app.whatIf.open = async function(profile) {
+        app.whatIf.close();
+        const response = await fetch('http://localhost:5000/api/session', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(profile)
+        });
+        if (!response.ok) {
+            // 503: sessions are off on this server; results come from the Analyze button only
+            console.warn('[What-if] No session:', (await response.json()).error);
+            return;
+        }
+        const session = await response.json();
+        app.whatIf.id = session.session;
+        app.whatIf.accept(session);
+        app.whatIf.source = new EventSource('http://localhost:5000' + session.stream_url);
+        app.whatIf.source.addEventListener('update', (e) => app.whatIf.render(JSON.parse(e.data)));
+        app.whatIf.source.addEventListener('closed', () => app.whatIf.close());
+    };
+
+    app.whatIf.update = async function(changes) {
+        if (!app.whatIf.id) return;
+        // Skip half-typed values; the session takes years 1..50 (the Dream slider starts at 0)
+        const valid = {};
+        for (const [field, value] of Object.entries(changes)) {
+            if (typeof value === 'number' && !Number.isFinite(value)) continue;
+            if (field === 'target' && value <= 0) continue;
+            valid[field] = field === 'years' ? Math.max(1, Math.min(value, 50)) : value;
+        }
+        if (Object.keys(valid).length === 0) return;
+        const id = app.whatIf.id;
+        try {
+            const response = await fetch(`http://localhost:5000/api/session/${id}`, {
+                method: 'PATCH',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({...valid, seq: ++app.whatIf.seq})
+            });
+            if (response.status === 404 && app.whatIf.id === id) {
+                // Session expired or evicted: start a new one from the accepted profile plus this change
+                const {income, equity, savings, target, years, rate, marital, kids} = app.data;
+                await app.whatIf.open({income, equity, savings, target, years, rate, marital, kids, ...valid});
+                return;
+            }
+            const answer = await response.json();
+            if (!response.ok) {
+                console.warn('[What-if] Update rejected:', answer.error);
+                return;
+            }
+            if (app.whatIf.id === id) app.whatIf.accept(answer);
+        } catch (error) {
+            console.warn('[What-if] Update failed:', error);
+        }
+    };
+
+    app.whatIf.close = function() {
+        if (app.whatIf.source) app.whatIf.source.close();
+        app.whatIf.id = null;
+        app.whatIf.version = 0;
+        app.whatIf.source = null;
+    };
+
+    // Events carry only the outputs that changed
+    app.whatIf.render = function(update) {
+        const byId = (id)=>document.getElementById(id);
+        if (update.readiness !== undefined) {
+            byId('out-readiness').innerText = update.readiness + "%";
+            byId('bar-readiness').style.width = update.readiness + "%";
+            app.data.currPower = update.currPower;
+            byId('txt-power').innerText = app.fmt(update.currPower);
+        }
+        if (update.likelihood !== undefined) {
+            byId('out-likelihood').innerText = update.likelihood + "%";
+            byId('bar-likelihood').style.width = update.likelihood + "%";
+            byId('txt-year').innerText = app.data.years;
+            byId('out-final-equity').innerText = app.fmt(update.futureEquity);
+        }
+        if (update.projection) app.projection = update.projection;
+    };
+
     app.setRisk = function(level, el) {
         // UI Update
         document.querySelectorAll('.risk-card').forEach(c => c.classList.remove('selected', 'bg-F0F9FF', 'border-interhyp-blue'));
@@ -40,6 +148,7 @@
             app.data.riskName = 'Aggressive';
             if (warning) warning.innerText = "Warning: High risk selected. Capital loss is possible.";
         }
+        app.whatIf.update({rate: app.data.rate});
     };
 
     // --- NEW: Property Price Calculation with ML Backend ---
@@ -51,6 +160,8 @@
         const location = document.getElementById('inp-property-location')?.value || 'city';
         const condition = document.getElementById('inp-condition')?.value || 'good';
         const yearBuilt = parseInt(document.getElementById('inp-year-built')?.value || 2000);
+        // Region for the regional price model: the search location as currently typed
+        const region = document.getElementById('inp-location')?.value.trim() || '';
 
         try {
             // Show loading state
@@ -69,7 +180,8 @@
                     bathrooms: bathrooms,
                     location: location,
                     condition: condition,
-                    yearBuilt: yearBuilt
+                    yearBuilt: yearBuilt,
+                    region: region
                 })
             });
 
@@ -205,6 +317,13 @@
             app.updateChart && app.updateChart(monthlyRate);
             app.nav && app.nav('plan');
 
+            // Later slider moves go through a what-if session
+            app.whatIf.open({
+                income: app.data.income, equity: app.data.equity, savings: app.data.savings,
+                target: app.data.target, years: app.data.years, rate: app.data.rate,
+                marital: app.data.marital, kids: app.data.kids
+            }).catch((error) => console.warn('[What-if] Could not open a session:', error));
+
         } catch (error) {
             // Remove loading indicator
             document.getElementById('ml-loading')?.remove();